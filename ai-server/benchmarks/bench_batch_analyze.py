@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+/batch-analyze 벤치마크
+메뉴별 analyze_menu_text 반복 호출과 batch_analyze_menus 일괄 처리 경로를 비교합니다.
+
+실행 (ai-server 디렉토리에서):
+    python benchmarks/bench_batch_analyze.py --sizes 10 100 500
+"""
+
+import time
+import logging
+import argparse
+
+from bench_common import load_menu_names, make_menus, prepare_engine
+
+
+def time_call(func, *args, repeat: int = 3) -> float:
+    """최소 실행 시간 (초)"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="batch_analyze_menus 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 500])
+    parser.add_argument("--allergies", nargs="*", default=["우유", "대두"])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    engine = prepare_engine()
+    names = load_menu_names()
+
+    for size in args.sizes:
+        menus = make_menus(names, size)
+
+        def loop_path():
+            return [engine.analyze_menu_text(text, args.allergies) for text in menus]
+
+        def batch_path():
+            return engine.batch_analyze_menus(menus, args.allergies)
+
+        # 결과 일치 확인
+        loop_results = loop_path()
+        batch_results = batch_path()
+        for single, batched in zip(loop_results, batch_results):
+            assert single["menu_classification"]["category"] == batched["menu_classification"]["category"]
+            assert [m["menu"]["name"] for m in single["similar_menus"]] == \
+                   [m["menu"]["name"] for m in batched["similar_menus"]]
+            assert single["ingredient_analysis"] == batched["ingredient_analysis"]
+            assert (single["allergy_risk"] or {}).get("final_risk_level") == \
+                   (batched["allergy_risk"] or {}).get("final_risk_level")
+
+        loop_time = time_call(loop_path, repeat=args.repeat)
+        batch_time = time_call(batch_path, repeat=args.repeat)
+        print(f"{size:>6}개 메뉴 | loop {loop_time * 1000:9.1f} ms | batch {batch_time * 1000:8.1f} ms | "
+              f"{loop_time / batch_time:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
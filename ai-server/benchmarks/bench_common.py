@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+벤치마크 공통 함수
+엔진 로드, 데이터셋 기반 합성 메뉴 생성, 시간 측정/요약, JSON 결과 저장, 오프라인 OCR 스텁을 제공합니다.
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import platform
+import statistics
+import subprocess
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+AI_SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, AI_SERVER_DIR)
+
+from models.ai_analysis_engine import AIAnalysisEngine
+from models.menu_catalog import get_menu_catalog
+from utils.analysis_cache import AnalysisCache
+
+RESULTS_DIR = os.path.join(AI_SERVER_DIR, "benchmarks", "results")
+DEFAULT_ALLERGIES = ["우유", "대두"]
+
+
+def load_menu_names() -> List[str]:
+    """데이터셋에서 메뉴명 로드"""
+    return [menu.name for menu in get_menu_catalog()]
+
+
+def make_menus(names: List[str], size: int, seed: int = 42) -> List[str]:
+    """데이터셋 메뉴명으로 합성 메뉴 목록 생성"""
+    rng = random.Random(seed)
+    return [rng.choice(names) for _ in range(size)]
+
+
+def make_menu_lines(size: int, seed: int = 42) -> List[str]:
+    """
+    데이터셋으로 OCR 결과와 비슷한 합성 메뉴판 줄 생성
+
+    한글/영문 메뉴명, 가격, 성분 표기가 섞인 줄을 시드 기준으로 재현 가능하게 만듭니다.
+    """
+    rng = random.Random(seed)
+    menus = get_menu_catalog().menus
+    lines = []
+    for _ in range(size):
+        menu = rng.choice(menus)
+        name = menu.name if not menu.english_name or rng.random() < 0.6 else menu.english_name
+        form = rng.random()
+        if form < 0.4:
+            line = name
+        elif form < 0.7:
+            line = f"{name} {rng.randrange(25, 80) * 100:,}"
+        else:
+            ingredients = menu.ingredients[:rng.randint(1, 3)]
+            line = f"{name} ({', '.join(ingredients)})" if ingredients else name
+        lines.append(line)
+    return lines
+
+
+def prepare_engine() -> AIAnalysisEngine:
+    """엔진 로드 (반복 측정이 캐시 적중만 재지 않도록 분석 결과 캐시는 끔)"""
+    engine = AIAnalysisEngine(cache=AnalysisCache(max_results=0, max_texts=0))
+    if not engine.load_all_models():
+        raise SystemExit("❌ 모델 로드 실패 - train_models.py를 먼저 실행하세요")
+    return engine
+
+
+def summarize(samples: List[float], scale: float = 1000.0) -> Dict:
+    """측정값 요약 (기본 단위: ms)"""
+    ordered = sorted(samples)
+    return {
+        "runs": len(ordered),
+        "min": round(ordered[0] * scale, 4),
+        "median": round(statistics.median(ordered) * scale, 4),
+        "mean": round(statistics.fmean(ordered) * scale, 4),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * scale, 4),
+        "max": round(ordered[-1] * scale, 4)
+    }
+
+
+def measure(func: Callable[[], object], repeat: int = 5, warmup: int = 1) -> List[float]:
+    """func() 실행 시간 측정 (초 단위 목록, 워밍업 실행은 제외)"""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started_at)
+    return samples
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=AI_SERVER_DIR, capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def environment_info() -> Dict:
+    """실행 환경 정보 (결과 비교용)"""
+    info = {
+        "timestamp": datetime.now().isoformat(),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count()
+    }
+    for module in ("numpy", "scipy", "sklearn"):
+        try:
+            info[module] = __import__(module).__version__
+        except Exception:
+            info[module] = None
+    return info
+
+
+def write_results(suite: str, results: Dict, output: Optional[str] = None) -> str:
+    """결과를 JSON으로 저장하고 경로 반환 (기본: benchmarks/results/<suite>-<시각>.json)"""
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{suite}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump({"suite": suite, "environment": environment_info(), "results": results},
+                  f, ensure_ascii=False, indent=2)
+    return output
+
+
+def stub_ocr(content: bytes) -> Tuple[str, Dict[str, float], Dict, List]:
+    """오프라인 OCR 스텁 - 업로드된 bytes를 UTF-8 텍스트로 보고 그대로 반환 (전처리 통계/박스 없음)"""
+    return content.decode("utf-8", errors="ignore"), {"image_decode": 0.0, "ocr": 0.0}, {}, []
+
+
+def stub_ocr_batch(contents: List[bytes]) -> List[Tuple[str, Dict[str, float], Dict, List]]:
+    """extract_texts_batched 대신 쓰는 오프라인 스텁"""
+    return [stub_ocr(content) for content in contents]
+
+
+def use_offline_stubs():
+    """main import 전에 호출: 원격 번역을 끄고 OCR 워커를 thread 모드로 고정"""
+    os.environ["TRANSLATION_REMOTE"] = "none"
+    os.environ["OCR_POOL_MODE"] = "thread"
+    os.environ.setdefault("PRELOAD_COMPONENTS", "")
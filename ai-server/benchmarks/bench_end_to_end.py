@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+분석 엔진 end-to-end 벤치마크
+데이터셋으로 만든 합성 메뉴판(10 ~ 10,000줄)에 대해 다음 경로를 측정합니다.
+
+- per_line: 줄마다 analyze_menu_text 호출
+- batch: batch_analyze_menus 한 번 호출
+- whole_text: 메뉴판 전체를 한 텍스트로 analyze_menu_text 호출
+- whole_text_async: 같은 텍스트로 analyze_menu_text_async 호출 (단계 병렬 실행, /analyze-image 경로와 같음)
+
+실행 (ai-server 디렉토리에서):
+    python benchmarks/bench_end_to_end.py --sizes 10 100 1000 10000
+"""
+
+import asyncio
+import logging
+import argparse
+
+from bench_common import (DEFAULT_ALLERGIES, make_menu_lines, measure, prepare_engine,
+                          summarize, write_results)
+
+
+def run(sizes=(10, 100, 1000, 10000), repeat: int = 3, allergies=None, loop_max: int = 1000,
+        seed: int = 42) -> dict:
+    """크기별 경로 실행 시간(ms) 측정 (loop_max보다 큰 크기는 per_line 생략)"""
+    allergies = allergies or DEFAULT_ALLERGIES
+    engine = prepare_engine()
+    loop = asyncio.new_event_loop()
+
+    results = []
+    for size in sizes:
+        lines = make_menu_lines(size, seed=seed)
+        whole_text = " ".join(lines)
+        entry = {"lines": size}
+
+        if size <= loop_max:
+            samples = measure(lambda: [engine.analyze_menu_text(line, allergies) for line in lines], repeat=repeat)
+            entry["per_line"] = summarize(samples)
+
+        samples = measure(lambda: engine.batch_analyze_menus(lines, allergies), repeat=repeat)
+        entry["batch"] = summarize(samples)
+
+        samples = measure(lambda: engine.analyze_menu_text(whole_text, allergies), repeat=repeat)
+        entry["whole_text"] = summarize(samples)
+
+        samples = measure(lambda: loop.run_until_complete(engine.analyze_menu_text_async(whole_text, allergies)),
+                          repeat=repeat)
+        entry["whole_text_async"] = summarize(samples)
+
+        results.append(entry)
+    loop.close()
+    return {"repeat": repeat, "allergies": allergies, "loop_max": loop_max, "seed": seed, "sizes": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="분석 엔진 end-to-end 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--allergies", nargs="*", default=DEFAULT_ALLERGIES)
+    parser.add_argument("--loop-max", type=int, default=1000, help="per_line 경로를 측정할 최대 줄 수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    results = run(args.sizes, args.repeat, args.allergies, args.loop_max, args.seed)
+
+    for entry in results["sizes"]:
+        per_line = entry.get("per_line")
+        per_line_text = f"{per_line['median']:10.1f} ms" if per_line else "         - "
+        print(f"{entry['lines']:>6}줄 | per_line {per_line_text} | batch {entry['batch']['median']:9.1f} ms | "
+              f"whole_text {entry['whole_text']['median']:9.1f} ms | "
+              f"async {entry['whole_text_async']['median']:9.1f} ms")
+    print(f"결과 저장: {write_results('end_to_end', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
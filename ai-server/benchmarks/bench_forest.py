@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+알레르기 위험도 포레스트 추론 벤치마크
+AllergyRiskPredictor와 같은 설정의 RandomForestClassifier를 데이터셋 성분 목록으로 학습한 뒤
+sklearn(predict + predict_proba, 기존 방식)과 CompiledForest(predict_proba 1회)를 비교합니다.
+
+- 일치 여부: 확률 최대 오차, 라벨 일치, 신뢰도(max) 일치
+- 예측 시간: 1건 / 행 수별 배치
+
+라벨은 메뉴의 알레르기 유발 성분 수로 만든 위험도입니다.
+(저장된 포레스트는 sklearn 버전이 다르면 불러올 수 없거나 결과가 달라질 수 있어 매번 새로 학습)
+
+실행 (ai-server 디렉토리에서):
+    python benchmarks/bench_forest.py --batch-sizes 1 10 100 1000
+"""
+
+import logging
+import argparse
+
+import numpy as np
+from sklearn.ensemble import RandomForestClassifier
+
+from bench_common import measure, summarize, write_results
+from models.allergy_risk_predictor import AllergyRiskPredictor
+from models.menu_catalog import get_menu_catalog
+from utils.compiled_forest import CompiledForest
+from utils.text_normalization import clean_text
+
+
+def training_set():
+    """데이터셋 성분 목록의 TF-IDF 행렬과 라벨"""
+    catalog = get_menu_catalog()
+    texts = [clean_text(" ".join(menu.ingredients)) for menu in catalog if menu.ingredients]
+    # 알레르기 유발 성분 수로 위험도 라벨 구성 (0개 safe, 1개 medium, 2개 이상 high)
+    labels = [("safe", "medium", "high")[min(len(menu.allergens or []), 2)] for menu in catalog if menu.ingredients]
+    return AllergyRiskPredictor().vectorizer.fit_transform(texts), np.array(labels)
+
+
+def run(batch_sizes=(1, 10, 100, 1000), repeat: int = 5, seed: int = 42) -> dict:
+    X, labels = training_set()
+    forest = RandomForestClassifier(n_estimators=100, random_state=42, max_depth=10).fit(X, labels)
+    compiled = CompiledForest.from_sklearn(forest)
+
+    rng = np.random.default_rng(seed)
+    rows = rng.integers(0, X.shape[0], max(batch_sizes))
+    inputs = X[rows]
+
+    expected = forest.predict_proba(inputs)
+    actual = compiled.predict_proba(inputs)
+    check = {
+        "max_abs_diff": float(np.abs(expected - actual).max()),
+        "labels_equal": bool(np.array_equal(forest.predict(inputs), compiled.classes[actual.argmax(axis=1)])),
+        "confidence_equal": bool(np.array_equal(expected.max(axis=1), actual.max(axis=1))),
+        "verified": compiled.verify(forest, inputs)
+    }
+
+    timings = []
+    for size in batch_sizes:
+        batch = inputs[:size]
+        timings.append({
+            "rows": size,
+            "sklearn": summarize(measure(lambda: (forest.predict(batch), forest.predict_proba(batch)), repeat=repeat)),
+            "compiled": summarize(measure(lambda: compiled.predict_proba(batch), repeat=repeat))
+        })
+
+    return {
+        "repeat": repeat,
+        "seed": seed,
+        "forest": {"trees": compiled.n_trees, "nodes": int(compiled.feature.size), "max_depth": compiled.max_depth,
+                   "used_features": int(compiled.columns.size), "n_features": int(X.shape[1])},
+        "check": check,
+        "batches": timings
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="알레르기 위험도 포레스트 추론 벤치마크")
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 10, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    results = run(args.batch_sizes, args.repeat, args.seed)
+
+    forest, check = results["forest"], results["check"]
+    print(f"트리 {forest['trees']}개, 노드 {forest['nodes']}개, 최대 깊이 {forest['max_depth']}, "
+          f"사용 특성 {forest['used_features']} / {forest['n_features']}")
+    print(f"sklearn 일치: {check['verified']} (확률 최대 오차 {check['max_abs_diff']:.2e}, "
+          f"라벨 {check['labels_equal']}, 신뢰도 {check['confidence_equal']})")
+    for entry in results["batches"]:
+        print(f"{entry['rows']:>6}행 | sklearn {entry['sklearn']['median']:8.3f} ms | "
+              f"compiled {entry['compiled']['median']:8.3f} ms")
+    print(f"결과 저장: {write_results('forest', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+"""
+HTTP 부하 프로파일
+FastAPI 앱에 엔드포인트별 가중치에 따라 요청을 동시에 보내고 지연 시간/처리량을 측정합니다.
+
+기본은 앱을 같은 프로세스에서 띄워(httpx ASGITransport) 오프라인으로 실행합니다.
+OCR은 업로드 bytes를 그대로 텍스트로 돌려주는 스텁, 번역은 오프라인 사전만 사용합니다.
+--url을 주면 실행 중인 서버로 요청을 보냅니다. (이때 스텁은 적용되지 않음)
+
+실행 (ai-server 디렉토리에서, httpx 필요):
+    python benchmarks/bench_http.py --requests 400 --concurrency 8
+"""
+
+import time
+import random
+import asyncio
+import logging
+import argparse
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from bench_common import (DEFAULT_ALLERGIES, make_menu_lines, stub_ocr_batch, summarize,
+                          use_offline_stubs, write_results)
+
+DEFAULT_MIX = "analyze-menu=4,find-similar-menus=3,check-ingredient-risk=2,ingredient-suggestions=2,batch-analyze=1,analyze-image=1"
+
+
+def make_request(endpoint: str, rng: random.Random, lines: List[str], allergies: List[str]) -> Dict:
+    """엔드포인트별 요청 생성"""
+    if endpoint == "analyze-menu":
+        return {"method": "POST", "url": "/analyze-menu",
+                "json": {"menu_text": rng.choice(lines), "user_allergies": allergies}}
+    if endpoint == "batch-analyze":
+        return {"method": "POST", "url": "/batch-analyze",
+                "json": {"menu_texts": rng.sample(lines, min(20, len(lines))), "user_allergies": allergies}}
+    if endpoint == "find-similar-menus":
+        return {"method": "GET", "url": "/find-similar-menus", "params": {"query": rng.choice(lines)}}
+    if endpoint == "check-ingredient-risk":
+        return {"method": "POST", "url": "/check-ingredient-risk",
+                "json": {"ingredients": rng.choice(lines).split()[:3], "user_allergies": allergies}}
+    if endpoint == "ingredient-suggestions":
+        return {"method": "GET", "url": "/ingredient-suggestions",
+                "params": {"partial_ingredient": rng.choice(lines)[:2]}}
+    if endpoint == "analyze-image":
+        content = "\n".join(rng.sample(lines, min(15, len(lines)))).encode("utf-8")
+        return {"method": "POST", "url": "/analyze-image",
+                "files": {"file": ("menu.png", content, "image/png")},
+                "data": {"user_allergies": ",".join(allergies)}}
+    raise ValueError(f"알 수 없는 엔드포인트: {endpoint}")
+
+
+def parse_mix(mix: str) -> Dict[str, int]:
+    weights = {}
+    for item in mix.split(","):
+        endpoint, _, weight = item.partition("=")
+        weights[endpoint.strip()] = int(weight or 1)
+    return weights
+
+
+async def _load(client, requests: List[Dict], concurrency: int) -> Dict:
+    latencies = defaultdict(list)
+    statuses = defaultdict(lambda: defaultdict(int))
+    queue = asyncio.Queue()
+    for request in requests:
+        queue.put_nowait(request)
+
+    async def worker():
+        while not queue.empty():
+            request = queue.get_nowait()
+            endpoint = request.pop("endpoint")
+            started_at = time.perf_counter()
+            try:
+                response = await client.request(**request)
+                status = str(response.status_code)
+            except Exception as e:
+                status = type(e).__name__
+            latencies[endpoint].append(time.perf_counter() - started_at)
+            statuses[endpoint][status] += 1
+
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+
+    return {
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(requests) / elapsed, 2),
+        "endpoints": {
+            endpoint: {"latency_ms": summarize(samples), "status": dict(statuses[endpoint])}
+            for endpoint, samples in sorted(latencies.items())
+        }
+    }
+
+
+async def run(requests: int = 400, concurrency: int = 8, mix: str = DEFAULT_MIX, allergies=None,
+              seed: int = 42, url: Optional[str] = None) -> dict:
+    """부하 실행 후 엔드포인트별 지연 시간과 처리량 반환"""
+    import httpx
+
+    allergies = allergies or DEFAULT_ALLERGIES
+    rng = random.Random(seed)
+    lines = make_menu_lines(500, seed=seed)
+    weights = parse_mix(mix)
+    endpoints = rng.choices(list(weights), weights=list(weights.values()), k=requests)
+    planned = [dict(make_request(endpoint, rng, lines, allergies), endpoint=endpoint) for endpoint in endpoints]
+
+    if url:
+        async with httpx.AsyncClient(base_url=url, timeout=60) as client:
+            result = await _load(client, planned, concurrency)
+        return {"target": url, "requests": requests, "concurrency": concurrency, "mix": weights, **result}
+
+    use_offline_stubs()
+    import main
+    from utils.ocr_pool import OCRBatcher, OCRWorkerPool
+
+    async def stub_ocr_ready() -> bool:
+        return True
+
+    # EasyOCR Reader를 로드하지 않도록 initializer 없는 풀로 교체 (대기열은 동시성만큼)
+    main.ocr_pool.shutdown()
+    main.ocr_pool = OCRWorkerPool(max_workers=main.ocr_pool.max_workers, max_queue=concurrency)
+    main.ocr_batcher = OCRBatcher(main.ocr_pool, stub_ocr_batch, max_images=main.ocr_batcher.max_images)
+    main.warmup.register("ocr", stub_ocr_ready)
+    await main.startup_event()
+    try:
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+            result = await _load(client, planned, concurrency)
+    finally:
+        await main.shutdown_event()
+
+    # 단계별 평균 시간 (서버 /metrics와 같은 값)
+    stages = {
+        stage: {"count": stats["count"], "errors": stats["errors"],
+                "mean_ms": round(stats["sum"] / stats["count"] * 1000, 4) if stats["count"] else 0.0}
+        for stage, stats in main.metrics.snapshot().items()
+    }
+    return {"target": "in-process", "requests": requests, "concurrency": concurrency, "mix": weights,
+            **result, "stages": stages}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP 부하 프로파일")
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="엔드포인트=가중치 목록 (쉼표 구분)")
+    parser.add_argument("--allergies", nargs="*", default=DEFAULT_ALLERGIES)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--url", help="실행 중인 서버 주소 (생략 시 같은 프로세스에서 앱 실행)")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    results = asyncio.run(run(args.requests, args.concurrency, args.mix, args.allergies, args.seed, args.url))
+
+    print(f"{results['requests']}개 요청 | 동시성 {results['concurrency']} | "
+          f"{results['elapsed_s']}초 | {results['throughput_rps']} req/s")
+    for endpoint, result in results["endpoints"].items():
+        latency = result["latency_ms"]
+        print(f"  {endpoint:<24} median {latency['median']:8.1f} ms | p95 {latency['p95']:8.1f} ms | {result['status']}")
+    print(f"결과 저장: {write_results('http', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+모델 메서드 마이크로 벤치마크
+predict / predict_risk / find_similar_menus / extract_ingredients_from_text /
+check_allergy_risk / get_ingredient_suggestions의 호출당 실행 시간을 측정합니다.
+
+실행 (ai-server 디렉토리에서):
+    python benchmarks/bench_micro.py --inputs 200 --repeat 5
+"""
+
+import logging
+import argparse
+
+from bench_common import (DEFAULT_ALLERGIES, make_menu_lines, measure, prepare_engine,
+                          summarize, write_results)
+
+
+def run(inputs: int = 200, repeat: int = 5, allergies=None, seed: int = 42) -> dict:
+    """메서드별 호출당 시간(µs) 측정"""
+    allergies = allergies or DEFAULT_ALLERGIES
+    engine = prepare_engine()
+    lines = make_menu_lines(inputs, seed=seed)
+    ingredient_lists = [engine.ingredient_matcher.extract_ingredients_from_text(line) or ["우유"] for line in lines]
+    prefixes = [line[:2] for line in lines]
+
+    cases = {
+        "MenuClassifier.predict":
+            lambda: [engine.menu_classifier.predict(line) for line in lines],
+        "AllergyRiskPredictor.predict_risk":
+            lambda: [engine.allergy_predictor.predict_risk(ingredients, allergies) for ingredients in ingredient_lists],
+        "MenuSimilarityModel.find_similar_menus":
+            lambda: [engine.similarity_model.find_similar_menus(line, top_k=5) for line in lines],
+        "IngredientMatcher.extract_ingredients_from_text":
+            lambda: [engine.ingredient_matcher.extract_ingredients_from_text(line) for line in lines],
+        "IngredientMatcher.check_allergy_risk":
+            lambda: [engine.ingredient_matcher.check_allergy_risk(ingredients, allergies) for ingredients in ingredient_lists],
+        "IngredientMatcher.get_ingredient_suggestions":
+            lambda: [engine.ingredient_matcher.get_ingredient_suggestions(prefix, top_k=5) for prefix in prefixes]
+    }
+
+    results = {}
+    for name, case in cases.items():
+        samples = measure(case, repeat=repeat)
+        results[name] = {
+            "calls_per_run": inputs,
+            "per_call_us": summarize([s / inputs for s in samples], scale=1e6)
+        }
+    return {"inputs": inputs, "repeat": repeat, "allergies": allergies, "seed": seed, "methods": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="모델 메서드 마이크로 벤치마크")
+    parser.add_argument("--inputs", type=int, default=200, help="측정 1회당 입력 수")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--allergies", nargs="*", default=DEFAULT_ALLERGIES)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    results = run(args.inputs, args.repeat, args.allergies, args.seed)
+
+    for name, result in results["methods"].items():
+        stats = result["per_call_us"]
+        print(f"{name:<48} median {stats['median']:10.1f} µs | p95 {stats['p95']:10.1f} µs")
+    print(f"결과 저장: {write_results('micro', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
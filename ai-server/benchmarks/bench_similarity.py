@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+유사 메뉴 검색 확장성 벤치마크
+데이터셋으로 만든 합성 메뉴 변형(수백 ~ 수십만 개)으로 유사도 모델의 메뉴 행렬을 교체하고
+쿼리 1건당 검색 시간을 측정합니다.
+
+- inverted: find_similar_menus (역색인 + 부분 선택)
+- batch: find_similar_menus_batch의 쿼리당 평균 시간
+- brute_force: 모든 메뉴와 cosine_similarity 후 전체 정렬 (이전 구현, 비교용)
+
+실행 (ai-server 디렉토리에서):
+    python benchmarks/bench_similarity.py --sizes 500 5000 50000 200000
+"""
+
+import time
+import logging
+import argparse
+
+import numpy as np
+from sklearn.metrics.pairwise import cosine_similarity
+
+from bench_common import make_menu_lines, prepare_engine, summarize, write_results
+from utils.text_normalization import NormalizedText, tfidf_transform
+
+
+def brute_force(model, query: NormalizedText, top_k: int = 5):
+    """이전 구현: 전체 메뉴와 유사도 계산 후 전체 정렬"""
+    query_vector = tfidf_transform(model.vectorizer, [query])
+    similarities = cosine_similarity(query_vector, model.menu_vectors).flatten()
+    return [(idx, similarities[idx]) for idx in np.argsort(similarities)[::-1][:top_k] if similarities[idx] > 0.1]
+
+
+def per_query(func, queries, repeat: int):
+    """쿼리 1건당 시간 (반복마다 전체 쿼리를 실행하고 쿼리 수로 나눔)"""
+    samples = []
+    for _ in range(repeat):
+        started_at = time.perf_counter()
+        func(queries)
+        samples.append((time.perf_counter() - started_at) / len(queries))
+    return summarize(samples)
+
+
+def run(sizes=(500, 5000, 50000, 200000), queries: int = 200, repeat: int = 3, brute_max: int = 50000,
+        seed: int = 42) -> dict:
+    """카탈로그 크기별 쿼리당 검색 시간(ms) 측정 (brute_max보다 큰 크기는 brute_force 생략)"""
+    engine = prepare_engine()
+    model = engine.similarity_model
+    query_docs = [NormalizedText(line) for line in make_menu_lines(queries, seed=seed + 1)]
+
+    results = []
+    for size in sizes:
+        lines = make_menu_lines(size, seed=seed)
+        model.menu_vectors = tfidf_transform(model.vectorizer, [NormalizedText(line) for line in lines])
+        model.menu_data = [{'id': i, 'name': line, 'category': None, 'ingredients': [], 'allergens': []}
+                           for i, line in enumerate(lines)]
+        model._build_search_index()
+
+        entry = {
+            "menus": size,
+            "nnz": int(model.menu_vectors.nnz),
+            "inverted": per_query(lambda qs: [model.find_similar_menus(q) for q in qs], query_docs, repeat),
+            "batch": per_query(model.find_similar_menus_batch, query_docs, repeat)
+        }
+        if size <= brute_max:
+            entry["brute_force"] = per_query(lambda qs: [brute_force(model, q) for q in qs], query_docs, repeat)
+        results.append(entry)
+
+    # 다른 벤치마크가 같은 엔진을 쓰지 않도록 원래 메뉴로 복구
+    model.load_model()
+    return {"queries": queries, "repeat": repeat, "brute_max": brute_max, "seed": seed, "sizes": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="유사 메뉴 검색 확장성 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[500, 5000, 50000, 200000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--brute-max", type=int, default=50000, help="brute_force를 측정할 최대 메뉴 수")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    results = run(args.sizes, args.queries, args.repeat, args.brute_max, args.seed)
+
+    for entry in results["sizes"]:
+        brute = entry.get("brute_force")
+        brute_text = f"{brute['median']:8.3f} ms" if brute else "       - "
+        print(f"{entry['menus']:>7}개 메뉴 | inverted {entry['inverted']['median']:7.3f} ms | "
+              f"batch {entry['batch']['median']:7.3f} ms | brute_force {brute_text}")
+    print(f"결과 저장: {write_results('similarity', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
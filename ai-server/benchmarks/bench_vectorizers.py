@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+벡터라이저 비교 벤치마크
+모델별 설정으로 TfidfVectorizer(어휘 사전)와 HashingTfidfVectorizer(특성 해싱)를 같은 데이터로 학습한 뒤
+변환 시간과 메모리를 비교합니다.
+
+- 변환 시간: 쿼리 1건 / 1,000건 배치 (sklearn transform, tfidf_transform, 해싱)
+- 메모리: 저장 파일 크기, 새 프로세스에서 로드했을 때의 RSS 증가량과 tracemalloc 할당량
+- 해싱 충돌: 학습 n-gram 수 대비 사용된 버킷 수
+- 분류 일치율: MenuClassifier를 두 방식으로 훈련했을 때 예측이 같은 비율 (메뉴 분류 설정만)
+
+실행 (ai-server 디렉토리에서):
+    python benchmarks/bench_vectorizers.py
+"""
+
+import io
+import os
+import sys
+import json
+import logging
+import argparse
+import tempfile
+import contextlib
+import subprocess
+
+import joblib
+import numpy as np
+
+from bench_common import AI_SERVER_DIR, make_menu_lines, measure, summarize, write_results
+from models.menu_catalog import get_menu_catalog
+from models.menu_classifier import MenuClassifier
+from utils.hashing_vectorizer import make_vectorizer
+from utils.text_normalization import NormalizedText, clean_text, tfidf_transform
+
+# 모델별 벡터라이저 설정 (메뉴 유사도는 메뉴 분류와 같은 설정)
+CONFIGS = {
+    "menu_classifier": {"ngram_range": (1, 3), "max_features": 1000, "min_df": 1, "stop_words": None},
+    "allergy_risk": {"ngram_range": (1, 2), "max_features": 500, "min_df": 1}
+}
+
+# 새 프로세스에서 벡터라이저를 로드하고 메모리 사용량 출력
+_MEMORY_SCRIPT = """
+import sys, json, tracemalloc
+sys.path.insert(0, sys.argv[2])
+import joblib
+from sklearn.feature_extraction.text import TfidfVectorizer
+import utils.hashing_vectorizer
+
+def rss_kb():
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+before = rss_kb()
+tracemalloc.start()
+vectorizer = joblib.load(sys.argv[1])
+traced, _ = tracemalloc.get_traced_memory()
+print(json.dumps({"rss_delta_kb": rss_kb() - before, "traced_bytes": traced}))
+"""
+
+
+def training_texts(name: str):
+    """모델 설정별 학습 텍스트 (메뉴명/변형명, 성분 목록)"""
+    catalog = get_menu_catalog()
+    if name == "allergy_risk":
+        return [clean_text(" ".join(menu.ingredients)) for menu in catalog if menu.ingredients]
+    return [clean_text(text) for text, _ in catalog.iter_menu_texts()]
+
+
+def memory_footprint(vectorizer) -> dict:
+    """저장 파일 크기와 새 프로세스에서 로드했을 때의 메모리 사용량"""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "vectorizer.pkl")
+        joblib.dump(vectorizer, path)
+        output = subprocess.run([sys.executable, "-c", _MEMORY_SCRIPT, path, AI_SERVER_DIR],
+                                capture_output=True, text=True, check=True).stdout
+        return {"file_bytes": os.path.getsize(path), **json.loads(output.strip().splitlines()[-1])}
+
+
+def classifier_agreement(lines) -> float:
+    """tfidf / hashing으로 각각 훈련한 MenuClassifier의 예측 일치율"""
+    categories = []
+    for mode in ("tfidf", "hashing"):
+        with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+            classifier = MenuClassifier(directory, vectorizer=mode)
+            classifier.train()
+        categories.append([result['category'] for result in classifier.predict_batch(lines)])
+    return round(float(np.mean(np.array(categories[0]) == np.array(categories[1]))), 4)
+
+
+def run(queries: int = 1000, repeat: int = 5, seed: int = 42) -> dict:
+    lines = make_menu_lines(queries, seed=seed)
+    results = {}
+
+    for name, params in CONFIGS.items():
+        texts = training_texts(name)
+        tfidf = make_vectorizer("tfidf", **params).fit(texts)
+        hashing = make_vectorizer("hashing", ngram_range=params["ngram_range"]).fit(texts)
+
+        single = lines[0]
+        timings = {
+            "sklearn_single": measure(lambda: tfidf.transform([clean_text(single)]), repeat=repeat * 20),
+            "tfidf_single": measure(lambda: tfidf_transform(tfidf, [NormalizedText(single)]), repeat=repeat * 20),
+            "hashing_single": measure(lambda: tfidf_transform(hashing, [NormalizedText(single)]), repeat=repeat * 20),
+            "sklearn_batch": measure(lambda: tfidf.transform([clean_text(line) for line in lines]), repeat=repeat),
+            "tfidf_batch": measure(lambda: tfidf_transform(tfidf, [NormalizedText(line) for line in lines]),
+                                   repeat=repeat),
+            "hashing_batch": measure(lambda: tfidf_transform(hashing, [NormalizedText(line) for line in lines]),
+                                     repeat=repeat)
+        }
+
+        ngrams = {ngram for text in texts for ngram in NormalizedText(text).word_ngrams(params["ngram_range"])}
+        entry = {
+            "training_texts": len(texts),
+            "latency_ms": {key: summarize(samples) for key, samples in timings.items()},
+            "memory": {"tfidf": memory_footprint(tfidf), "hashing": memory_footprint(hashing)},
+            "hashing": {
+                "n_features": hashing.n_features,
+                "training_ngrams": len(ngrams),
+                "used_buckets": int(np.count_nonzero(hashing.df))
+            }
+        }
+
+        if name == "menu_classifier":
+            entry["prediction_agreement"] = classifier_agreement(lines)
+
+        results[name] = entry
+    return {"queries": queries, "repeat": repeat, "seed": seed, "models": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벡터라이저 비교 벤치마크")
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+    results = run(args.queries, args.repeat, args.seed)
+
+    for name, entry in results["models"].items():
+        latency = entry["latency_ms"]
+        print(f"[{name}] 학습 텍스트 {entry['training_texts']}개")
+        for kind in ("sklearn", "tfidf", "hashing"):
+            print(f"  {kind:<8} 1건 {latency[f'{kind}_single']['median']:7.3f} ms | "
+                  f"{results['queries']}건 {latency[f'{kind}_batch']['median']:8.2f} ms")
+        for kind, memory in entry["memory"].items():
+            print(f"  {kind:<8} 파일 {memory['file_bytes'] / 1024:7.1f} KB | RSS +{memory['rss_delta_kb']} KB | "
+                  f"할당 {memory['traced_bytes'] / 1024:7.1f} KB")
+        hashing = entry["hashing"]
+        print(f"  해싱 버킷 {hashing['used_buckets']} / n-gram {hashing['training_ngrams']} "
+              f"(n_features {hashing['n_features']})")
+        if "prediction_agreement" in entry:
+            print(f"  분류 일치율 {entry['prediction_agreement']:.2%}")
+    print(f"결과 저장: {write_results('vectorizers', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+벤치마크 전체 실행
+마이크로 / end-to-end / HTTP 부하 벤치마크를 차례로 실행해 하나의 JSON으로 저장합니다.
+네트워크 없이 실행됩니다. (OCR 스텁, 오프라인 번역 사전)
+
+실행 (ai-server 디렉토리에서):
+    python benchmarks/run_all.py
+    python benchmarks/run_all.py --quick   # 작은 크기로 빠르게 확인
+"""
+
+import asyncio
+import logging
+import argparse
+
+import bench_end_to_end
+import bench_http
+import bench_micro
+from bench_common import write_results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크 전체 실행")
+    parser.add_argument("--quick", action="store_true", help="작은 입력/반복 수로 실행")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="결과 JSON 경로 (기본: benchmarks/results/)")
+    args = parser.parse_args()
+
+    logging.disable(logging.INFO)
+
+    if args.quick:
+        micro = bench_micro.run(inputs=50, repeat=3, seed=args.seed)
+        end_to_end = bench_end_to_end.run(sizes=(10, 100, 1000), repeat=1, loop_max=100, seed=args.seed)
+        http = asyncio.run(bench_http.run(requests=100, concurrency=4, seed=args.seed))
+    else:
+        micro = bench_micro.run(seed=args.seed)
+        end_to_end = bench_end_to_end.run(seed=args.seed)
+        http = asyncio.run(bench_http.run(seed=args.seed))
+
+    results = {"micro": micro, "end_to_end": end_to_end, "http": http}
+    print(f"결과 저장: {write_results('all', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,26 @@
-from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Body, Form
+from fastapi import FastAPI, File, UploadFile, HTTPException, Query, Body, Form, Header
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
-import easyocr
-import cv2
-import numpy as np
+from fastapi.responses import JSONResponse, Response
 import json
 import os
+import asyncio
 import sys
 import time
 import uuid
+import hashlib
 from typing import List, Dict, Optional
 import logging
 from datetime import datetime
 import traceback
-import re
-from googletrans import Translator
+from utils.ocr_pool import OCRBatcher, OCRWorkerPool, PoolSaturatedError
+from utils.ocr_worker import init_ocr_worker, is_ocr_ready, extract_texts_batched, OCRFailedError, OCR_PARAMS
+from utils.ocr_cache import OCRResultCache, make_cache_key
+from utils.translation import DictionaryTranslator, TranslationService
+from utils.warmup import ComponentWarmup
+from utils.metrics import metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from utils.analysis_cache import analysis_cache
+from utils.text_normalization import canonical_text, filter_meaningful_words
+from utils.stage_runner import stage_runner
 
 # AI 모델들 import (안전한 import)
 try:
@@ -23,6 +29,7 @@ try:
     from models.allergy_risk_predictor import AllergyRiskPredictor
     from models.menu_similarity import MenuSimilarityModel
     from models.ingredient_matcher import IngredientMatcher
+    from utils.model_bundles import ModelBundleManager, RetrainInProgressError, NoPreviousBundleError
     MODELS_AVAILABLE = True
 except ImportError as e:
     print(f"⚠️ AI 모델 import 실패: {e}")
@@ -47,87 +54,164 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# AI 분석 엔진 초기화 (안전한 초기화)
-ai_engine = None
-if MODELS_AVAILABLE:
-    try:
-        ai_engine = AIAnalysisEngine()
-        logger.info("✅ AI 분석 엔진 초기화 완료")
-    except Exception as e:
-        logger.error(f"❌ AI 분석 엔진 초기화 실패: {e}")
-        ai_engine = None
+# AI 모델 번들 관리 (재훈련은 별도 프로세스에서 실행 후 새 번들로 원자적 교체)
+model_bundles = ModelBundleManager.from_env() if MODELS_AVAILABLE else None
 
-# EasyOCR 초기화 (안전한 초기화)
-reader = None
-try:
-    logger.info("EasyOCR 초기화 시작...")
-    reader = easyocr.Reader(
-        ['en'],  # 영어만 사용 (안정성 향상)
-        gpu=False, 
-        model_storage_directory='./models', 
-        download_enabled=True,
-        # 안정성 최적화 설정
-        quantize=False,  # 양자화 비활성화 (안정성 향상)
-        verbose=False  # 불필요한 로그 제거
+def current_engine() -> Optional["AIAnalysisEngine"]:
+    """현재 모델 번들 (요청마다 한 번만 읽어 요청 전체를 같은 번들로 처리)"""
+    return model_bundles.current if model_bundles else None
+
+# OCR 워커 풀 (이벤트 루프 블로킹 방지)
+# thread 모드: 현재 프로세스에서 Reader 1개 로드 / process 모드: 워커 프로세스마다 Reader 로드
+# 워커와 Reader는 첫 OCR 요청(또는 백그라운드 워밍업) 때 생성됨
+ocr_pool = OCRWorkerPool.from_env(initializer=init_ocr_worker)
+logger.info(
+    f"OCR 워커 풀 초기화: mode={ocr_pool.mode}, workers={ocr_pool.max_workers}, "
+    f"max_queue={ocr_pool.max_queue}, torch_threads={ocr_pool.torch_threads}"
+)
+
+# 동시에 업로드된 이미지를 묶어 검출 후 박스를 한 번에 인식 (OCR_MODE=two_phase일 때)
+ocr_batcher = OCRBatcher.from_env(ocr_pool, extract_texts_batched)
+
+# OCR 결과 캐시 (같은 이미지 재업로드 / 백엔드 재시도 시 OCR 재실행 방지)
+ocr_cache = OCRResultCache.from_env()
+
+# 번역 서비스 (오프라인 사전 → 캐시 → 원격 번역 순서)
+translation_service = TranslationService.from_env()
+
+# 컴포넌트 워밍업 (models는 시작 시 로드, ocr/translation은 처음 사용할 때 로드)
+# PRELOAD_COMPONENTS=ocr,translation 으로 지정하면 서버 시작 직후 백그라운드에서 미리 로드
+PRELOAD_COMPONENTS = [c.strip() for c in os.getenv("PRELOAD_COMPONENTS", "").split(",") if c.strip()]
+warmup = ComponentWarmup()
+
+async def load_models() -> bool:
+    """AI 모델 번들 로드 (마지막으로 활성화된 버전, 실패 시 기본 모델)"""
+    if model_bundles is None:
+        logger.warning("⚠️ AI 엔진이 초기화되지 않았습니다")
+        return False
+    return await asyncio.to_thread(model_bundles.load_initial)
+
+async def load_ocr() -> bool:
+    """OCR 워커를 띄워 Reader 로드"""
+    ready = await ocr_pool.warm_up(is_ocr_ready)
+    logger.info(f"OCR 워커 준비 완료: {sum(ready)}/{len(ready)}")
+    return any(ready)
+
+async def load_translation() -> bool:
+    """오프라인 번역 사전 구성 (데이터셋 메뉴명 + 성분 동의어)"""
+    ai_engine = current_engine()
+    ingredient_synonyms = ai_engine.ingredient_matcher.ingredient_synonyms if ai_engine else {}
+    dictionary = await asyncio.to_thread(DictionaryTranslator.from_dataset, ingredient_synonyms=ingredient_synonyms)
+    translation_service.set_dictionary(dictionary)
+    return True
+
+warmup.register("models", load_models)
+warmup.register("ocr", load_ocr)
+warmup.register("translation", load_translation)
+
+async def translate_text(text: str):
+    """영어 → 한글 번역 (번역 사전은 첫 호출 시 구성)"""
+    await warmup.ensure("translation")
+    with metrics.time("translation"):
+        return await translation_service.translate(text, src='en', dest='ko')
+
+async def run_ocr(content: bytes) -> str:
+    """
+    OCR 풀에서 텍스트 추출 (동시에 들어온 이미지와 묶여 한 번에 인식될 수 있음)
+    워커가 측정한 디코딩/전처리/OCR 시간과 전처리 입력/출력 픽셀 수를 메트릭에 기록
+    """
+    try:
+        text, timings, preprocess_stats, _ = await ocr_batcher.submit(content)
+    except OCRFailedError:
+        metrics.record_error("ocr")
+        raise
+    for stage, seconds in timings.items():
+        metrics.observe(stage, seconds)
+    if preprocess_stats:
+        for step, seconds in preprocess_stats["timings"].items():
+            metrics.observe(f"preprocess_{step}", seconds)
+        metrics.increment("ocr_input_pixels", preprocess_stats["input_pixels"])
+        metrics.increment("ocr_output_pixels", preprocess_stats["output_pixels"])
+    return text
+
+# 업로드 설정
+MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_MB", "20")) * 1024 * 1024
+UPLOAD_CHUNK_BYTES = 64 * 1024
+UPLOAD_SPOOL_DIR = os.getenv("UPLOAD_SPOOL_DIR")  # 디버깅용: 설정 시 업로드 원본을 디스크에 보관
+
+async def read_upload(file: UploadFile) -> bytearray:
+    """업로드 파일을 메모리 버퍼로 읽기 (최대 크기 초과 시 413)"""
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"파일이 너무 큽니다 (최대 {MAX_UPLOAD_BYTES // (1024 * 1024)}MB)"
     )
-    logger.info("✅ EasyOCR 초기화 완료")
-except Exception as e:
-    logger.error(f"❌ EasyOCR 초기화 실패: {e}")
-    reader = None
-
-# 대안 OCR 함수 (Tesseract 사용)
-def extract_text_with_tesseract(image):
-    """Tesseract를 사용한 텍스트 추출 (대안)"""
+    if file.size is not None and file.size > MAX_UPLOAD_BYTES:
+        raise too_large
+
+    buffer = bytearray()
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        buffer.extend(chunk)
+        if len(buffer) > MAX_UPLOAD_BYTES:
+            raise too_large
+    return buffer
+
+def spool_upload(content: bytes, filename: str):
+    """디버깅용 업로드 원본 저장 (UPLOAD_SPOOL_DIR 설정 시에만 사용)"""
     try:
-        import pytesseract
-        from PIL import Image
-        import numpy as np
-        
-        # OpenCV 이미지를 PIL 이미지로 변환
-        image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-        pil_image = Image.fromarray(image_rgb)
-        
-        # Tesseract OCR 실행
-        text = pytesseract.image_to_string(pil_image, lang='eng')
-        logger.info("✅ Tesseract OCR 완료")
-        return text.strip()
+        os.makedirs(UPLOAD_SPOOL_DIR, exist_ok=True)
+        file_extension = os.path.splitext(filename)[1] or ".png"
+        path = os.path.join(UPLOAD_SPOOL_DIR, f"upload_{uuid.uuid4().hex}{file_extension}")
+        with open(path, "wb") as f:
+            f.write(content)
+        logger.info(f"업로드 원본 보관됨: {path}")
     except Exception as e:
-        logger.error(f"❌ Tesseract OCR 실패: {e}")
-        return ""
+        logger.warning(f"업로드 원본 보관 실패: {e}")
 
 @app.on_event("startup")
 async def startup_event():
-    """서버 시작 시 AI 모델들 로드"""
+    """서버 시작 시 AI 모델들 로드 (OCR/번역은 처음 사용할 때 로드)"""
     logger.info("🚀 AI 서버 시작 중...")
-    
-    # AI 모델들 로드 (안전한 로드)
-    if ai_engine is not None:
-        try:
-            if ai_engine.load_all_models():
-                logger.info("✅ 모든 AI 모델 로드 완료")
-            else:
-                logger.warning("⚠️ 일부 AI 모델 로드 실패")
-        except Exception as e:
-            logger.error(f"❌ AI 모델 로드 중 오류: {e}")
+
+    # AI 모델들 로드 (텍스트 분석 엔드포인트에 필요)
+    if await warmup.ensure("models"):
+        logger.info("✅ 모든 AI 모델 로드 완료")
     else:
-        logger.warning("⚠️ AI 엔진이 초기화되지 않았습니다")
+        logger.warning("⚠️ 일부 AI 모델 로드 실패")
+
+    for name in PRELOAD_COMPONENTS:
+        logger.info(f"백그라운드 워밍업 시작: {name}")
+        warmup.start_background(name)
     
     logger.info("✅ AI 서버 시작 완료")
 
+@app.on_event("shutdown")
+async def shutdown_event():
+    """서버 종료 시 OCR 워커 정리"""
+    ocr_pool.shutdown()
+    translation_service.shutdown()
+    stage_runner.shutdown()
+    if model_bundles is not None:
+        model_bundles.shutdown()
+
 @app.get("/")
 async def root():
     """서버 상태 확인"""
+    ai_engine = current_engine()
     return {
         "message": "알레르기 안전 메뉴 분석 AI 서버",
         "version": "2.0.0",
         "status": "running",
         "models_loaded": ai_engine.models_loaded if ai_engine else False,
-        "ocr_available": reader is not None
+        "ocr_available": warmup.is_ready("ocr")
     }
 
 @app.get("/health")
 async def health_check():
     """헬스 체크"""
+    ai_engine = current_engine()
     model_status = {}
     if ai_engine:
         try:
@@ -140,11 +224,36 @@ async def health_check():
         "status": "healthy",
         "models_loaded": ai_engine.models_loaded if ai_engine else False,
         "model_status": model_status,
-        "ocr_available": reader is not None,
+        "ocr_available": warmup.is_ready("ocr"),
+        "components": warmup.get_status(),
+        "ocr_pool": ocr_pool.get_stats(),
+        "ocr_batcher": ocr_batcher.get_stats(),
+        "ocr_cache": ocr_cache.get_stats(),
+        "ocr_preprocess": OCR_PARAMS["preprocess"],
+        "analysis_cache": analysis_cache.get_stats(),
+        "analysis_stages": stage_runner.get_stats(),
+        "translation": translation_service.get_stats(),
         "timestamp": datetime.now().isoformat()
     }
 
-
+@app.get("/metrics")
+async def metrics_endpoint():
+    """단계별 실행 시간/호출 수/오류 수 (Prometheus 텍스트 형식)"""
+    return Response(content=metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
+@app.get("/ready")
+async def readiness_check(component: Optional[str] = None):
+    """준비 상태 확인 (기본: 텍스트 분석용 models, component=ocr 등으로 개별 확인)"""
+    components = warmup.get_status()
+    if component is not None and component not in components:
+        raise HTTPException(status_code=404, detail=f"알 수 없는 컴포넌트: {component}")
+
+    ready = warmup.is_ready(component or "models")
+    return JSONResponse(status_code=200 if ready else 503, content={
+        "ready": ready,
+        "components": components,
+        "timestamp": datetime.now().isoformat()
+    })
 
 @app.post("/analyze-menu")
 async def analyze_menu(
@@ -157,20 +266,15 @@ async def analyze_menu(
         logger.info(f"📝 입력된 메뉴 텍스트: {menu_text}")
         logger.info(f"⚠️ 사용자 알레르기 정보: {user_allergies}")
 
+        ai_engine = current_engine()
         if ai_engine is None:
             raise HTTPException(status_code=500, detail="AI 엔진이 초기화되지 않았습니다")
         # ✅ 번역 (영어 → 한글)
-        translated_text = ""
-        try:
-            translator = Translator()
-            translated_text = translator.translate(menu_text, src='en', dest='ko').text
-            logger.info(f"🈯 번역된 메뉴 텍스트: {translated_text}")
-        except Exception as translate_error:
-            logger.warning(f"⚠️ 번역 실패, 원본 텍스트 사용: {translate_error}")
-            translated_text = menu_text
+        translated_text, translation_source = await translate_text(menu_text)
+        logger.info(f"🈯 번역된 메뉴 텍스트 ({translation_source}): {translated_text}")
 
         # ✅ 메뉴 분석
-        result = ai_engine.analyze_menu_text(translated_text, user_allergies)
+        result = await ai_engine.analyze_menu_text_async(translated_text, user_allergies)
 
         if "error" in result:
             logger.error(f"🚫 분석 결과에 오류 포함됨: {result['error']}")
@@ -212,129 +316,50 @@ async def analyze_menu_image(
             except Exception:
                 logger.warning(f"알레르기 정보 파싱 실패: {user_allergies}")
         
-        file_extension = os.path.splitext(file.filename)[1] or ".png"
-        safe_filename = f"temp_{uuid.uuid4().hex}{file_extension}"
-        image_path = safe_filename
-
-        content = await file.read()
+        with metrics.time("upload_read"):
+            content = await read_upload(file)
         logger.info(f"읽은 파일 크기: {len(content)} bytes")
-        logger.info(f"안전한 파일명: {safe_filename}")
 
-        with open(image_path, "wb") as buffer:
-            buffer.write(content)
+        if UPLOAD_SPOOL_DIR:
+            await asyncio.to_thread(spool_upload, content, file.filename)
 
-        if not os.path.exists(image_path):
-            raise HTTPException(status_code=400, detail="이미지 파일 저장 실패")
-        
-        logger.info(f"이미지 파일 저장됨: {image_path}")
-
-        if reader is None:
+        if not await warmup.ensure("ocr"):
             raise HTTPException(status_code=500, detail="OCR 엔진이 초기화되지 않았습니다")
 
-        extracted_text = ""
-
         try:
-            image = cv2.imdecode(np.frombuffer(content, np.uint8), cv2.IMREAD_COLOR)
-            if image is None:
-                raise Exception("이미지를 읽을 수 없습니다")
-
-            height, width = image.shape[:2]
-            if width > 800 or height > 800:
-                scale = min(800/width, 800/height)
-                image = cv2.resize(image, (int(width*scale), int(height*scale)))
-                logger.info(f"이미지 크기 조정: {width}x{height} -> {image.shape[1]}x{image.shape[0]}")
-            
-            logger.info("EasyOCR 텍스트 추출 시작...")
-            
-            try:
-                logger.info("📌 EasyOCR 실행 전 - 이미지 크기: %s", str(image.shape))
-                
-                start_time = time.time()
-                
-                results = reader.readtext(
-                    image,
-                    detail=0,
-                    text_threshold=0.3,
-                    link_threshold=0.3,
-                    low_text=0.2
-                )
-                
-                elapsed_time = time.time() - start_time
-                logger.info("📌 EasyOCR 결과 추출 성공 - 결과 개수: %d", len(results))
-                logger.info("⏱ OCR 실행 시간: %.2f초", elapsed_time)
-                logger.debug("📌 OCR 결과 내용: %s", results)
-
-            except Exception as e:
-                logger.error("❌ EasyOCR 실행 중 오류 발생: %s", str(e))
-                raise e
-
-            if isinstance(results, list):
-                extracted_text = " ".join(results)
-            else:
-                extracted_text = " ".join([text[1] for text in results])
-
-            logger.info(f"OCR 결과: {len(results)}개 텍스트 블록 발견")
-            logger.info(f"추출된 텍스트: {extracted_text[:200]}...")
-
-            if not extracted_text.strip():
-                raise HTTPException(status_code=500, detail="OCR에서 텍스트를 추출할 수 없습니다.")
-
-        except Exception as ocr_error:
-            logger.error(f"EasyOCR 처리 중 오류: {ocr_error}")
-            logger.info("Tesseract OCR로 대체 시도...")
-
-            try:
-                extracted_text = extract_text_with_tesseract(image)
-                if not extracted_text:
-                    raise Exception("Tesseract OCR도 실패")
-                logger.info("✅ Tesseract OCR로 텍스트 추출 성공")
-            except Exception as tesseract_error:
-                logger.error(f"Tesseract OCR도 실패: {tesseract_error}")
-                raise HTTPException(status_code=500, detail=f"모든 OCR 처리 실패: {str(ocr_error)}")
-
-        finally:
-            try:
-                if os.path.exists(image_path):
-                    os.remove(image_path)
-                    logger.info(f"임시 파일 삭제됨: {image_path}")
-            except Exception as cleanup_error:
-                logger.warning(f"임시 파일 삭제 실패: {cleanup_error}")
+            cache_key = make_cache_key(content, OCR_PARAMS)
+            extracted_text = await ocr_cache.get_or_compute(
+                cache_key,
+                lambda: run_ocr(content)
+            )
+        except PoolSaturatedError as e:
+            logger.warning(f"OCR 대기열 포화, 요청 거절: {e}")
+            raise HTTPException(
+                status_code=429,
+                detail=str(e),
+                headers={"Retry-After": str(e.retry_after)}
+            )
+        except OCRFailedError as e:
+            raise HTTPException(status_code=500, detail=str(e))
 
         if not extracted_text.strip():
             raise HTTPException(status_code=500, detail="OCR에서 텍스트를 추출할 수 없습니다.")
 
-        extracted_text = extracted_text.replace('\n', ' ').replace('\r', ' ')
-        extracted_text = ' '.join(extracted_text.split())
-
-        menu_keywords = ['coffee', 'latte', 'cappuccino', 'americano', 'espresso',
-                         'mocha', 'caramel', 'vanilla', 'chocolate', 'milk', 'cream', 'sugar', 'syrup', 'ice', 'hot',
-                         '카페', '라떼', '카푸치노', '아메리카노', '에스프레소', '모카', '카라멜', '바닐라', '초콜릿', '우유', '크림', '설탕', '시럽', '아이스', '핫']
-
-        meaningful_words = []
-        for word in extracted_text.split():
-            if any(k in word.lower() for k in menu_keywords):
-                meaningful_words.append(word)
-            elif not re.match(r'^[0-9~!@#$%^&*()_+\-=\[\]{};:\'"\\|,.<>/?]+$', word):
-                meaningful_words.append(word)
-
-        extracted_text = ' '.join(meaningful_words)
+        with metrics.time("text_cleaning"):
+            # 줄바꿈/연속 공백을 정리하고 숫자/기호로만 이루어진 단어(가격, 구분선 등) 제거
+            extracted_text = filter_meaningful_words(canonical_text(extracted_text))
         logger.info(f"정제된 텍스트: {extracted_text}")
 
         # ✅ 번역 (영어 → 한글)
-        translated_text = ""
-        try:
-            translator = Translator()
-            translated_text = translator.translate(extracted_text, src='en', dest='ko').text
-            logger.info(f"🈯 번역된 메뉴 텍스트: {translated_text}")
-        except Exception as translate_error:
-            logger.warning(f"⚠️ 번역 실패, 원본 텍스트 사용: {translate_error}")
-            translated_text = extracted_text
+        translated_text, translation_source = await translate_text(extracted_text)
+        logger.info(f"🈯 번역된 메뉴 텍스트 ({translation_source}): {translated_text}")
 
+        ai_engine = current_engine()
         if ai_engine is None:
             raise HTTPException(status_code=500, detail="AI 엔진이 초기화되지 않았습니다")
 
         # 번역된 텍스트로 분석 (번역 실패시 원본 텍스트 사용)
-        analysis_result = ai_engine.analyze_menu_text(translated_text, allergies_list)
+        analysis_result = await ai_engine.analyze_menu_text_async(translated_text, allergies_list)
 
         return JSONResponse(status_code=200, content={
             "success": True,
@@ -344,6 +369,8 @@ async def analyze_menu_image(
             "timestamp": datetime.now().isoformat()
         })
 
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         logger.error(f"이미지 분석 중 오류: {e}")
@@ -359,6 +386,7 @@ async def batch_analyze_menus(
     try:
         logger.info(f"일괄 분석 요청: {len(menu_texts)}개 메뉴")
         
+        ai_engine = current_engine()
         if ai_engine is None:
             raise HTTPException(status_code=500, detail="AI 엔진이 초기화되지 않았습니다")
         
@@ -385,6 +413,7 @@ async def find_similar_menus(
     try:
         logger.info(f"유사 메뉴 검색: {query}")
         
+        ai_engine = current_engine()
         if ai_engine is None:
             raise HTTPException(status_code=500, detail="AI 엔진이 초기화되지 않았습니다")
         
@@ -419,6 +448,7 @@ async def find_safe_menus(
     try:
         logger.info(f"안전 메뉴 검색: {user_allergies}")
         
+        ai_engine = current_engine()
         if ai_engine is None:
             raise HTTPException(status_code=500, detail="AI 엔진이 초기화되지 않았습니다")
         
@@ -445,6 +475,7 @@ async def check_ingredient_risk(
     try:
         logger.info(f"성분 위험도 체크: {ingredients} vs {user_allergies}")
         
+        ai_engine = current_engine()
         if ai_engine is None:
             raise HTTPException(status_code=500, detail="AI 엔진이 초기화되지 않았습니다")
         
@@ -464,6 +495,7 @@ async def check_ingredient_risk(
 async def get_model_status():
     """AI 모델 상태 확인"""
     try:
+        ai_engine = current_engine()
         if ai_engine is None:
             return {
                 "success": False,
@@ -476,6 +508,7 @@ async def get_model_status():
         return {
             "success": True,
             "model_status": status,
+            "bundles": model_bundles.get_status(),
             "timestamp": datetime.now().isoformat()
         }
         
@@ -485,44 +518,116 @@ async def get_model_status():
 
 @app.post("/retrain-models")
 async def retrain_models():
-    """모든 AI 모델 재훈련"""
+    """모든 AI 모델 재훈련 (백그라운드 작업으로 시작하고 작업 ID 반환)"""
     try:
         logger.info("모델 재훈련 시작")
         
-        if ai_engine is None:
+        if model_bundles is None:
+            raise HTTPException(status_code=500, detail="AI 엔진이 초기화되지 않았습니다")
+        
+        job = model_bundles.start_retrain()
+        
+        return JSONResponse(status_code=202, content={
+            "success": True,
+            "job": job.to_dict(),
+            "timestamp": datetime.now().isoformat()
+        })
+        
+    except RetrainInProgressError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"모델 재훈련 중 오류: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/retrain-models/{job_id}")
+async def get_retrain_job(job_id: str):
+    """재훈련 작업 상태 확인"""
+    job = model_bundles.get_job(job_id) if model_bundles else None
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"재훈련 작업을 찾을 수 없습니다: {job_id}")
+    
+    return {
+        "success": True,
+        "job": job.to_dict(),
+        "timestamp": datetime.now().isoformat()
+    }
+
+@app.post("/models/rollback")
+async def rollback_models():
+    """직전 모델 번들로 롤백"""
+    try:
+        if model_bundles is None:
             raise HTTPException(status_code=500, detail="AI 엔진이 초기화되지 않았습니다")
         
-        results = ai_engine.retrain_models()
+        version = model_bundles.rollback()
+        logger.info(f"모델 번들 롤백: {version}")
         
         return {
             "success": True,
-            "training_results": results,
+            "current_version": version,
+            "bundles": model_bundles.get_status(),
             "timestamp": datetime.now().isoformat()
         }
         
+    except NoPreviousBundleError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except HTTPException:
+        raise
     except Exception as e:
-        logger.error(f"모델 재훈련 중 오류: {e}")
+        logger.error(f"모델 롤백 중 오류: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+# 자동완성 응답 브라우저 캐시 시간 (초)
+SUGGESTIONS_MAX_AGE = int(os.getenv("INGREDIENT_SUGGESTIONS_MAX_AGE", "300"))
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더에 ETag가 있는지 (약한 비교)"""
+    if not if_none_match:
+        return False
+    def strip_weak(tag: str) -> str:
+        return tag[2:] if tag.startswith("W/") else tag
+
+    candidates = [strip_weak(tag.strip()) for tag in if_none_match.split(",")]
+    return "*" in candidates or strip_weak(etag) in candidates
+
 @app.get("/ingredient-suggestions")
 async def get_ingredient_suggestions(
     partial_ingredient: str,
-    top_k: int = 5
+    top_k: int = 5,
+    if_none_match: Optional[str] = Header(None)
 ):
-    """성분명 자동완성"""
+    """
+    성분명 자동완성
+    같은 입력은 자동완성 인덱스가 바뀌지 않는 한 결과가 같으므로 ETag/Cache-Control을 붙여
+    브라우저가 반복되는 접두사를 캐시하거나 304로 재검증하게 합니다. (본문의 timestamp는 제외하므로 약한 ETag)
+    """
     try:
+        ai_engine = current_engine()
         if ai_engine is None:
             raise HTTPException(status_code=500, detail="AI 엔진이 초기화되지 않았습니다")
         
-        suggestions = ai_engine.ingredient_matcher.get_ingredient_suggestions(partial_ingredient, top_k)
+        matcher = ai_engine.ingredient_matcher
+        suggestions = matcher.get_ingredient_suggestions(partial_ingredient, top_k)
         
-        return {
+        key = f"{matcher.suggestion_version}\0{matcher.suggestion_key(partial_ingredient)}\0{top_k}"
+        headers = {
+            "ETag": f'W/"{hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]}"',
+            "Cache-Control": f"public, max-age={SUGGESTIONS_MAX_AGE}"
+        }
+        if etag_matches(if_none_match, headers["ETag"]):
+            return Response(status_code=304, headers=headers)
+        
+        return JSONResponse(content={
             "success": True,
             "suggestions": suggestions,
             "query": partial_ingredient,
             "timestamp": datetime.now().isoformat()
-        }
+        }, headers=headers)
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"성분 자동완성 중 오류: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,81 @@
+from collections import deque
+from typing import Any, Dict, Iterator, List, Tuple
+
+
+class AhoCorasick:
+    """
+    다중 패턴 문자열 매칭 (Aho–Corasick 오토마톤)
+
+    패턴을 모두 추가한 뒤 build()를 한 번 호출하면,
+    텍스트 길이에 비례하는 한 번의 스캔으로 모든 패턴의 출현 위치를 찾습니다.
+    """
+
+    def __init__(self):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[Tuple[int, Any]]] = [[]]  # (패턴 길이, 값)
+        self._built = False
+        self.pattern_count = 0
+
+    def add(self, pattern: str, value: Any):
+        """패턴 추가 (build 전에만 가능)"""
+        if self._built:
+            raise RuntimeError("build() 이후에는 패턴을 추가할 수 없습니다")
+        if not pattern:
+            return
+
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+            state = next_state
+
+        self._output[state].append((len(pattern), value))
+        self.pattern_count += 1
+
+    def build(self) -> "AhoCorasick":
+        """실패 링크 계산 (BFS)"""
+        queue = deque()
+        for next_state in self._goto[0].values():
+            self._fail[next_state] = 0
+            queue.append(next_state)
+
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                if self._fail[next_state] == next_state:
+                    self._fail[next_state] = 0
+
+                # 실패 링크의 출력도 함께 보고되도록 병합
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+        self._built = True
+        return self
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, Any]]:
+        """텍스트에서 모든 (시작, 끝, 값) 매칭을 끝 위치 순서로 반환"""
+        if not self._built:
+            self.build()
+
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for length, value in output[state]:
+                yield end - length, end, value
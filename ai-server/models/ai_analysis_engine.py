@@ -1,20 +1,48 @@
 import json
+import asyncio
 import logging
-from typing import List, Dict, Optional
+from functools import partial
+from typing import Callable, List, Dict, Optional, Tuple
 from pathlib import Path
 
+from utils.metrics import metrics
+from utils.analysis_cache import AnalysisCache, allergy_key, analysis_cache
+from utils.text_normalization import NormalizedText, canonical_text
+from utils.stage_runner import StageRunner, StageTimeoutError, stage_runner
+
 # AI 모델들 import
 from .menu_classifier import MenuClassifier
 from .allergy_risk_predictor import AllergyRiskPredictor
 from .menu_similarity import MenuSimilarityModel
 from .ingredient_matcher import IngredientMatcher
 
+# 분석 단계 (결과 키 → 로그용 이름, 단계 실행기의 시간 제한도 이 키 기준)
+STAGE_LABELS = {
+    "menu_classification": "메뉴 분류",
+    "similar_menus": "유사 메뉴 검색",
+    "ingredient_analysis": "성분 추출",
+    "allergy_risk": "알레르기 위험도 분석",
+    "recommendations": "추천 생성"
+}
+
 class AIAnalysisEngine:
-    def __init__(self):
-        self.menu_classifier = MenuClassifier()
-        self.allergy_predictor = AllergyRiskPredictor()
-        self.similarity_model = MenuSimilarityModel()
-        self.ingredient_matcher = IngredientMatcher()
+    def __init__(self, model_dir: str = 'models', version: str = 'base', cache: Optional[AnalysisCache] = None,
+                 runner: Optional[StageRunner] = None):
+        """
+        Args:
+            model_dir: 모델 파일 디렉토리
+            version: 모델 번들 버전 (재훈련 시마다 새 디렉토리/버전으로 로드)
+            cache: 분석 결과 캐시 (기본: 프로세스 전역 캐시, 키에 version이 포함됨)
+            runner: analyze_menu_text_async의 단계 실행기 (기본: 프로세스 전역 실행기)
+        """
+        self.model_dir = model_dir
+        self.version = version
+        self.cache = cache if cache is not None else analysis_cache
+        self.stage_runner = runner if runner is not None else stage_runner
+        self.menu_classifier = MenuClassifier(model_dir)
+        self.allergy_predictor = AllergyRiskPredictor(model_dir)
+        self.similarity_model = MenuSimilarityModel(model_dir)
+        self.ingredient_matcher = IngredientMatcher(model_dir)
         
         # 로깅 설정
         logging.basicConfig(level=logging.INFO)
@@ -47,7 +75,12 @@ class AIAnalysisEngine:
             return False
     
     def analyze_menu_text(self, menu_text: str, user_allergies: List[str] = None) -> Dict:
-        """메뉴 텍스트 종합 분석"""
+        """
+        메뉴 텍스트 종합 분석
+        
+        결과는 (정규화된 텍스트, 알레르기 목록, 모델 버전) 기준으로 캐시되며,
+        알레르기와 무관한 단계(분류, 유사 메뉴, 성분 추출)는 텍스트 기준으로 따로 캐시됩니다.
+        """
         try:
             self.logger.info(f"메뉴 텍스트 분석 시작: {menu_text[:50]}...")
             
@@ -56,84 +89,216 @@ class AIAnalysisEngine:
                 if not self.load_all_models():
                     return {"error": "AI 모델 로드 실패"}
             
-            results = {
-                "input_text": menu_text,
-                "analysis_timestamp": None,
-                "menu_classification": None,
-                "allergy_risk": None,
-                "similar_menus": None,
-                "ingredient_analysis": None,
-                "recommendations": None
-            }
+            normalized_text, allergies, cached = self._lookup_result(menu_text, user_allergies)
+            if cached is not None:
+                return cached
+            user_allergies = list(allergies)
+            results = self._empty_result(menu_text)
             
-            # 1. 메뉴 분류
-            self.logger.info("메뉴 분류 시작...")
-            try:
-                classification = self.menu_classifier.predict(menu_text)
-                results["menu_classification"] = classification
-                self.logger.info(f"메뉴 분류 완료: {classification}")
-            except Exception as e:
-                self.logger.error(f"메뉴 분류 오류: {e}")
-                results["menu_classification"] = {"error": str(e)}
-            
-            # 2. 유사한 메뉴 찾기
-            self.logger.info("유사 메뉴 검색 시작...")
-            try:
-                similar_menus = self.similarity_model.find_similar_menus(menu_text, top_k=5)
-                results["similar_menus"] = similar_menus
-                self.logger.info(f"유사 메뉴 검색 완료: {len(similar_menus)}개 발견")
-            except Exception as e:
-                self.logger.error(f"유사 메뉴 검색 오류: {e}")
-                results["similar_menus"] = []
-            
-            # 3. 성분 추출 및 분석
-            self.logger.info("성분 추출 시작...")
-            try:
-                extracted_ingredients = self.ingredient_matcher.extract_ingredients_from_text(menu_text)
-                results["ingredient_analysis"] = {
-                    "extracted_ingredients": extracted_ingredients,
-                    "ingredient_count": len(extracted_ingredients)
-                }
-                self.logger.info(f"성분 추출 완료: {len(extracted_ingredients)}개 성분")
-            except Exception as e:
-                self.logger.error(f"성분 추출 오류: {e}")
-                results["ingredient_analysis"] = {
-                    "extracted_ingredients": [],
-                    "ingredient_count": 0,
-                    "error": str(e)
-                }
+            # 1 ~ 3. 알레르기와 무관한 단계 (텍스트 기준 캐시)
+            failed = False
+            stages = self.cache.get_text_stages(normalized_text, self.version)
+            if stages is None:
+                # 정제/토큰화는 여기서 한 번만 하고 모든 단계가 재사용
+                stages = self._analyze_text_stages(NormalizedText(normalized_text))
+                failed = stages.pop("failed")
+                if not failed:
+                    self.cache.put_text_stages(normalized_text, self.version, stages)
+            results.update(stages)
+            extracted_ingredients = stages["ingredient_analysis"]["extracted_ingredients"]
             
             # 4. 알레르기 위험도 분석
             if user_allergies and extracted_ingredients:
                 self.logger.info("알레르기 위험도 분석 시작...")
                 try:
-                    allergy_risk = self.allergy_predictor.predict_risk(extracted_ingredients, user_allergies)
-                    ingredient_risk = self.ingredient_matcher.check_allergy_risk(extracted_ingredients, user_allergies)
-                    
-                    results["allergy_risk"] = {
-                        "ml_prediction": allergy_risk,
-                        "rule_based_analysis": ingredient_risk,
-                        "final_risk_level": self._determine_final_risk(allergy_risk, ingredient_risk)
-                    }
+                    results["allergy_risk"] = self._analyze_allergy_risk(extracted_ingredients, user_allergies)
                     self.logger.info(f"알레르기 위험도 분석 완료: {results['allergy_risk']['final_risk_level']}")
                 except Exception as e:
                     self.logger.error(f"알레르기 위험도 분석 오류: {e}")
-                    results["allergy_risk"] = {
-                        "error": str(e),
-                        "final_risk_level": "unknown"
-                    }
+                    failed = True
+                    results["allergy_risk"] = self._failed_stage("allergy_risk", str(e))
             
             # 5. 추천 시스템
             if user_allergies:
-                recommendations = self._generate_recommendations(menu_text, user_allergies, extracted_ingredients)
+                recommendations = self._generate_recommendations(normalized_text, user_allergies, extracted_ingredients)
                 results["recommendations"] = recommendations
             
+            # 일시적인 오류 결과는 캐시하지 않음
+            if not failed:
+                self.cache.put_result(normalized_text, allergies, self.version, results)
             return results
             
         except Exception as e:
             self.logger.error(f"메뉴 분석 중 오류: {e}")
             return {"error": f"분석 실패: {str(e)}"}
     
+    async def analyze_menu_text_async(self, menu_text: str, user_allergies: List[str] = None) -> Dict:
+        """
+        메뉴 텍스트 종합 분석 (비동기)
+        
+        서로 독립적인 분류/유사 메뉴/성분 추출 단계를 단계 실행기에서 동시에 실행하고,
+        모두 끝나면 위험도 분석과 추천을 (역시 동시에) 실행합니다.
+        단계가 시간 제한을 넘기거나 실패하면 그 단계만 기본값으로 채운 부분 결과를 반환하며,
+        시간 제한을 넘긴 단계는 partial_stages에 남깁니다. (부분 결과는 캐시하지 않음)
+        결과 형식과 캐시는 analyze_menu_text와 같습니다.
+        """
+        try:
+            self.logger.info(f"메뉴 텍스트 분석 시작: {menu_text[:50]}...")
+            
+            if not self.models_loaded:
+                self.logger.warning("모델이 로드되지 않았습니다. 모델을 다시 로드합니다.")
+                if not await asyncio.to_thread(self.load_all_models):
+                    return {"error": "AI 모델 로드 실패"}
+            
+            normalized_text, allergies, cached = self._lookup_result(menu_text, user_allergies)
+            if cached is not None:
+                return cached
+            user_allergies = list(allergies)
+            results = self._empty_result(menu_text)
+            
+            failed = False
+            timed_out = set()
+            
+            async def run_stage(key: str, func, *args):
+                nonlocal failed
+                try:
+                    return await self.stage_runner.run(key, func, *args)
+                except StageTimeoutError as e:
+                    timed_out.add(key)
+                    error = str(e)
+                except Exception as e:
+                    error = str(e)
+                self.logger.error(f"{STAGE_LABELS[key]} 오류: {error}")
+                failed = True
+                return self._failed_stage(key, error)
+            
+            # 1 ~ 3. 알레르기와 무관한 단계 동시 실행 (텍스트 기준 캐시)
+            stages = self.cache.get_text_stages(normalized_text, self.version)
+            if stages is None:
+                stage_funcs = self._text_stage_funcs(NormalizedText(normalized_text))
+                values = await asyncio.gather(*(run_stage(key, func) for key, func in stage_funcs.items()))
+                stages = dict(zip(stage_funcs, values))
+                if not failed:
+                    self.cache.put_text_stages(normalized_text, self.version, stages)
+            results.update(stages)
+            extracted_ingredients = stages["ingredient_analysis"]["extracted_ingredients"]
+            
+            # 4 ~ 5. 알레르기 위험도 분석과 추천은 서로 독립적이라 함께 실행
+            if user_allergies:
+                if "ingredient_analysis" in timed_out:
+                    # 성분을 모르는 채로 위험 없음으로 보이지 않도록 위험도를 unknown으로 표시
+                    allergy_risk = self._failed_stage("allergy_risk", "성분 추출 시간 초과로 위험도를 판단할 수 없습니다")
+                    recommendations = await run_stage("recommendations", self._generate_recommendations,
+                                                      normalized_text, user_allergies, extracted_ingredients)
+                elif extracted_ingredients:
+                    allergy_risk, recommendations = await asyncio.gather(
+                        run_stage("allergy_risk", self._analyze_allergy_risk, extracted_ingredients, user_allergies),
+                        run_stage("recommendations", self._generate_recommendations,
+                                  normalized_text, user_allergies, extracted_ingredients)
+                    )
+                else:
+                    allergy_risk = None
+                    recommendations = await run_stage("recommendations", self._generate_recommendations,
+                                                      normalized_text, user_allergies, extracted_ingredients)
+                results["allergy_risk"] = allergy_risk
+                results["recommendations"] = recommendations
+            
+            if timed_out:
+                results["partial_stages"] = [key for key in STAGE_LABELS if key in timed_out]
+            
+            # 일시적인 오류/부분 결과는 캐시하지 않음
+            if not failed:
+                self.cache.put_result(normalized_text, allergies, self.version, results)
+            return results
+            
+        except Exception as e:
+            self.logger.error(f"메뉴 분석 중 오류: {e}")
+            return {"error": f"분석 실패: {str(e)}"}
+    
+    def _lookup_result(self, menu_text: str, user_allergies: Optional[List[str]]) -> Tuple[str, Tuple[str, ...], Optional[Dict]]:
+        """(정규화된 텍스트, 알레르기 키, 캐시된 결과 또는 None)"""
+        # 캐시 키와 같은 값으로 분석해야 캐시된 결과와 새로 계산한 결과가 같음
+        normalized_text = canonical_text(menu_text)
+        allergies = allergy_key(user_allergies)
+        
+        cached = self.cache.get_result(normalized_text, allergies, self.version)
+        if cached is not None:
+            cached["input_text"] = menu_text
+        return normalized_text, allergies, cached
+    
+    def _empty_result(self, menu_text: str) -> Dict:
+        return {
+            "input_text": menu_text,
+            "analysis_timestamp": None,
+            "menu_classification": None,
+            "allergy_risk": None,
+            "similar_menus": None,
+            "ingredient_analysis": None,
+            "recommendations": None
+        }
+    
+    def _text_stage_funcs(self, menu_text: NormalizedText) -> Dict[str, Callable[[], object]]:
+        """알레르기와 무관한 단계 (결과 키 → 실행 함수)"""
+        return {
+            "menu_classification": partial(self.menu_classifier.predict, menu_text),
+            "similar_menus": partial(self.similarity_model.find_similar_menus, menu_text, top_k=5),
+            "ingredient_analysis": partial(self._extract_ingredients, menu_text)
+        }
+    
+    def _analyze_text_stages(self, menu_text: NormalizedText) -> Dict:
+        """알레르기와 무관한 분석 단계 순서대로 실행 (메뉴 분류, 유사 메뉴, 성분 추출, failed: 단계 오류 여부)"""
+        results = {"failed": False}
+        
+        for key, func in self._text_stage_funcs(menu_text).items():
+            self.logger.info(f"{STAGE_LABELS[key]} 시작...")
+            try:
+                results[key] = func()
+                self.logger.info(f"{STAGE_LABELS[key]} 완료")
+            except Exception as e:
+                self.logger.error(f"{STAGE_LABELS[key]} 오류: {e}")
+                results["failed"] = True
+                results[key] = self._failed_stage(key, str(e))
+        
+        return results
+    
+    def _extract_ingredients(self, menu_text: NormalizedText) -> Dict:
+        """성분 추출 단계 (INGREDIENT_FUZZY_MATCHING이면 정확 매칭 뒤 근사 매칭 결과를 신뢰도와 함께 추가)"""
+        matcher = self.ingredient_matcher
+        extracted_ingredients = matcher.extract_ingredients_from_text(menu_text)
+        analysis = {}
+        if matcher.fuzzy_matching:
+            fuzzy_matches = matcher.find_fuzzy_matches(menu_text, exclude=extracted_ingredients)
+            extracted_ingredients = extracted_ingredients + [match['ingredient'] for match in fuzzy_matches]
+            analysis["fuzzy_matches"] = fuzzy_matches
+        return {
+            "extracted_ingredients": extracted_ingredients,
+            "ingredient_count": len(extracted_ingredients),
+            **analysis
+        }
+    
+    def _analyze_allergy_risk(self, extracted_ingredients: List[str], user_allergies: List[str]) -> Dict:
+        """알레르기 위험도 분석 단계 (ML 예측 + 규칙 기반 분석)"""
+        allergy_risk = self.allergy_predictor.predict_risk(extracted_ingredients, user_allergies)
+        ingredient_risk = self.ingredient_matcher.check_allergy_risk(extracted_ingredients, user_allergies)
+        
+        return {
+            "ml_prediction": allergy_risk,
+            "rule_based_analysis": ingredient_risk,
+            "final_risk_level": self._determine_final_risk(allergy_risk, ingredient_risk)
+        }
+    
+    def _failed_stage(self, key: str, error: str):
+        """실패하거나 시간 제한을 넘긴 단계의 기본 결과"""
+        if key == "similar_menus":
+            return []
+        if key == "ingredient_analysis":
+            return {"extracted_ingredients": [], "ingredient_count": 0, "error": error}
+        if key == "allergy_risk":
+            return {"error": error, "final_risk_level": "unknown"}
+        if key == "recommendations":
+            return {"safe_alternatives": [], "warning_messages": [], "safety_tips": [], "error": error}
+        return {"error": error}
+    
     def _determine_final_risk(self, ml_risk: Dict, rule_risk: Dict) -> str:
         """ML 예측과 규칙 기반 분석을 결합한 최종 위험도 결정"""
         if not ml_risk or not rule_risk:
@@ -164,8 +329,10 @@ class AIAnalysisEngine:
         
         return "unknown"
     
-    def _generate_recommendations(self, menu_text: str, user_allergies: List[str], extracted_ingredients: List[str]) -> Dict:
-        """개인화된 추천 생성"""
+    @metrics.timed("recommendations")
+    def _generate_recommendations(self, menu_text: str, user_allergies: List[str], extracted_ingredients: List[str],
+                                  safe_menus: Optional[List[Dict]] = None) -> Dict:
+        """개인화된 추천 생성 (safe_menus를 넘기면 안전 메뉴 검색 생략)"""
         recommendations = {
             "safe_alternatives": [],
             "warning_messages": [],
@@ -173,7 +340,8 @@ class AIAnalysisEngine:
         }
         
         # 1. 안전한 대안 메뉴 찾기
-        safe_menus = self.similarity_model.find_safe_menus(user_allergies, top_k=5)
+        if safe_menus is None:
+            safe_menus = self.similarity_model.find_safe_menus(user_allergies, top_k=5)
         recommendations["safe_alternatives"] = safe_menus
         
         # 2. 경고 메시지 생성
@@ -206,21 +374,120 @@ class AIAnalysisEngine:
         return recommendations
     
     def batch_analyze_menus(self, menu_texts: List[str], user_allergies: List[str] = None) -> List[Dict]:
-        """여러 메뉴 일괄 분석"""
-        results = []
+        """
+        여러 메뉴 일괄 분석
+        
+        메뉴마다 analyze_menu_text를 호출하지 않고, 단계별로 전체 메뉴를 한 번에 처리한 뒤
+        메뉴별 결과를 조립합니다. (TF-IDF 변환 / 유사도 행렬 곱 / 분류기 호출이 각각 1회)
+        """
+        if not menu_texts:
+            return []
+        
+        if not self.models_loaded:
+            self.logger.warning("모델이 로드되지 않았습니다. 모델을 다시 로드합니다.")
+            if not self.load_all_models():
+                return [{"error": "AI 모델 로드 실패", "menu_index": i} for i in range(len(menu_texts))]
+        
+        # analyze_menu_text와 같은 입력 (중복 제거, 요청 순서 유지)
+        user_allergies = list(allergy_key(user_allergies))
+        
+        total = len(menu_texts)
+        self.logger.info(f"메뉴 {total}개 일괄 분석 시작...")
+        
+        # 메뉴마다 정제/토큰화를 한 번만 하고 모든 단계가 재사용
+        documents = [NormalizedText(menu_text) for menu_text in menu_texts]
+        
+        # 1. 메뉴 분류 (일괄)
+        try:
+            classifications = self.menu_classifier.predict_batch(documents)
+        except Exception as e:
+            self.logger.error(f"메뉴 일괄 분류 오류: {e}")
+            classifications = [{"error": str(e)} for _ in range(total)]
         
+        # 2. 유사한 메뉴 찾기 (일괄)
+        try:
+            similar_menus = self.similarity_model.find_similar_menus_batch(documents, top_k=5)
+        except Exception as e:
+            self.logger.error(f"유사 메뉴 일괄 검색 오류: {e}")
+            similar_menus = [[] for _ in range(total)]
+        
+        # 3. 성분 추출 (규칙 기반, 메뉴별)
+        extracted = []
+        ingredient_analyses = []
+        for document in documents:
+            try:
+                ingredient_analysis = self._extract_ingredients(document)
+                ingredients = ingredient_analysis["extracted_ingredients"]
+                ingredient_analyses.append(ingredient_analysis)
+            except Exception as e:
+                self.logger.error(f"성분 추출 오류: {e}")
+                ingredients = []
+                ingredient_analyses.append({
+                    "extracted_ingredients": [],
+                    "ingredient_count": 0,
+                    "error": str(e)
+                })
+            extracted.append(ingredients)
+        
+        # 4. 알레르기 위험도 분석 (성분이 추출된 메뉴만 일괄 예측)
+        allergy_risks = [None] * total
+        if user_allergies:
+            risk_indices = [i for i, ingredients in enumerate(extracted) if ingredients]
+            try:
+                ml_predictions = self.allergy_predictor.predict_risk_batch(
+                    [extracted[i] for i in risk_indices], user_allergies
+                )
+            except Exception as e:
+                self.logger.error(f"알레르기 위험도 일괄 예측 오류: {e}")
+                ml_predictions = None
+                for i in risk_indices:
+                    allergy_risks[i] = {"error": str(e), "final_risk_level": "unknown"}
+            
+            if ml_predictions is not None:
+                for i, allergy_risk in zip(risk_indices, ml_predictions):
+                    try:
+                        ingredient_risk = self.ingredient_matcher.check_allergy_risk(extracted[i], user_allergies)
+                        allergy_risks[i] = {
+                            "ml_prediction": allergy_risk,
+                            "rule_based_analysis": ingredient_risk,
+                            "final_risk_level": self._determine_final_risk(allergy_risk, ingredient_risk)
+                        }
+                    except Exception as e:
+                        self.logger.error(f"알레르기 위험도 분석 오류: {e}")
+                        allergy_risks[i] = {"error": str(e), "final_risk_level": "unknown"}
+        
+        # 5. 추천 (안전 메뉴는 알레르기 목록에만 의존하므로 1회만 검색)
+        safe_menus = None
+        if user_allergies:
+            safe_menus = self.similarity_model.find_safe_menus(user_allergies, top_k=5)
+        
+        # 메뉴별 결과 조립
+        results = []
         for i, menu_text in enumerate(menu_texts):
-            self.logger.info(f"메뉴 {i+1}/{len(menu_texts)} 분석 중...")
-            result = self.analyze_menu_text(menu_text, user_allergies)
+            result = {
+                "input_text": menu_text,
+                "analysis_timestamp": None,
+                "menu_classification": classifications[i],
+                "allergy_risk": allergy_risks[i],
+                "similar_menus": similar_menus[i],
+                "ingredient_analysis": ingredient_analyses[i],
+                "recommendations": None
+            }
+            if user_allergies:
+                result["recommendations"] = self._generate_recommendations(
+                    menu_text, user_allergies, extracted[i], safe_menus=safe_menus
+                )
             result["menu_index"] = i
             results.append(result)
         
+        self.logger.info(f"메뉴 {total}개 일괄 분석 완료")
         return results
     
     def get_model_status(self) -> Dict:
         """모델 상태 확인"""
         return {
             "models_loaded": self.models_loaded,
+            "version": self.version,
             "menu_classifier": hasattr(self.menu_classifier, 'classifier'),
             "allergy_predictor": hasattr(self.allergy_predictor, 'classifier'),
             "similarity_model": hasattr(self.similarity_model, 'vectorizer'),
@@ -237,8 +504,9 @@ class AIAnalysisEngine:
             results["allergy_predictor"] = self.allergy_predictor.train()
             results["similarity_model"] = self.similarity_model.train()
             
-            # 모델 다시 로드
+            # 모델 다시 로드 (같은 버전으로 캐시된 분석 결과는 이전 모델 기준이므로 무효화)
             self.load_all_models()
+            self.cache.invalidate(self.version)
             
             return results
             
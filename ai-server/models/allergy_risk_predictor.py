@@ -1,17 +1,25 @@
-import numpy as np
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.ensemble import RandomForestClassifier
 import joblib
-import json
-import re
+import os
 from typing import Dict, List, Optional
 
+from utils.metrics import metrics
+from utils.compiled_forest import CompiledForest
+from utils.hashing_vectorizer import make_vectorizer, vectorizer_mode
+from utils.text_normalization import clean_text, tfidf_transform
+from .menu_catalog import get_menu_catalog
+
 class AllergyRiskPredictor:
-    def __init__(self):
-        self.vectorizer = TfidfVectorizer(
-            max_features=500,
+    def __init__(self, model_dir: str = 'models', vectorizer: Optional[str] = None):
+        """
+        Args:
+            model_dir: 모델 파일 디렉토리
+            vectorizer: 훈련에 사용할 벡터라이저 ('tfidf' 또는 'hashing', 기본: ALLERGY_RISK_VECTORIZER 환경 변수)
+        """
+        self.vectorizer = make_vectorizer(
+            vectorizer or vectorizer_mode('ALLERGY_RISK_VECTORIZER'),
             ngram_range=(1, 2),
+            max_features=500,
             min_df=1
         )
         self.classifier = RandomForestClassifier(
@@ -19,28 +27,30 @@ class AllergyRiskPredictor:
             random_state=42,
             max_depth=10
         )
-        self.model_path = 'models/allergy_risk_predictor.pkl'
-        self.vectorizer_path = 'models/allergy_risk_vectorizer.pkl'
+        # 추론 시 포레스트를 NumPy 노드 배열로 평탄화해 사용 (sklearn 결과와 일치할 때만)
+        self.use_compiled_forest = os.getenv("ALLERGY_RISK_COMPILED_FOREST", "true").strip().lower() not in (
+            "0", "false", "no", "off"
+        )
+        self.compiled_forest = None
+        self.model_path = os.path.join(model_dir, 'allergy_risk_predictor.pkl')
+        self.vectorizer_path = os.path.join(model_dir, 'allergy_risk_vectorizer.pkl')
+        self.label_encoder_path = os.path.join(model_dir, 'allergy_risk_label_encoder.pkl')
         
     def preprocess_text(self, text: str) -> str:
-        """텍스트 전처리"""
-        text = re.sub(r'[^가-힣a-zA-Z0-9\s]', '', text)
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text.lower()
+        """텍스트 전처리 (한글, 영어, 숫자만 남기고 공백 정리 후 소문자화)"""
+        return clean_text(text)
     
     def create_training_data(self):
         """훈련 데이터 생성"""
-        with open('data/datasets/cafe_menu_dataset.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        catalog = get_menu_catalog()
         
         training_data = []
         
         # 알레르기 카테고리별 위험도 매핑
-        allergen_categories = data.get('allergen_categories', {})
+        allergen_categories = catalog.allergen_categories
         
-        for menu in data['cafe_beverages']:
-            ingredients = menu.get('ingredients', [])
-            allergens = menu.get('allergens', [])
+        for menu in catalog:
+            ingredients = menu.ingredients
             
             # 각 알레르기 카테고리에 대해 훈련 데이터 생성
             for category_key, category_info in allergen_categories.items():
@@ -100,11 +110,13 @@ class AllergyRiskPredictor:
         
         # 모델 훈련
         self.classifier.fit(X, y)
+        self.label_encoder = label_encoder
+        self.compile_forest(X)
         
         # 모델 저장
         joblib.dump(self.classifier, self.model_path)
         joblib.dump(self.vectorizer, self.vectorizer_path)
-        joblib.dump(label_encoder, 'models/allergy_risk_label_encoder.pkl')
+        joblib.dump(label_encoder, self.label_encoder_path)
         
         print(f"모델이 {self.model_path}에 저장되었습니다.")
         print(f"총 {len(training_data)}개의 훈련 데이터로 훈련 완료")
@@ -115,12 +127,47 @@ class AllergyRiskPredictor:
         try:
             self.classifier = joblib.load(self.model_path)
             self.vectorizer = joblib.load(self.vectorizer_path)
-            self.label_encoder = joblib.load('models/allergy_risk_label_encoder.pkl')
+            self.label_encoder = joblib.load(self.label_encoder_path)
+            self.compile_forest()
             return True
         except FileNotFoundError:
             print("저장된 모델을 찾을 수 없습니다. 모델을 훈련해주세요.")
             return False
     
+    def compile_forest(self, X=None) -> bool:
+        """
+        포레스트 평탄화 후 sklearn 결과와 비교 (X가 없으면 데이터셋 성분 목록으로 확인)
+        일치하지 않거나 실패하면 sklearn predict_proba를 그대로 사용합니다.
+        """
+        self.compiled_forest = None
+        self._class_labels = self.label_encoder.inverse_transform(self.classifier.classes_)
+        if not self.use_compiled_forest:
+            return False
+        
+        try:
+            if X is None:
+                texts = [' '.join(menu.ingredients) for menu in get_menu_catalog() if menu.ingredients]
+                X = tfidf_transform(self.vectorizer, texts[:256])
+            compiled = CompiledForest.from_sklearn(self.classifier)
+            if not compiled.verify(self.classifier, X):
+                print("컴파일된 포레스트 결과가 sklearn과 달라 sklearn 추론을 사용합니다.")
+                return False
+        except Exception as e:
+            print(f"포레스트 컴파일 실패, sklearn 추론을 사용합니다: {e}")
+            return False
+        
+        self.compiled_forest = compiled
+        return True
+    
+    def _predict_base_risks(self, X):
+        """확률 한 번으로 기본 위험도 라벨과 신뢰도 계산 (predict + predict_proba로 트리를 두 번 돌지 않음)"""
+        if self.compiled_forest is not None:
+            probabilities = self.compiled_forest.predict_proba(X)
+        else:
+            probabilities = self.classifier.predict_proba(X)
+        return self._class_labels[probabilities.argmax(axis=1)], probabilities.max(axis=1)
+    
+    @metrics.timed("risk_prediction")
     def predict_risk(self, ingredients: List[str], user_allergies: List[str]) -> Optional[Dict]:
         """알레르기 위험도 예측"""
         if not hasattr(self, 'classifier') or not hasattr(self, 'vectorizer'):
@@ -129,30 +176,53 @@ class AllergyRiskPredictor:
         
         # 성분 텍스트 생성
         ingredient_text = ' '.join(ingredients)
-        processed_text = self.preprocess_text(ingredient_text)
         
         # TF-IDF 벡터화
-        X = self.vectorizer.transform([processed_text])
+        X = tfidf_transform(self.vectorizer, [ingredient_text])
         
         # 예측
-        prediction = self.classifier.predict(X)[0]
-        confidence = self.classifier.predict_proba(X).max()
+        base_risks, confidences = self._predict_base_risks(X)
+        base_risk, confidence = base_risks[0], confidences[0]
         
         # 위험도 조정 (사용자 알레르기 고려)
-        final_risk = self._adjust_risk_based_on_user_allergies(
-            self.label_encoder.inverse_transform([prediction])[0],
-            ingredients,
-            user_allergies
-        )
+        final_risk = self._adjust_risk_based_on_user_allergies(base_risk, ingredients, user_allergies)
         
         return {
             'final_risk': final_risk,
             'confidence': confidence,
             'ingredients': ingredients,
             'user_allergies': user_allergies,
-            'base_prediction': self.label_encoder.inverse_transform([prediction])[0]
+            'base_prediction': base_risk
         }
     
+    @metrics.timed("risk_prediction_batch")
+    def predict_risk_batch(self, ingredient_lists: List[List[str]], user_allergies: List[str]) -> List[Optional[Dict]]:
+        """여러 성분 목록의 알레르기 위험도 일괄 예측 (벡터화/예측 1회)"""
+        if not ingredient_lists:
+            return []
+        
+        if not hasattr(self, 'classifier') or not hasattr(self, 'vectorizer'):
+            if not self.load_model():
+                return [None] * len(ingredient_lists)
+        
+        # 전체 성분 텍스트를 한 번에 벡터화
+        X = tfidf_transform(self.vectorizer, [' '.join(ingredients) for ingredients in ingredient_lists])
+        
+        # 예측
+        base_risks, confidences = self._predict_base_risks(X)
+        
+        results = []
+        for ingredients, base_risk, confidence in zip(ingredient_lists, base_risks, confidences):
+            results.append({
+                'final_risk': self._adjust_risk_based_on_user_allergies(base_risk, ingredients, user_allergies),
+                'confidence': confidence,
+                'ingredients': ingredients,
+                'user_allergies': user_allergies,
+                'base_prediction': base_risk
+            })
+        
+        return results
+    
     def _adjust_risk_based_on_user_allergies(self, base_risk: str, ingredients: List[str], user_allergies: List[str]) -> str:
         """사용자 알레르기를 고려한 위험도 조정"""
         # 사용자 알레르기와 성분 매칭 확인
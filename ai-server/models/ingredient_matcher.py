@@ -1,14 +1,28 @@
 import numpy as np
-import pandas as pd
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import joblib
-import json
+import os
 import re
-from typing import List, Dict, Tuple, Set
+import hashlib
+from collections import Counter
+from types import MappingProxyType
+from typing import List, Dict, Iterable, Set, Optional
+
+from utils.metrics import metrics
+from utils.text_normalization import TextInput, as_normalized, clean_text, decompose_hangul
+from .aho_corasick import AhoCorasick
+from .symspell import SymSpellIndex
+from .menu_catalog import get_menu_catalog
+
+ENGLISH_WORD_CHARS = re.compile(r'[a-z0-9]')
+HANGUL_CHARS = re.compile(r'[가-힣]')
+
+# 근사 매칭 허용 편집 거리 (키 길이 기준, 한글은 자모 단위) - 짧은 단어는 오탐이 많아 근사 매칭하지 않음
+FUZZY_MIN_KEY_LENGTH = 4    # 이 길이부터 편집 거리 1
+FUZZY_LONG_KEY_LENGTH = 8   # 이 길이부터 편집 거리 2
 
 class IngredientMatcher:
-    def __init__(self):
+    def __init__(self, model_dir: str = 'models'):
         self.vectorizer = TfidfVectorizer(
             max_features=500,
             ngram_range=(1, 2),
@@ -16,16 +30,30 @@ class IngredientMatcher:
         )
         self.ingredient_synonyms = {}
         self.ingredient_categories = {}
-        self.model_path = 'models/ingredient_matcher.pkl'
-        self.vectorizer_path = 'models/ingredient_vectorizer.pkl'
+        self.ingredient_automaton = None
+        
+        # 동의어 역색인 (build_synonym_index에서 구성, 읽기 전용)
+        self._surface_to_id = None      # 소문자 표면형 → 성분 id
+        self._canonical_names = ()       # 성분 id → 대표 성분명
+        self._synonym_lists = ()         # 성분 id → 동의어 목록 (원본 순서)
+        self._synonym_sets = ()          # 성분 id → frozenset(동의어)
+        self._overlapping_ids = ()       # 성분 id → 동의어가 겹치는 성분 id들의 frozenset
+        self._suggestions = None         # 자모 분해한 접두사 → 순위순 대표 성분명 tuple
+        self.suggestion_version = None   # 자동완성 인덱스 내용 해시 (응답 ETag용)
+        self._fuzzy_index = None         # 표면형 키 → (대표 성분명, 표면형) 근사 검색 인덱스
+        
+        # OCR 오인식 대비 근사 매칭 (분석 엔진의 성분 추출 단계에서 사용)
+        self.fuzzy_matching = os.getenv("INGREDIENT_FUZZY_MATCHING", "false").strip().lower() in ("1", "true", "yes", "on")
+        self.fuzzy_min_confidence = float(os.getenv("INGREDIENT_FUZZY_MIN_CONFIDENCE", "0.75"))
+        self.model_path = os.path.join(model_dir, 'ingredient_matcher.pkl')
+        self.vectorizer_path = os.path.join(model_dir, 'ingredient_vectorizer.pkl')
         
     def load_ingredient_data(self):
         """성분 데이터 로드 및 동의어 설정"""
-        with open('data/datasets/cafe_menu_dataset.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        catalog = get_menu_catalog()
         
         # 알레르기 카테고리별 성분 매핑
-        self.ingredient_categories = data.get('allergen_categories', {})
+        self.ingredient_categories = catalog.allergen_categories
         
         # 성분 동의어 설정
         self.ingredient_synonyms = {
@@ -87,43 +115,242 @@ class IngredientMatcher:
             '커피 원두': ['coffee bean', '커피 원두', '원두']
         }
         
-        return data
+        self.build_ingredient_automaton()
+        self.build_synonym_index()
+        self.build_suggestion_index(catalog)
+        self.build_fuzzy_index(catalog)
+        
+        return catalog
+    
+    def build_synonym_index(self):
+        """동의어 역색인 구성 (소문자 표면형 → 성분 id → 동의어 frozenset)"""
+        surface_to_id = {}
+        canonical_names = []
+        synonym_lists = []
+        synonym_sets = []
+        
+        for ingredient_id, (main_ingredient, synonyms) in enumerate(self.ingredient_synonyms.items()):
+            canonical_names.append(main_ingredient)
+            synonym_lists.append(list(synonyms))
+            synonym_sets.append(frozenset(synonyms))
+            for synonym in synonyms:
+                # 여러 성분에 같은 동의어가 있으면 먼저 나온 성분 우선 (기존 순차 검색과 동일)
+                surface_to_id.setdefault(synonym.lower(), ingredient_id)
+        
+        # 동의어 집합이 겹치는 성분 쌍을 미리 계산
+        surface_owners = {}
+        for ingredient_id, synonyms in enumerate(synonym_sets):
+            for synonym in synonyms:
+                surface_owners.setdefault(synonym, set()).add(ingredient_id)
+        overlapping_ids = []
+        for ingredient_id, synonyms in enumerate(synonym_sets):
+            overlapping = set()
+            for synonym in synonyms:
+                overlapping |= surface_owners[synonym]
+            overlapping_ids.append(frozenset(overlapping))
+        
+        self._surface_to_id = MappingProxyType(surface_to_id)
+        self._canonical_names = tuple(canonical_names)
+        self._synonym_lists = tuple(synonym_lists)
+        self._synonym_sets = tuple(synonym_sets)
+        self._overlapping_ids = tuple(overlapping_ids)
+    
+    def _lookup_id(self, ingredient: str) -> Optional[int]:
+        """성분명(대소문자 무시)의 성분 id (사전에 없으면 None)"""
+        if self._surface_to_id is None:
+            self.build_synonym_index()
+        return self._surface_to_id.get(ingredient.lower())
+    
+    def _synonyms_overlap(self, first: str, second: str) -> bool:
+        """두 성분의 동의어 집합이 겹치는지 확인 (find_ingredient_synonyms 결과의 교집합과 동일)"""
+        first_id = self._lookup_id(first)
+        second_id = self._lookup_id(second)
+        
+        if first_id is not None and second_id is not None:
+            return second_id in self._overlapping_ids[first_id]
+        if first_id is None and second_id is None:
+            return first == second
+        
+        # 한쪽만 사전에 있는 경우: 사전에 없는 쪽은 자기 자신만 동의어로 가짐
+        unknown, known_id = (first, second_id) if first_id is None else (second, first_id)
+        return unknown in self._synonym_sets[known_id]
+    
+    def build_ingredient_automaton(self):
+        """동의어 전체로 다중 패턴 매칭 오토마톤 구성 (데이터 로드 시 1회)"""
+        automaton = AhoCorasick()
+        for main_ingredient, synonyms in self.ingredient_synonyms.items():
+            for synonym in synonyms:
+                pattern = synonym.lower()
+                automaton.add(pattern, (main_ingredient, pattern))
+        self.ingredient_automaton = automaton.build()
     
     def preprocess_text(self, text: str) -> str:
-        """텍스트 전처리"""
-        text = re.sub(r'[^가-힣a-zA-Z0-9\s]', '', text)
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text.lower()
+        """텍스트 전처리 (한글, 영어, 숫자만 남기고 공백 정리 후 소문자화)"""
+        return clean_text(text)
     
     def find_ingredient_synonyms(self, ingredient: str) -> List[str]:
         """성분의 동의어 찾기"""
-        for main_ingredient, synonyms in self.ingredient_synonyms.items():
-            if ingredient.lower() in [s.lower() for s in synonyms]:
-                return synonyms
+        ingredient_id = self._lookup_id(ingredient)
+        if ingredient_id is not None:
+            return list(self._synonym_lists[ingredient_id])
         return [ingredient]
     
     def normalize_ingredient(self, ingredient: str) -> str:
         """성분명 정규화"""
-        ingredient_lower = ingredient.lower()
+        ingredient_id = self._lookup_id(ingredient)
+        if ingredient_id is not None:
+            return self._canonical_names[ingredient_id]
+        return ingredient
+    
+    def _is_word_boundary(self, text: str, start: int, end: int, pattern: str,
+                          english_word_boundary: bool, korean_word_boundary: bool) -> bool:
+        """매칭 양 끝이 단어 경계인지 확인 (패턴 언어별 옵션)"""
+        if HANGUL_CHARS.search(pattern):
+            if not korean_word_boundary:
+                return True
+            word_chars = HANGUL_CHARS
+        else:
+            if not english_word_boundary:
+                return True
+            word_chars = ENGLISH_WORD_CHARS
         
-        for main_ingredient, synonyms in self.ingredient_synonyms.items():
-            if ingredient_lower in [s.lower() for s in synonyms]:
-                return main_ingredient
+        before = text[start - 1] if start > 0 else ''
+        after = text[end] if end < len(text) else ''
+        return not (before and word_chars.match(before)) and not (after and word_chars.match(after))
+    
+    def find_ingredient_matches(self, text: TextInput, english_word_boundary: bool = False,
+                                korean_word_boundary: bool = False) -> List[Dict]:
+        """
+        텍스트에서 성분 동의어 매칭 위치 찾기 (한 번의 선형 스캔)
         
-        return ingredient
+        Args:
+            text: 입력 텍스트 (NormalizedText를 넘기면 전처리 결과를 재사용)
+            english_word_boundary: 영어 동의어는 단어 단위로만 매칭 (예: 'ice'가 'juice'에 매칭되지 않음)
+            korean_word_boundary: 한글 동의어는 어절 단위로만 매칭
+        
+        Returns:
+            매칭 목록 (start/end는 전처리된 텍스트 기준 위치)
+        """
+        if self.ingredient_automaton is None:
+            self.build_ingredient_automaton()
+        
+        text = as_normalized(text).text
+        matches = []
+        for start, end, (main_ingredient, synonym) in self.ingredient_automaton.iter_matches(text):
+            if not self._is_word_boundary(text, start, end, synonym, english_word_boundary, korean_word_boundary):
+                continue
+            matches.append({
+                'ingredient': main_ingredient,
+                'synonym': synonym,
+                'start': start,
+                'end': end
+            })
+        return matches
+    
+    @staticmethod
+    def fuzzy_key(text: str) -> str:
+        """근사 매칭 키 (소문자, 공백 하나로, 한글은 자모 분해 - 깨진 음절도 자모 1~2개 차이로 계산)"""
+        return decompose_hangul(" ".join(text.lower().split()))
     
-    def extract_ingredients_from_text(self, text: str) -> List[str]:
-        """텍스트에서 성분 추출"""
-        text = self.preprocess_text(text)
-        found_ingredients = []
+    @staticmethod
+    def fuzzy_max_distance(key_length: int) -> int:
+        """키 길이별 허용 편집 거리 (0이면 근사 매칭하지 않음)"""
+        if key_length >= FUZZY_LONG_KEY_LENGTH:
+            return 2
+        return 1 if key_length >= FUZZY_MIN_KEY_LENGTH else 0
+    
+    def build_fuzzy_index(self, catalog=None):
+        """
+        근사 매칭 인덱스 구성 (SymSpell 삭제 색인)
+        대표 성분명/동의어와, 데이터셋 성분 표기 중 성분 하나로만 매칭되는 것(예: '저지방 우유' → 우유)을 색인합니다.
+        짧은 표기도 색인해 두어 사전에 있는 단어(정확 매칭 대상)가 다른 성분으로 근사 매칭되지 않게 합니다.
+        """
+        if catalog is None:
+            catalog = get_menu_catalog()
         
-        for main_ingredient, synonyms in self.ingredient_synonyms.items():
-            for synonym in synonyms:
-                if synonym.lower() in text:
-                    found_ingredients.append(main_ingredient)
-                    break
+        index = SymSpellIndex(max_distance=2)
+        for name, synonyms in self.ingredient_synonyms.items():
+            for surface in [name, *synonyms]:
+                index.add(self.fuzzy_key(surface), (name, surface))
         
-        return list(set(found_ingredients))
+        terms = dict.fromkeys(clean_text(ingredient) for menu in catalog for ingredient in menu.ingredients)
+        for term in terms:
+            names = {match['ingredient'] for match in self.find_ingredient_matches(term)}
+            if len(names) == 1:
+                index.add(self.fuzzy_key(term), (names.pop(), term))
+        
+        self._fuzzy_index = index
+    
+    @metrics.timed("ingredient_fuzzy_matching")
+    def find_fuzzy_matches(self, text: TextInput, min_confidence: Optional[float] = None,
+                           exclude: Iterable[str] = ()) -> List[Dict]:
+        """
+        OCR 오인식(esspresso, choco1ate, 깨진 한글 음절 등)을 허용하는 근사 성분 매칭
+        
+        단어와 인접한 두 단어를 후보로, 사전에 없는 후보만 편집 거리 이내의 표기를 찾습니다.
+        신뢰도는 1 - 거리 / 키 길이이며, 후보마다 가장 가까운 표기만 사용합니다.
+        
+        Args:
+            text: 입력 텍스트 (NormalizedText를 넘기면 전처리 결과를 재사용)
+            min_confidence: 최소 신뢰도 (기본: INGREDIENT_FUZZY_MIN_CONFIDENCE)
+            exclude: 제외할 대표 성분명 (정확 매칭으로 이미 찾은 성분 등)
+        
+        Returns:
+            성분별로 신뢰도가 가장 높은 매칭 목록 (start/end는 전처리된 텍스트 기준 위치, 등장 순서)
+        """
+        if self._fuzzy_index is None:
+            self.build_fuzzy_index()
+        if min_confidence is None:
+            min_confidence = self.fuzzy_min_confidence
+        
+        index = self._fuzzy_index
+        excluded = set(exclude)
+        text = as_normalized(text).text
+        words = [(match.start(), match.end()) for match in re.finditer(r'\S+', text)]
+        
+        best: Dict[str, Dict] = {}
+        for i in range(len(words)):
+            for j in range(i, min(i + 2, len(words))):
+                start, end = words[i][0], words[j][1]
+                key = self.fuzzy_key(text[start:end])
+                max_distance = self.fuzzy_max_distance(len(key))
+                # 사전에 있는 표기는 정확 매칭 단계가 처리
+                if max_distance == 0 or key in index:
+                    continue
+                
+                results = index.lookup(key, max_distance)
+                if not results:
+                    continue
+                closest = results[0][1]
+                for term, distance, values in results:
+                    if distance > closest:
+                        break
+                    if distance > self.fuzzy_max_distance(len(term)):
+                        continue
+                    confidence = round(1 - distance / max(len(key), len(term)), 3)
+                    if confidence < min_confidence:
+                        continue
+                    for name, surface in values:
+                        if name in excluded or (name in best and best[name]['confidence'] >= confidence):
+                            continue
+                        best[name] = {
+                            'ingredient': name,
+                            'synonym': surface,
+                            'token': text[start:end],
+                            'distance': distance,
+                            'confidence': confidence,
+                            'start': start,
+                            'end': end
+                        }
+        
+        return sorted(best.values(), key=lambda match: (match['start'], match['end']))
+    
+    @metrics.timed("ingredient_extraction")
+    def extract_ingredients_from_text(self, text: TextInput, english_word_boundary: bool = False,
+                                      korean_word_boundary: bool = False) -> List[str]:
+        """텍스트에서 성분 추출 (처음 등장한 순서)"""
+        matches = self.find_ingredient_matches(text, english_word_boundary, korean_word_boundary)
+        return list(dict.fromkeys(match['ingredient'] for match in matches))
     
     def match_ingredients(self, query_ingredients: List[str], target_ingredients: List[str]) -> Dict:
         """성분 매칭 및 유사도 계산"""
@@ -137,10 +364,8 @@ class IngredientMatcher:
         # 동의어 매칭
         synonym_matches = []
         for query_ingredient in normalized_query:
-            synonyms = self.find_ingredient_synonyms(query_ingredient)
             for target_ingredient in normalized_target:
-                target_synonyms = self.find_ingredient_synonyms(target_ingredient)
-                if set(synonyms) & set(target_synonyms):
+                if self._synonyms_overlap(query_ingredient, target_ingredient):
                     synonym_matches.append((query_ingredient, target_ingredient))
         
         # 매칭 점수 계산
@@ -176,19 +401,21 @@ class IngredientMatcher:
             return self.ingredient_categories[category].get('ingredients', [])
         return []
     
+    @metrics.timed("allergy_check")
     def check_allergy_risk(self, ingredients: List[str], user_allergies: List[str]) -> Dict:
         """알레르기 위험도 체크"""
         risk_found = []
         safe_ingredients = []
         
+        # 알레르기는 성분마다 다시 정규화하지 않도록 미리 정규화
+        normalized_allergies = [(allergy, self.normalize_ingredient(allergy)) for allergy in user_allergies]
+        
         for ingredient in ingredients:
             normalized_ingredient = self.normalize_ingredient(ingredient)
             
             # 사용자 알레르기와 매칭
             is_risky = False
-            for allergy in user_allergies:
-                normalized_allergy = self.normalize_ingredient(allergy)
-                
+            for allergy, normalized_allergy in normalized_allergies:
                 # 직접 매칭
                 if normalized_ingredient == normalized_allergy:
                     risk_found.append({
@@ -199,11 +426,8 @@ class IngredientMatcher:
                     is_risky = True
                     break
                 
-                # 동의어 매칭
-                ingredient_synonyms = self.find_ingredient_synonyms(normalized_ingredient)
-                allergy_synonyms = self.find_ingredient_synonyms(normalized_allergy)
-                
-                if set(ingredient_synonyms) & set(allergy_synonyms):
+                # 동의어 매칭 (성분 id 집합 비교)
+                if self._synonyms_overlap(normalized_ingredient, normalized_allergy):
                     risk_found.append({
                         'ingredient': ingredient,
                         'allergy': allergy,
@@ -239,23 +463,57 @@ class IngredientMatcher:
             'risky_count': risky_count
         }
     
-    def get_ingredient_suggestions(self, partial_ingredient: str, top_k: int = 5) -> List[str]:
-        """성분명 자동완성"""
-        suggestions = []
-        partial_lower = partial_ingredient.lower()
+    @staticmethod
+    def suggestion_key(text: str) -> str:
+        """자동완성 키 (소문자, 공백 제거, 한글은 자모 분해)"""
+        return "".join(decompose_hangul(text.lower()).split())
+    
+    def build_suggestion_index(self, catalog=None):
+        """
+        성분명 자동완성 인덱스 구성 (접두사 → 순위순 대표 성분명)
         
-        for main_ingredient, synonyms in self.ingredient_synonyms.items():
-            # 메인 성분명 매칭
-            if partial_lower in main_ingredient.lower():
-                suggestions.append(main_ingredient)
-            
-            # 동의어 매칭
-            for synonym in synonyms:
-                if partial_lower in synonym.lower():
-                    suggestions.append(main_ingredient)
-                    break
+        대표 성분명과 동의어(여러 단어면 각 단어 시작 위치부터도)의 자동완성 키에 대해
+        모든 접두사를 미리 펼쳐 두므로 조회는 dict 한 번 + 상위 k개 슬라이스입니다. (트라이를 평탄화한 형태)
+        순위는 카탈로그에서 해당 성분이 들어간 메뉴 수, 같으면 동의어 정의 순서라 항상 같은 결과를 돌려줍니다.
+        """
+        if catalog is None:
+            catalog = get_menu_catalog()
+        
+        frequency = Counter()
+        for menu in catalog:
+            if menu.ingredients:
+                frequency.update({match['ingredient'] for match in self.find_ingredient_matches(" ".join(menu.ingredients))})
+        
+        ranked = sorted(enumerate(self.ingredient_synonyms), key=lambda item: (-frequency[item[1]], item[0]))
+        rank = {name: position for position, (_, name) in enumerate(ranked)}
+        
+        prefixes: Dict[str, Set[str]] = {}
+        for name, synonyms in self.ingredient_synonyms.items():
+            for surface in [name, *synonyms]:
+                words = surface.split()
+                for start in range(len(words)):
+                    key = self.suggestion_key(" ".join(words[start:]))
+                    # 빈 접두사("")는 전체 성분 (빈 입력이면 자주 쓰이는 성분부터)
+                    for end in range(len(key) + 1):
+                        prefixes.setdefault(key[:end], set()).add(name)
+        
+        suggestions = {prefix: tuple(sorted(names, key=rank.__getitem__)) for prefix, names in prefixes.items()}
+        digest = hashlib.sha1()
+        for prefix in sorted(suggestions):
+            digest.update(f"{prefix}\t{'|'.join(suggestions[prefix])}\n".encode("utf-8"))
+        self._suggestions = MappingProxyType(suggestions)
+        self.suggestion_version = digest.hexdigest()[:16]
+    
+    def get_ingredient_suggestions(self, partial_ingredient: str, top_k: int = 5) -> List[str]:
+        """
+        성분명 자동완성 (접두사 매칭, O(입력 길이 + k))
         
-        return list(set(suggestions))[:top_k]
+        성분명/동의어의 앞부분이나 여러 단어 성분의 단어 앞부분과 매칭하며,
+        한글은 자모 단위로 비교해 입력 중인 음절도 매칭됩니다. (예: '웅' → 우유)
+        """
+        if self._suggestions is None:
+            self.build_suggestion_index()
+        return list(self._suggestions.get(self.suggestion_key(partial_ingredient), ())[:max(top_k, 0)])
 
 # 사용 예시
 if __name__ == "__main__":
@@ -0,0 +1,119 @@
+import json
+import sys
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_DATASET_PATH = 'data/datasets/cafe_menu_dataset.json'
+
+
+class MenuRecord:
+    """메뉴 1개 (성분/알레르기는 카탈로그의 정수 id로 저장)"""
+
+    __slots__ = ('id', 'name', 'english_name', 'category', 'variations',
+                 'ingredient_ids', 'allergen_ids', '_catalog')
+
+    def __init__(self, catalog: "MenuCatalog", menu_id: int, name: str, english_name: str, category: str,
+                 variations: Tuple[str, ...], ingredient_ids: Tuple[int, ...], allergen_ids: Tuple[int, ...]):
+        self._catalog = catalog
+        self.id = menu_id
+        self.name = name
+        self.english_name = english_name
+        self.category = category
+        self.variations = variations
+        self.ingredient_ids = ingredient_ids
+        self.allergen_ids = allergen_ids
+
+    @property
+    def ingredients(self) -> List[str]:
+        names = self._catalog.ingredient_names
+        return [names[i] for i in self.ingredient_ids]
+
+    @property
+    def allergens(self) -> List[str]:
+        names = self._catalog.allergen_names
+        return [names[i] for i in self.allergen_ids]
+
+    def __repr__(self):
+        return f"MenuRecord(id={self.id}, name={self.name!r})"
+
+
+class MenuCatalog:
+    """
+    메뉴 데이터셋 공유 카탈로그
+
+    데이터셋 JSON을 프로세스당 한 번만 파싱해 모든 모델이 공유합니다.
+    성분/알레르기 이름은 정수 id로 인터닝하고, 메뉴는 __slots__ 레코드로 저장합니다.
+    """
+
+    def __init__(self, dataset_path: str = DEFAULT_DATASET_PATH):
+        self.dataset_path = dataset_path
+        self.menus: List[MenuRecord] = []
+        self.ingredient_names: List[str] = []
+        self.ingredient_index: Dict[str, int] = {}
+        self.allergen_names: List[str] = []
+        self.allergen_index: Dict[str, int] = {}
+        self.allergen_categories: Dict = {}
+
+    def _intern(self, value: str, names: List[str], index: Dict[str, int]) -> int:
+        value_id = index.get(value)
+        if value_id is None:
+            value_id = len(names)
+            value = sys.intern(value)
+            names.append(value)
+            index[value] = value_id
+        return value_id
+
+    def load(self) -> "MenuCatalog":
+        """데이터셋 파싱 (원본 JSON 객체는 보관하지 않음)"""
+        with open(self.dataset_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+
+        self.allergen_categories = data.get('allergen_categories', {})
+
+        for menu in data['cafe_beverages']:
+            ingredient_ids = tuple(
+                self._intern(i, self.ingredient_names, self.ingredient_index) for i in menu.get('ingredients', [])
+            )
+            allergen_ids = tuple(
+                self._intern(a, self.allergen_names, self.allergen_index) for a in menu.get('allergens', [])
+            )
+            self.menus.append(MenuRecord(
+                self,
+                menu['id'],
+                menu['name'],
+                menu.get('english_name', ''),
+                sys.intern(menu['category']),
+                tuple(menu.get('variations', [])),
+                ingredient_ids,
+                allergen_ids
+            ))
+
+        return self
+
+    def __len__(self):
+        return len(self.menus)
+
+    def __iter__(self) -> Iterator[MenuRecord]:
+        return iter(self.menus)
+
+    def iter_menu_texts(self) -> Iterator[Tuple[str, MenuRecord]]:
+        """메뉴명과 변형명을 (텍스트, 메뉴) 쌍으로 반환 (메뉴명과 같은 변형명은 제외)"""
+        for menu in self.menus:
+            yield menu.name, menu
+            for variation in menu.variations:
+                if variation != menu.name:
+                    yield variation, menu
+
+
+_catalogs: Dict[str, MenuCatalog] = {}
+_catalog_lock = threading.Lock()
+
+
+def get_menu_catalog(dataset_path: str = DEFAULT_DATASET_PATH, reload: bool = False) -> MenuCatalog:
+    """프로세스 전역 카탈로그 반환 (처음 호출 시 1회 로드, reload=True면 다시 로드)"""
+    with _catalog_lock:
+        catalog: Optional[MenuCatalog] = _catalogs.get(dataset_path)
+        if catalog is None or reload:
+            catalog = MenuCatalog(dataset_path).load()
+            _catalogs[dataset_path] = catalog
+        return catalog
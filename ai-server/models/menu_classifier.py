@@ -1,51 +1,49 @@
 import numpy as np
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.naive_bayes import MultinomialNB
 import joblib
-import json
-import re
+import os
 from typing import Dict, List, Optional
 
+from utils.metrics import metrics
+from utils.hashing_vectorizer import make_vectorizer, vectorizer_mode
+from utils.text_normalization import TextInput, as_normalized, clean_text, raw_text, tfidf_transform
+from .menu_catalog import get_menu_catalog
+
 class MenuClassifier:
-    def __init__(self):
-        self.vectorizer = TfidfVectorizer(
-            max_features=1000,
+    def __init__(self, model_dir: str = 'models', vectorizer: Optional[str] = None):
+        """
+        Args:
+            model_dir: 모델 파일 디렉토리
+            vectorizer: 훈련에 사용할 벡터라이저 ('tfidf' 또는 'hashing', 기본: MENU_CLASSIFIER_VECTORIZER 환경 변수)
+        """
+        self.vectorizer = make_vectorizer(
+            vectorizer or vectorizer_mode('MENU_CLASSIFIER_VECTORIZER'),
             ngram_range=(1, 3),
+            max_features=1000,
             min_df=1,
             stop_words=None
         )
         self.classifier = MultinomialNB()
         self.categories = []
-        self.model_path = 'models/menu_classifier.pkl'
-        self.vectorizer_path = 'models/menu_classifier_vectorizer.pkl'
+        self.model_path = os.path.join(model_dir, 'menu_classifier.pkl')
+        self.vectorizer_path = os.path.join(model_dir, 'menu_classifier_vectorizer.pkl')
+        self.label_encoder_path = os.path.join(model_dir, 'menu_classifier_label_encoder.pkl')
         
     def preprocess_text(self, text: str) -> str:
-        """텍스트 전처리"""
-        # 한글, 영어, 숫자만 남기고 제거
-        text = re.sub(r'[^가-힣a-zA-Z0-9\s]', '', text)
-        # 공백 정리
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text.lower()
+        """텍스트 전처리 (한글, 영어, 숫자만 남기고 공백 정리 후 소문자화)"""
+        return clean_text(text)
     
     def load_training_data(self):
         """훈련 데이터 로드"""
-        with open('data/datasets/cafe_menu_dataset.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        catalog = get_menu_catalog()
         
         menu_texts = []
         menu_categories = []
         
-        for menu in data['cafe_beverages']:
-            # 메뉴명과 변형명들을 모두 포함
-            menu_texts.append(menu['name'])
-            menu_categories.append(menu['category'])
-            
-            # 변형명들도 추가
-            for variation in menu.get('variations', []):
-                if variation != menu['name']:  # 중복 제거
-                    menu_texts.append(variation)
-                    menu_categories.append(menu['category'])
+        # 메뉴명과 변형명들을 모두 포함 (중복 변형명 제외)
+        for text, menu in catalog.iter_menu_texts():
+            menu_texts.append(text)
+            menu_categories.append(menu.category)
         
         return menu_texts, menu_categories
     
@@ -72,13 +70,18 @@ class MenuClassifier:
         y = label_encoder.fit_transform(menu_categories)
         self.categories = label_encoder.classes_
         
+        # 해싱 모드에서는 학습 데이터에 없는 버킷으로 스무딩 확률이 분산되지 않도록 해당 버킷의 alpha를 최소값으로
+        df = getattr(self.vectorizer, 'df', None)
+        if df is not None:
+            self.classifier.set_params(alpha=np.where(df > 0, self.classifier.alpha, 1e-10))
+        
         # 모델 훈련
         self.classifier.fit(X, y)
         
         # 모델 저장
         joblib.dump(self.classifier, self.model_path)
         joblib.dump(self.vectorizer, self.vectorizer_path)
-        joblib.dump(label_encoder, 'models/menu_classifier_label_encoder.pkl')
+        joblib.dump(label_encoder, self.label_encoder_path)
         
         print(f"모델이 {self.model_path}에 저장되었습니다.")
         print(f"총 {len(menu_texts)}개의 메뉴 텍스트로 훈련 완료")
@@ -89,24 +92,22 @@ class MenuClassifier:
         try:
             self.classifier = joblib.load(self.model_path)
             self.vectorizer = joblib.load(self.vectorizer_path)
-            label_encoder = joblib.load('models/menu_classifier_label_encoder.pkl')
+            label_encoder = joblib.load(self.label_encoder_path)
             self.categories = label_encoder.classes_
             return True
         except FileNotFoundError:
             print("저장된 모델을 찾을 수 없습니다. 모델을 훈련해주세요.")
             return False
     
-    def predict(self, menu_text: str) -> Optional[Dict]:
-        """메뉴 분류 예측"""
+    @metrics.timed("menu_classification")
+    def predict(self, menu_text: TextInput) -> Optional[Dict]:
+        """메뉴 분류 예측 (NormalizedText를 넘기면 전처리/토큰화 결과를 재사용)"""
         if not hasattr(self, 'classifier') or not hasattr(self, 'vectorizer'):
             if not self.load_model():
                 return None
         
-        # 텍스트 전처리
-        processed_text = self.preprocess_text(menu_text)
-        
         # TF-IDF 벡터화
-        X = self.vectorizer.transform([processed_text])
+        X = tfidf_transform(self.vectorizer, [as_normalized(menu_text)])
         
         # 예측
         prediction = self.classifier.predict(X)[0]
@@ -115,8 +116,36 @@ class MenuClassifier:
         return {
             'category': self.categories[prediction],
             'confidence': confidence,
-            'input_text': menu_text
+            'input_text': raw_text(menu_text)
         }
+    
+    @metrics.timed("menu_classification_batch")
+    def predict_batch(self, menu_texts: List[TextInput]) -> List[Optional[Dict]]:
+        """여러 메뉴 일괄 분류 (벡터화/예측 1회)"""
+        if not menu_texts:
+            return []
+        
+        if not hasattr(self, 'classifier') or not hasattr(self, 'vectorizer'):
+            if not self.load_model():
+                return [None] * len(menu_texts)
+        
+        # 전체 텍스트를 한 번에 벡터화
+        X = tfidf_transform(self.vectorizer, menu_texts)
+        
+        # 확률 1회 계산 후 라벨은 argmax로 결정 (predict와 동일)
+        probabilities = self.classifier.predict_proba(X)
+        best = probabilities.argmax(axis=1)
+        predictions = self.classifier.classes_[best]
+        confidences = probabilities[np.arange(len(menu_texts)), best]
+        
+        return [
+            {
+                'category': self.categories[prediction],
+                'confidence': confidence,
+                'input_text': raw_text(menu_text)
+            }
+            for menu_text, prediction, confidence in zip(menu_texts, predictions, confidences)
+        ]
 
 # 사용 예시
 if __name__ == "__main__":
@@ -1,63 +1,79 @@
 import numpy as np
-import pandas as pd
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
 import joblib
 import json
-import re
-from typing import List, Dict, Tuple
+import os
+import shutil
+import tempfile
+from datetime import datetime
+from functools import lru_cache
+from scipy import sparse
+from typing import List, Dict, Optional, Tuple
+
+from utils.metrics import metrics
+from utils.hashing_vectorizer import make_vectorizer, vectorizer_mode
+from utils.text_normalization import TextInput, as_normalized, clean_text, tfidf_transform, vectorizer_digest
+from .menu_catalog import get_menu_catalog
+
+# 유사도 인덱스 포맷 버전 (포맷이 바뀌면 올려서 이전 인덱스를 무시)
+INDEX_VERSION = 1
+
+# 유사 메뉴로 반환할 최소 코사인 유사도
+MIN_SIMILARITY = 0.1
 
 class MenuSimilarityModel:
-    def __init__(self):
-        self.vectorizer = TfidfVectorizer(
-            max_features=1000,
+    def __init__(self, model_dir: str = 'models', vectorizer: Optional[str] = None):
+        """
+        Args:
+            model_dir: 모델 파일 디렉토리
+            vectorizer: 훈련에 사용할 벡터라이저 ('tfidf' 또는 'hashing', 기본: MENU_SIMILARITY_VECTORIZER 환경 변수)
+        """
+        self.vectorizer = make_vectorizer(
+            vectorizer or vectorizer_mode('MENU_SIMILARITY_VECTORIZER'),
             ngram_range=(1, 3),
+            max_features=1000,
             min_df=1,
             stop_words=None
         )
         self.menu_data = []
         self.menu_vectors = None
-        self.model_path = 'models/menu_similarity.pkl'
-        self.vectorizer_path = 'models/menu_similarity_vectorizer.pkl'
+        
+        # 역색인: n-gram → 그 n-gram을 가진 메뉴 행과 TF-IDF 가중치 (_build_search_index에서 구성)
+        self._postings = None  # (어휘 수, 메뉴 수) CSR
+        
+        # 알레르기 비트마스크 인덱스 (_build_allergen_index에서 구성)
+        self.allergen_ids = {}
+        self._allergen_masks = None  # (메뉴 수, 워드 수) uint64
+        self._safe_indices_cached = None
+        self.model_path = os.path.join(model_dir, 'menu_similarity.pkl')
+        self.vectorizer_path = os.path.join(model_dir, 'menu_similarity_vectorizer.pkl')
+        self.index_dir = os.path.join(model_dir, 'menu_similarity_index')
         
     def preprocess_text(self, text: str) -> str:
-        """텍스트 전처리"""
-        # 한글, 영어, 숫자만 남기고 제거
-        text = re.sub(r'[^가-힣a-zA-Z0-9\s]', '', text)
-        # 공백 정리
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text.lower()
+        """텍스트 전처리 (한글, 영어, 숫자만 남기고 공백 정리 후 소문자화)"""
+        return clean_text(text)
     
     def load_menu_data(self):
         """메뉴 데이터 로드"""
-        with open('data/datasets/cafe_menu_dataset.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        catalog = get_menu_catalog()
         
         menu_texts = []
         menu_info = []
+        shared_lists = {}  # 메뉴 id → (성분, 알레르기) 목록 (변형명끼리 공유)
         
-        for menu in data['cafe_beverages']:
-            # 메뉴명과 변형명들을 모두 포함
-            menu_texts.append(menu['name'])
+        # 메뉴명과 변형명들을 모두 포함 (중복 변형명 제외)
+        for text, menu in catalog.iter_menu_texts():
+            if menu.id not in shared_lists:
+                shared_lists[menu.id] = (menu.ingredients, menu.allergens)
+            ingredients, allergens = shared_lists[menu.id]
+            
+            menu_texts.append(text)
             menu_info.append({
-                'id': menu['id'],
-                'name': menu['name'],
-                'category': menu['category'],
-                'ingredients': menu.get('ingredients', []),
-                'allergens': menu.get('allergens', [])
+                'id': menu.id,
+                'name': text,
+                'category': menu.category,
+                'ingredients': ingredients,
+                'allergens': allergens
             })
-            
-            # 변형명들도 추가
-            for variation in menu.get('variations', []):
-                if variation != menu['name']:  # 중복 제거
-                    menu_texts.append(variation)
-                    menu_info.append({
-                        'id': menu['id'],
-                        'name': variation,
-                        'category': menu['category'],
-                        'ingredients': menu.get('ingredients', []),
-                        'allergens': menu.get('allergens', [])
-                    })
         
         return menu_texts, menu_info
     
@@ -77,50 +93,253 @@ class MenuSimilarityModel:
         
         # TF-IDF 벡터화
         self.menu_vectors = self.vectorizer.fit_transform(processed_texts)
+        self._build_search_index()
+        self._build_allergen_index()
         
         # 모델 저장
         joblib.dump(self.vectorizer, self.vectorizer_path)
+        self.save_index()
         
         print(f"모델이 {self.vectorizer_path}에 저장되었습니다.")
         print(f"총 {len(menu_texts)}개의 메뉴 텍스트로 훈련 완료")
         return True
     
+    def save_index(self):
+        """
+        메뉴 TF-IDF 행렬과 메뉴 메타데이터를 버전이 있는 인덱스로 저장
+        
+        CSR 배열(data/indices/indptr)과 역색인(전치 행렬, postings_*)은 .npy로 저장해 로드 시 memory-map 하고,
+        메타데이터는 컬럼 단위 JSON으로 저장합니다.
+        
+        같은 위치에 다시 저장할 때 로드 중인 프로세스가 이전/새 배열을 섞어 읽지 않도록
+        옆의 임시 디렉토리에 모두 기록한 뒤 디렉토리째 교체합니다.
+        (이미 memory-map 중인 워커는 교체 후에도 이전 파일을 그대로 읽음)
+        
+        벡터라이저 파일은 인덱스와 따로 저장되므로 manifest에 벡터라이저 해시를 기록해 두고,
+        로드 시 해시가 다르면(둘 중 하나만 새로 저장된 경우) 인덱스를 쓰지 않습니다.
+        """
+        parent = os.path.dirname(os.path.abspath(self.index_dir))
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(prefix='.menu_similarity_index-', dir=parent)
+        try:
+            os.chmod(staging, 0o755)
+            self._write_index(staging)
+            
+            if os.path.isdir(self.index_dir):
+                retired = f"{staging}.old"
+                os.replace(self.index_dir, retired)
+                os.replace(staging, self.index_dir)
+                shutil.rmtree(retired, ignore_errors=True)
+            else:
+                os.replace(staging, self.index_dir)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+        
+        print(f"유사도 인덱스가 {self.index_dir}에 저장되었습니다.")
+    
+    def _write_index(self, directory: str):
+        """인덱스 파일 기록 (manifest는 마지막 - manifest가 있으면 인덱스가 완전하다는 의미)"""
+        matrix = sparse.csr_matrix(self.menu_vectors)
+        for name in ('data', 'indices', 'indptr'):
+            np.save(os.path.join(directory, f'{name}.npy'), getattr(matrix, name))
+        
+        if self._postings is None:
+            self._build_search_index()
+        for name in ('data', 'indices', 'indptr'):
+            np.save(os.path.join(directory, f'postings_{name}.npy'), getattr(self._postings, name))
+        
+        columns = {key: [menu[key] for menu in self.menu_data]
+                   for key in ('id', 'name', 'category', 'ingredients', 'allergens')}
+        with open(os.path.join(directory, 'menu_data.json'), 'w', encoding='utf-8') as f:
+            json.dump(columns, f, ensure_ascii=False)
+        
+        manifest = {
+            'version': INDEX_VERSION,
+            'shape': list(matrix.shape),
+            'nnz': int(matrix.nnz),
+            'postings': True,
+            'vectorizer': vectorizer_digest(self.vectorizer),
+            'created_at': datetime.now().isoformat()
+        }
+        with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as f:
+            json.dump(manifest, f)
+    
+    def load_index(self) -> bool:
+        """저장된 유사도 인덱스를 memory-map으로 로드 (역색인이 없는 이전 인덱스면 _postings는 None)"""
+        manifest_path = os.path.join(self.index_dir, 'manifest.json')
+        try:
+            with open(manifest_path, 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            return False
+        
+        if manifest.get('version') != INDEX_VERSION:
+            print(f"유사도 인덱스 버전 불일치 (저장: {manifest.get('version')}, 현재: {INDEX_VERSION})")
+            return False
+        
+        # 어휘 크기만으로는 구별되지 않으므로(max_features) 어휘와 IDF 해시로 확인
+        if manifest.get('vectorizer') != vectorizer_digest(self.vectorizer):
+            print("유사도 인덱스가 현재 벡터라이저로 만들어지지 않았습니다.")
+            return False
+        
+        arrays = {
+            name: np.load(os.path.join(self.index_dir, f'{name}.npy'), mmap_mode='r')
+            for name in ('data', 'indices', 'indptr')
+        }
+        shape = tuple(manifest['shape'])
+        
+        with open(os.path.join(self.index_dir, 'menu_data.json'), 'r', encoding='utf-8') as f:
+            columns = json.load(f)
+        
+        self.menu_vectors = sparse.csr_matrix(
+            (arrays['data'], arrays['indices'], arrays['indptr']), shape=shape, copy=False
+        )
+        self._postings = None
+        if manifest.get('postings'):
+            postings = {
+                name: np.load(os.path.join(self.index_dir, f'postings_{name}.npy'), mmap_mode='r')
+                for name in ('data', 'indices', 'indptr')
+            }
+            self._postings = sparse.csr_matrix(
+                (postings['data'], postings['indices'], postings['indptr']), shape=(shape[1], shape[0]), copy=False
+            )
+            # 저장 전에 정렬됨 (읽기 전용 배열이라 다시 정렬하지 않도록)
+            self._postings.has_sorted_indices = True
+        self.menu_data = [
+            {'id': menu_id, 'name': name, 'category': category, 'ingredients': ingredients, 'allergens': allergens}
+            for menu_id, name, category, ingredients, allergens in zip(
+                columns['id'], columns['name'], columns['category'], columns['ingredients'], columns['allergens']
+            )
+        ]
+        return True
+    
     def load_model(self):
         """저장된 모델 로드"""
         try:
             self.vectorizer = joblib.load(self.vectorizer_path)
-            _, self.menu_data = self.load_menu_data()
-            return True
         except FileNotFoundError:
             print("저장된 모델을 찾을 수 없습니다. 모델을 훈련해주세요.")
             return False
+        
+        if self.load_index():
+            if self._postings is None:
+                self._build_search_index()
+            self._build_allergen_index()
+            return True
+        
+        # 인덱스가 없으면 (이전 버전에서 훈련된 모델) 메모리에서 행렬 구성
+        print("저장된 유사도 인덱스가 없거나 벡터라이저와 맞지 않아 메뉴 행렬을 다시 계산합니다. 모델을 재훈련하면 인덱스가 저장됩니다.")
+        menu_texts, self.menu_data = self.load_menu_data()
+        self.menu_vectors = self.vectorizer.transform([self.preprocess_text(text) for text in menu_texts])
+        self._build_search_index()
+        self._build_allergen_index()
+        return True
+    
+    def _build_search_index(self):
+        """메뉴 TF-IDF 행렬을 전치해 n-gram별 포스팅 목록(역색인) 구성 (훈련 시, 또는 역색인이 저장되지 않은 경우)"""
+        self._postings = sparse.csr_matrix(self.menu_vectors.T)
+        self._postings.sort_indices()
+    
+    def _build_allergen_index(self):
+        """메뉴별 알레르기 성분을 비트마스크로 인코딩 (메뉴 로드 시 1회)"""
+        allergen_ids = {}
+        for menu in self.menu_data:
+            for allergen in menu['allergens']:
+                allergen_ids.setdefault(allergen, len(allergen_ids))
+        
+        n_words = max(1, (len(allergen_ids) + 63) // 64)
+        masks = np.zeros((len(self.menu_data), n_words), dtype=np.uint64)
+        for row, menu in enumerate(self.menu_data):
+            for allergen in menu['allergens']:
+                bit = allergen_ids[allergen]
+                masks[row, bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+        
+        self.allergen_ids = allergen_ids
+        self._allergen_masks = masks
+        # 자주 쓰이는 알레르기 조합의 결과 메모이제이션 (인덱스를 새로 만들면 초기화)
+        self._safe_indices_cached = lru_cache(maxsize=256)(self._compute_safe_indices)
+    
+    def allergy_mask(self, user_allergies: List[str]) -> np.ndarray:
+        """사용자 알레르기 목록을 비트마스크로 변환 (메뉴에 없는 알레르기는 무시)"""
+        mask = np.zeros(self._allergen_masks.shape[1], dtype=np.uint64)
+        for allergy in user_allergies:
+            bit = self.allergen_ids.get(allergy)
+            if bit is not None:
+                mask[bit // 64] |= np.uint64(1) << np.uint64(bit % 64)
+        return mask
+    
+    def _compute_safe_indices(self, user_allergies: frozenset) -> np.ndarray:
+        """알레르기 성분이 없는 메뉴 인덱스 (벡터화된 AND 1회)"""
+        mask = self.allergy_mask(list(user_allergies))
+        unsafe = (self._allergen_masks & mask).any(axis=1)
+        safe_indices = np.flatnonzero(~unsafe)
+        safe_indices.setflags(write=False)
+        return safe_indices
+    
+    def _search(self, query_vectors: sparse.csr_matrix, top_k: int) -> List[List[Tuple[int, float]]]:
+        """
+        역색인으로 쿼리별 상위 top_k 메뉴 검색 [(메뉴 행, 유사도), ...]
+        
+        쿼리와 n-gram을 하나 이상 공유하는 메뉴의 포스팅만 더하므로 비용은 메뉴 수가 아니라
+        쿼리 n-gram의 포스팅 길이에 비례합니다. 임계값 미만 후보를 먼저 버린 뒤 부분 선택으로 상위 k개를 고르고
+        유사도 내림차순, 같으면 메뉴 순서대로 정렬합니다.
+        """
+        if top_k <= 0:
+            return [[] for _ in range(query_vectors.shape[0])]
+        
+        # TF-IDF 벡터는 L2 정규화되어 있으므로 내적 = 코사인 유사도
+        scores = sparse.csr_matrix(query_vectors @ self._postings)
+        
+        batch_results = []
+        for i in range(scores.shape[0]):
+            start, end = scores.indptr[i], scores.indptr[i + 1]
+            values = scores.data[start:end]
+            keep = values > MIN_SIMILARITY
+            rows, values = scores.indices[start:end][keep], values[keep]
+            
+            if len(values) > top_k:
+                # k번째 유사도 이상만 남김 (경계에 같은 값이 여럿이면 모두 남겨 정렬에서 메뉴 순서로 결정)
+                kth = np.partition(values, len(values) - top_k)[len(values) - top_k]
+                keep = values >= kth
+                rows, values = rows[keep], values[keep]
+            
+            order = np.lexsort((rows, -values))[:top_k]
+            batch_results.append([(int(rows[j]), float(values[j])) for j in order])
+        return batch_results
     
-    def find_similar_menus(self, query: str, top_k: int = 5) -> List[Dict]:
-        """유사한 메뉴 찾기"""
+    def _format_results(self, matches: List[Tuple[int, float]]) -> List[Dict]:
+        return [
+            {
+                'menu': self.menu_data[idx],
+                'similarity': similarity,
+                'rank': rank
+            }
+            for rank, (idx, similarity) in enumerate(matches, start=1)
+        ]
+    
+    @metrics.timed("similar_menus")
+    def find_similar_menus(self, query: TextInput, top_k: int = 5) -> List[Dict]:
+        """유사한 메뉴 찾기 (NormalizedText를 넘기면 전처리/토큰화 결과를 재사용)"""
         if self.menu_vectors is None:
             if not self.load_model():
                 return []
         
-        # 쿼리 텍스트 전처리 및 벡터화
-        processed_query = self.preprocess_text(query)
-        query_vector = self.vectorizer.transform([processed_query])
-        
-        # 코사인 유사도 계산
-        similarities = cosine_similarity(query_vector, self.menu_vectors).flatten()
-        
-        # 상위 k개 결과 반환
-        top_indices = np.argsort(similarities)[::-1][:top_k]
+        query_vector = tfidf_transform(self.vectorizer, [as_normalized(query)])
+        return self._format_results(self._search(query_vector, top_k)[0])
+    
+    @metrics.timed("similar_menus_batch")
+    def find_similar_menus_batch(self, queries: List[TextInput], top_k: int = 5) -> List[List[Dict]]:
+        """여러 쿼리의 유사 메뉴 일괄 검색 (벡터화 1회 + 역색인 희소 행렬 곱 1회)"""
+        if not queries:
+            return []
         
-        results = []
-        for idx in top_indices:
-            if similarities[idx] > 0.1:  # 최소 유사도 임계값
-                results.append({
-                    'menu': self.menu_data[idx],
-                    'similarity': float(similarities[idx]),
-                    'rank': len(results) + 1
-                })
+        if self.menu_vectors is None:
+            if not self.load_model():
+                return [[] for _ in queries]
         
-        return results
+        query_vectors = tfidf_transform(self.vectorizer, queries)
+        return [self._format_results(matches) for matches in self._search(query_vectors, top_k)]
     
     def find_menus_by_ingredient(self, ingredient: str, top_k: int = 10) -> List[Dict]:
         """특정 성분이 포함된 메뉴 찾기"""
@@ -141,24 +360,27 @@ class MenuSimilarityModel:
         results.sort(key=lambda x: x['ingredient_count'], reverse=True)
         return results[:top_k]
     
+    @metrics.timed("safe_menus")
     def find_safe_menus(self, user_allergies: List[str], top_k: int = 10) -> List[Dict]:
         """사용자 알레르기에 안전한 메뉴 찾기"""
         if not self.menu_data:
             if not self.load_model():
                 return []
         
-        safe_menus = []
-        for menu in self.menu_data:
-            # 알레르기 성분이 없는 메뉴만 선택
-            has_allergen = any(allergen in menu['allergens'] for allergen in user_allergies)
-            if not has_allergen:
-                safe_menus.append({
-                    'menu': menu,
-                    'safety_score': 1.0,
-                    'reason': '알레르기 성분 없음'
-                })
+        if self._allergen_masks is None:
+            self._build_allergen_index()
         
-        return safe_menus[:top_k]
+        # 알레르기 성분이 없는 메뉴만 선택
+        safe_indices = self._safe_indices_cached(frozenset(user_allergies))
+        
+        return [
+            {
+                'menu': self.menu_data[idx],
+                'safety_score': 1.0,
+                'reason': '알레르기 성분 없음'
+            }
+            for idx in safe_indices[:top_k]
+        ]
     
     def get_menu_suggestions(self, query: str, user_allergies: List[str] = None) -> Dict:
         """메뉴 추천 (유사도 + 안전성 고려)"""
@@ -0,0 +1,98 @@
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+
+def osa_distance(first: str, second: str, max_distance: int) -> Optional[int]:
+    """
+    제한 편집 거리 (Optimal String Alignment: 삽입/삭제/치환/인접 문자 교환)
+
+    max_distance를 넘으면 계산을 중단하고 None을 반환합니다.
+    """
+    if abs(len(first) - len(second)) > max_distance:
+        return None
+    if first == second:
+        return 0
+
+    previous_previous: List[int] = []
+    previous = list(range(len(second) + 1))
+    for i in range(1, len(first) + 1):
+        current = [i] + [0] * len(second)
+        for j in range(1, len(second) + 1):
+            cost = 0 if first[i - 1] == second[j - 1] else 1
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (i > 1 and j > 1 and first[i - 1] == second[j - 2]
+                    and first[i - 2] == second[j - 1]):
+                value = min(value, previous_previous[j - 2] + 1)
+            current[j] = value
+        if min(current) > max_distance:
+            return None
+        previous_previous, previous = previous, current
+
+    distance = previous[-1]
+    return distance if distance <= max_distance else None
+
+
+class SymSpellIndex:
+    """
+    삭제 기반 근사 문자열 검색 (SymSpell)
+
+    사전 단어마다 앞 prefix_length 글자에서 문자를 최대 max_distance개 지운 변형을 미리 색인해 두고,
+    조회 시 쿼리의 삭제 변형만 dict에서 찾아 후보를 모은 뒤 전체 문자열의 편집 거리로 확인합니다.
+    변형 수가 prefix_length와 max_distance로만 정해지므로 조회 비용은 사전 크기, 쿼리 길이와 거의 무관합니다.
+    """
+
+    def __init__(self, max_distance: int = 2, prefix_length: int = 7):
+        self.max_distance = max_distance
+        self.prefix_length = max(prefix_length, max_distance + 1)
+        self._terms: Dict[str, List[Any]] = {}       # 단어 → 값 목록 (추가 순서)
+        self._deletes: Dict[str, Set[str]] = {}      # 삭제 변형 → 단어 집합
+
+    def __len__(self) -> int:
+        return len(self._terms)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._terms
+
+    def _variants(self, term: str, max_distance: int) -> Set[str]:
+        """term 앞부분에서 문자를 0 ~ max_distance개 지운 변형 (지우지 않은 앞부분 포함)"""
+        variants = {term[:self.prefix_length]}
+        frontier = variants
+        for _ in range(max_distance):
+            frontier = {variant[:i] + variant[i + 1:] for variant in frontier for i in range(len(variant))} - variants
+            variants |= frontier
+        return variants
+
+    def add(self, term: str, value: Any):
+        """단어 추가 (같은 단어에 값을 여러 개 추가할 수 있음)"""
+        if not term:
+            return
+        values = self._terms.get(term)
+        if values is not None:
+            if value not in values:
+                values.append(value)
+            return
+        self._terms[term] = [value]
+        for variant in self._variants(term, self.max_distance):
+            self._deletes.setdefault(variant, set()).add(term)
+
+    def lookup(self, query: str, max_distance: Optional[int] = None) -> List[Tuple[str, int, List[Any]]]:
+        """
+        편집 거리 max_distance 이내의 단어 찾기
+
+        Returns:
+            (단어, 거리, 값 목록) 목록 - 거리, 단어 순으로 정렬
+        """
+        max_distance = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        if max_distance < 0 or not query:
+            return []
+
+        candidates: Set[str] = set()
+        for variant in self._variants(query, max_distance):
+            candidates.update(self._deletes.get(variant, ()))
+
+        results = []
+        for term in candidates:
+            distance = osa_distance(query, term, max_distance)
+            if distance is not None:
+                results.append((term, distance, list(self._terms[term])))
+        results.sort(key=lambda result: (result[1], result[0]))
+        return results
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+성분 매칭 / 유사 메뉴 검색 동등성 테스트
+색인 기반 구현이 이전의 순차 검색 구현과 같은 결과를 내는지 메뉴 카탈로그와 경계 입력으로 확인합니다.
+역색인, 오토마톤, 동의어 색인을 바꿀 때 함께 실행하세요.
+
+- 동의어 겹침: _synonyms_overlap == 이전 find_ingredient_synonyms 결과의 교집합
+- 알레르기 체크: check_allergy_risk == 알레르기마다 동의어 목록을 다시 찾던 이전 구현
+- 성분 추출: Aho-Corasick 오토마톤 == 동의어마다 부분 문자열 검색
+- 유사 메뉴: 역색인 _search == 전체 코사인 유사도 + 정렬 (저장 후 다시 불러온 인덱스도 동일)
+
+경계 입력: 빈 텍스트, 대소문자 혼합, 두 성분이 공유하는 동의어(croissant 등), 사전에 없는 알레르기
+
+실행 (ai-server 디렉토리에서):
+    python -m pytest -q test_matching_equivalence.py
+"""
+
+import re
+from itertools import product
+
+import joblib
+import numpy as np
+import pytest
+from sklearn.metrics.pairwise import cosine_similarity
+
+from models.ingredient_matcher import IngredientMatcher
+from models.menu_catalog import get_menu_catalog
+from models.menu_similarity import MIN_SIMILARITY, MenuSimilarityModel
+
+# 사전에 없는 성분/알레르기와 특수한 입력
+UNKNOWN_TERMS = ["", "고수", "Unknown", "msg", "MILK ", "밀크티"]
+EDGE_TEXTS = ["", "   ", "!!!", "ICED LATTE", "Hot Chocolate 핫초코", "Croissant & 크로아상", "juice", "아이스티 ICE"]
+
+
+@pytest.fixture(scope="module")
+def catalog():
+    return get_menu_catalog()
+
+
+@pytest.fixture(scope="module")
+def matcher():
+    matcher = IngredientMatcher()
+    matcher.load_ingredient_data()
+    return matcher
+
+
+# 이전 구현 (색인 도입 전, 동의어 사전을 순차 검색)
+
+def legacy_preprocess(text):
+    text = re.sub(r'[^가-힣a-zA-Z0-9\s]', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    return text.lower()
+
+
+def legacy_synonyms(matcher, ingredient):
+    for synonyms in matcher.ingredient_synonyms.values():
+        if ingredient.lower() in [s.lower() for s in synonyms]:
+            return synonyms
+    return [ingredient]
+
+
+def legacy_normalize(matcher, ingredient):
+    for main_ingredient, synonyms in matcher.ingredient_synonyms.items():
+        if ingredient.lower() in [s.lower() for s in synonyms]:
+            return main_ingredient
+    return ingredient
+
+
+def legacy_extract(matcher, text):
+    text = legacy_preprocess(text)
+    return {
+        main_ingredient
+        for main_ingredient, synonyms in matcher.ingredient_synonyms.items()
+        if any(synonym.lower() in text for synonym in synonyms)
+    }
+
+
+def legacy_check_allergy_risk(matcher, ingredients, user_allergies):
+    """이전 check_allergy_risk의 (위험 성분, 안전 성분)"""
+    risk_found, safe_ingredients = [], []
+    for ingredient in ingredients:
+        normalized_ingredient = legacy_normalize(matcher, ingredient)
+        for allergy in user_allergies:
+            normalized_allergy = legacy_normalize(matcher, allergy)
+            if normalized_ingredient == normalized_allergy:
+                risk_found.append({'ingredient': ingredient, 'allergy': allergy, 'match_type': 'direct'})
+                break
+            if (set(legacy_synonyms(matcher, normalized_ingredient))
+                    & set(legacy_synonyms(matcher, normalized_allergy))):
+                risk_found.append({'ingredient': ingredient, 'allergy': allergy, 'match_type': 'synonym'})
+                break
+        else:
+            safe_ingredients.append(ingredient)
+    return risk_found, safe_ingredients
+
+
+def vocabulary_terms(matcher, catalog):
+    """동의어 사전 표면형(대소문자 변형 포함) + 카탈로그 성분/알레르기 + 사전에 없는 단어"""
+    terms = set(UNKNOWN_TERMS)
+    for main_ingredient, synonyms in matcher.ingredient_synonyms.items():
+        for term in [main_ingredient, *synonyms]:
+            terms.update((term, term.upper(), term.title()))
+    for menu in catalog:
+        terms.update(menu.ingredients or [])
+        terms.update(menu.allergens or [])
+    return sorted(terms)
+
+
+# 동의어 색인
+
+def test_shared_synonym_links_both_ingredients(matcher):
+    # '크로아상', '머핀' 등은 밀과 계란 양쪽의 동의어
+    assert matcher._synonyms_overlap('밀', '계란')
+    assert matcher._synonyms_overlap('CROISSANT', '계란')
+    assert not matcher._synonyms_overlap('밀', '우유')
+    assert not matcher._synonyms_overlap('고수', '우유')
+    assert matcher._synonyms_overlap('고수', '고수')
+
+
+def test_synonyms_overlap_matches_legacy(matcher, catalog):
+    terms = vocabulary_terms(matcher, catalog)
+    legacy_sets = {term: set(legacy_synonyms(matcher, term)) for term in terms}
+    for first, second in product(terms, repeat=2):
+        expected = bool(legacy_sets[first] & legacy_sets[second])
+        assert matcher._synonyms_overlap(first, second) == expected, (first, second)
+
+
+def test_normalize_and_synonyms_match_legacy(matcher, catalog):
+    for term in vocabulary_terms(matcher, catalog):
+        assert matcher.normalize_ingredient(term) == legacy_normalize(matcher, term), term
+        assert matcher.find_ingredient_synonyms(term) == list(legacy_synonyms(matcher, term)), term
+
+
+def test_check_allergy_risk_matches_legacy(matcher, catalog):
+    allergy_lists = [
+        [],
+        ['우유'],
+        ['MILK', '밀'],
+        ['고수', 'Unknown'],
+        ['계란', '고수', 'Peanut'],
+        sorted({allergen for menu in catalog for allergen in menu.allergens or []}),
+    ]
+    for menu, user_allergies in product(catalog, allergy_lists):
+        ingredients = list(menu.ingredients or [])
+        result = matcher.check_allergy_risk(ingredients, user_allergies)
+        risk_found, safe_ingredients = legacy_check_allergy_risk(matcher, ingredients, user_allergies)
+        assert result['risky_ingredients'] == risk_found, (menu.name, user_allergies)
+        assert result['safe_ingredients'] == safe_ingredients, (menu.name, user_allergies)
+
+
+# 성분 추출 오토마톤
+
+def extraction_texts(catalog):
+    texts = list(EDGE_TEXTS)
+    for menu in catalog:
+        ingredients = " ".join(menu.ingredients or [])
+        texts.extend((menu.name, menu.name.upper(), f"{menu.name} ({ingredients})"))
+    return texts
+
+
+def test_extract_ingredients_matches_legacy(matcher, catalog):
+    for text in extraction_texts(catalog):
+        extracted = matcher.extract_ingredients_from_text(text)
+        assert len(extracted) == len(set(extracted)), text
+        assert set(extracted) == legacy_extract(matcher, text), text
+
+
+def test_ingredient_matches_are_all_substring_occurrences(matcher, catalog):
+    patterns = {(main_ingredient, synonym.lower())
+                for main_ingredient, synonyms in matcher.ingredient_synonyms.items() for synonym in synonyms}
+    for text in extraction_texts(catalog):
+        cleaned = legacy_preprocess(text)
+        expected = set()
+        for main_ingredient, synonym in patterns:
+            start = cleaned.find(synonym)
+            while start != -1:
+                expected.add((main_ingredient, synonym, start, start + len(synonym)))
+                start = cleaned.find(synonym, start + 1)
+
+        matches = matcher.find_ingredient_matches(text)
+        actual = {(m['ingredient'], m['synonym'], m['start'], m['end']) for m in matches}
+        assert actual == expected, text
+
+
+# 유사 메뉴 역색인
+
+@pytest.fixture(scope="module")
+def similarity_models(tmp_path_factory):
+    """(훈련 직후 모델, 저장된 인덱스를 다시 불러온 모델)"""
+    model_dir = str(tmp_path_factory.mktemp("menu_similarity"))
+    trained = MenuSimilarityModel(model_dir=model_dir, vectorizer='tfidf')
+    assert trained.train()
+    loaded = MenuSimilarityModel(model_dir=model_dir, vectorizer='tfidf')
+    assert loaded.load_model()
+    return trained, loaded
+
+
+def legacy_search(model, query, top_k):
+    """이전 find_similar_menus: 전체 코사인 유사도를 내림차순 정렬해 상위 top_k 중 임계값 초과만"""
+    query_vector = model.vectorizer.transform([legacy_preprocess(query)])
+    similarities = cosine_similarity(query_vector, model.menu_vectors).flatten()
+    top_indices = np.argsort(similarities)[::-1][:top_k]
+    return similarities, [(int(idx), float(similarities[idx])) for idx in top_indices if similarities[idx] > MIN_SIMILARITY]
+
+
+def similarity_queries(catalog):
+    queries = list(EDGE_TEXTS) + ["라떼", "Latte", "카페 라떼", "딸기", "xyz"]
+    for menu in list(catalog)[::7]:
+        queries.extend((menu.name, menu.name.upper()))
+    return queries
+
+
+@pytest.mark.parametrize("top_k", [1, 5, 20])
+def test_search_matches_brute_force(similarity_models, catalog, top_k):
+    trained, loaded = similarity_models
+    for query in similarity_queries(catalog):
+        similarities, expected = legacy_search(trained, query, top_k)
+        actual = [(match['menu']['name'], match['similarity'])
+                  for match in trained.find_similar_menus(query, top_k=top_k)]
+        rows = [row for row, _ in trained._search(trained.vectorizer.transform([legacy_preprocess(query)]), top_k)[0]]
+
+        # 같은 유사도가 여럿이면 고르는 메뉴가 다를 수 있으므로 유사도 순서와 각 메뉴의 실제 유사도로 비교
+        assert [s for _, s in actual] == pytest.approx([s for _, s in expected], abs=1e-9), query
+        assert len(set(rows)) == len(rows), query
+        for row, (name, similarity) in zip(rows, actual):
+            assert trained.menu_data[row]['name'] == name
+            assert similarity == pytest.approx(similarities[row], abs=1e-9), query
+
+        assert loaded.find_similar_menus(query, top_k=top_k) == trained.find_similar_menus(query, top_k=top_k), query
+
+
+def test_index_with_other_vectorizer_is_not_used(similarity_models, tmp_path):
+    """벡터라이저만 새로 저장된 경우(같은 어휘 크기) 이전 인덱스를 쓰지 않고 메뉴 행렬을 다시 계산"""
+    trained, _ = similarity_models
+    model = MenuSimilarityModel(model_dir=str(tmp_path), vectorizer='tfidf')
+    assert model.train()
+
+    # 어휘는 같고 IDF만 다른 벡터라이저로 교체 (메뉴 하나를 두 번 넣어 학습)
+    texts = [legacy_preprocess(menu['name']) for menu in model.menu_data]
+    vectorizer = joblib.load(model.vectorizer_path)
+    vectorizer.fit(texts + texts[:1])
+    assert vectorizer.vocabulary_ == trained.vectorizer.vocabulary_
+    joblib.dump(vectorizer, model.vectorizer_path)
+
+    reloaded = MenuSimilarityModel(model_dir=str(tmp_path), vectorizer='tfidf')
+    reloaded.vectorizer = joblib.load(reloaded.vectorizer_path)
+    assert not reloaded.load_index()
+    assert reloaded.load_model()
+    for query in ["라떼", "딸기"]:
+        _, expected = legacy_search(reloaded, query, 5)
+        assert [s for _, s in expected] == pytest.approx(
+            [match['similarity'] for match in reloaded.find_similar_menus(query, top_k=5)], abs=1e-9)
+
+
+def test_search_batch_matches_single(similarity_models, catalog):
+    trained, loaded = similarity_models
+    queries = similarity_queries(catalog)
+    for model in (trained, loaded):
+        assert model.find_similar_menus_batch(queries, top_k=5) == [
+            model.find_similar_menus(query, top_k=5) for query in queries
+        ]
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+OCR 배치 인식 일치 테스트
+two_phase 모드의 recognize_boxes(EasyOCR 내부 함수로 배치 인식)가
+EasyOCR 공개 API reader.recognize와 같은 결과를 내는지 샘플 이미지로 확인합니다.
+recognize_boxes는 EasyOCR 내부 함수에 의존하므로 requirements.txt의 easyocr 버전을 올릴 때 함께 실행하세요.
+
+- batch_size=1: 패딩이 없으므로 박스, 텍스트, 신뢰도가 reader.recognize와 모두 같아야 함
+- 기본 배치: 박스가 같고 텍스트가 90% 이상 같아야 함 (배치 안 패딩으로 일부 달라질 수 있음)
+
+EasyOCR 모델을 불러올 수 없으면(미설치, 다운로드 불가) 건너뜁니다.
+
+실행 (ai-server 디렉토리에서):
+    python -m pytest -q test_ocr_recognize.py
+"""
+
+from pathlib import Path
+
+import pytest
+
+from utils import ocr_worker
+
+SAMPLE_IMAGE = (Path(__file__).parent / "sample_ocr_dataset" / "Sample" / "01.원천데이터"
+                / "OCR" / "KE" / "PB" / "OCR_KE_P5_010445.jpeg")
+
+
+@pytest.fixture(scope="module")
+def detected():
+    """전처리된 샘플 이미지의 (그레이스케일 이미지, 가로 박스, 기울어진 박스)"""
+    cv2 = pytest.importorskip("cv2")
+    pytest.importorskip("easyocr")
+    ocr_worker.init_ocr_worker()
+    if not ocr_worker.is_ocr_ready():
+        pytest.skip("EasyOCR Reader를 불러올 수 없습니다")
+
+    image = ocr_worker._decode_image(SAMPLE_IMAGE.read_bytes(), {}, {})
+    grey = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    horizontal_list, free_list = ocr_worker.detect_boxes(image)
+    assert horizontal_list or free_list, "샘플 이미지에서 검출된 박스가 없습니다"
+    return grey, horizontal_list, free_list
+
+
+def reference(grey, horizontal_list, free_list):
+    """EasyOCR 공개 API로 인식한 결과 (recognize_boxes와 같은 형식)"""
+    results = ocr_worker.reader.recognize(grey, horizontal_list, free_list)
+    return [
+        {"box": [[int(x), int(y)] for x, y in box], "text": text, "confidence": round(float(confidence), 4)}
+        for box, text, confidence in results
+    ]
+
+
+def by_box(boxes):
+    """박스 좌표 → 인식 결과"""
+    return {str(item["box"]): item for item in boxes}
+
+
+def test_unbatched_matches_recognize(detected):
+    expected = by_box(reference(*detected))
+    actual = by_box(ocr_worker.recognize_boxes([detected], batch_size=1)[0])
+
+    assert ocr_worker._batched_recognition, "배치 인식이 readtext로 대체되었습니다 (easyocr 버전 확인)"
+    assert actual.keys() == expected.keys()
+    for key, item in expected.items():
+        assert actual[key]["text"] == item["text"]
+        assert actual[key]["confidence"] == pytest.approx(item["confidence"], abs=1e-3)
+
+
+def test_batched_matches_recognize(detected):
+    expected = by_box(reference(*detected))
+    actual = by_box(ocr_worker.recognize_boxes([detected, detected])[1])
+
+    assert ocr_worker._batched_recognition, "배치 인식이 readtext로 대체되었습니다 (easyocr 버전 확인)"
+    assert actual.keys() == expected.keys()
+    same_text = sum(actual[key]["text"] == item["text"] for key, item in expected.items())
+    assert same_text >= len(expected) * 0.9
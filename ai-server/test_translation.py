@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+메뉴 텍스트 번역 테스트
+사전 번역이 영어 구간만 바꾸고 나머지 OCR 텍스트(한글, 가격, 줄바꿈, 대소문자)는 그대로 두는지 확인합니다.
+
+실행 (ai-server 디렉토리에서):
+    python -m pytest -q test_translation.py
+"""
+
+import asyncio
+
+import pytest
+
+from utils.translation import DictionaryTranslator, TranslationService
+
+PHRASES = {'iced latte': '아이스 라떼', 'latte': '라떼', 'milk': '우유', 'hot': '뜨거운'}
+
+# 영어 단어가 없는 OCR 결과 (group_lines가 만든 줄바꿈 포함)
+PASSTHROUGH_TEXTS = [
+    '아이스 라떼\n우유 4,500원 (핫)',
+    '아이스 라떼\n우유 4,500원',
+    '  카페모카  5.0\n\n바닐라라떼 ₩4,800 ',
+    '딸기스무디 / 6,000',
+]
+
+
+@pytest.fixture
+def service():
+    service = TranslationService(dictionary=DictionaryTranslator(PHRASES), remote=None)
+    yield service
+    service.shutdown()
+
+
+@pytest.mark.parametrize("text", PASSTHROUGH_TEXTS)
+def test_text_without_english_passes_through(service, text):
+    assert service.dictionary.translate_with_coverage(text) == (text, 1.0)
+    assert asyncio.run(service.translate(text)) == (text, "dictionary")
+
+
+@pytest.mark.parametrize("text", ['아이스 Cortado\n4,500원', 'Flat White 5,000원'])
+def test_unknown_english_passes_through(service, text):
+    assert asyncio.run(service.translate(text)) == (text, "fallback")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('아이스 라떼\n우유 4,500원 (HOT)', '아이스 라떼\n우유 4,500원 (뜨거운)'),
+    ('ICED  LATTE\n4,500원', '아이스 라떼\n4,500원'),
+    ('Latte (Milk) 5.0', '라떼 (우유) 5.0'),
+])
+def test_only_english_spans_are_replaced(service, text, expected):
+    assert asyncio.run(service.translate(text)) == (expected, "dictionary")
+
+
+def test_partial_translation_keeps_untranslated_text(service):
+    assert asyncio.run(service.translate('Latte and Cake\n4,500원')) == ('라떼 and Cake\n4,500원', "fallback")
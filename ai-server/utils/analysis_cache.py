@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+메뉴 분석 결과 캐시
+자주 들어오는 메뉴(아메리카노, 카페 라떼 ...)나 같은 OCR 결과를 다시 분석하지 않도록
+AIAnalysisEngine.analyze_menu_text의 결과를 저장합니다.
+
+- 결과 계층: (정규화된 텍스트, 중복 제거한 알레르기 목록, 모델 번들 버전) → 전체 분석 결과
+  (텍스트 정규화는 utils.text_normalization.canonical_text)
+- 텍스트 계층: (정규화된 텍스트, 모델 번들 버전) → 알레르기와 무관한 단계 결과 (분류, 유사 메뉴, 성분 추출)
+  새로운 알레르기 조합으로 요청이 와도 위험도/추천 단계만 다시 계산합니다.
+
+두 계층 모두 LRU + TTL로 제거되며, 재훈련 시 해당 버전의 항목이 모두 무효화됩니다.
+"""
+
+import os
+import copy
+import time
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, Optional, Tuple
+
+
+def allergy_key(user_allergies: Optional[Iterable[str]]) -> Tuple[str, ...]:
+    """
+    캐시 키이자 분석 입력으로 쓰는 알레르기 목록 (중복 제거, 요청 순서 유지)
+    경고/안전 팁과 응답의 user_allergies가 요청 순서를 따르므로 순서가 다르면 다른 키로 취급합니다.
+    """
+    return tuple(dict.fromkeys(user_allergies or ()))
+
+
+class _LRUTTL:
+    """LRU + TTL 저장소 (항목마다 저장 시각을 기록하고 조회 시 만료 확인)"""
+
+    def __init__(self, max_entries: int, ttl: float):
+        self.max_entries = max(0, max_entries)
+        self.ttl = ttl
+        self._items: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._items.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        stored_at, value = entry
+        if self.ttl > 0 and time.monotonic() - stored_at > self.ttl:
+            del self._items[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key: Hashable, value: Any):
+        if self.max_entries == 0:
+            return
+        self._items[key] = (time.monotonic(), value)
+        self._items.move_to_end(key)
+        while len(self._items) > self.max_entries:
+            self._items.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate(self, version: Optional[str] = None) -> int:
+        """버전이 같은 항목 제거 (키의 마지막 요소가 버전, None이면 전체)"""
+        if version is None:
+            removed = len(self._items)
+            self._items.clear()
+            return removed
+        keys = [key for key in self._items if key[-1] == version]
+        for key in keys:
+            del self._items[key]
+        return len(keys)
+
+    def get_stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._items),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations
+        }
+
+
+class AnalysisCache:
+    def __init__(self, max_results: int = 1024, max_texts: int = 4096, ttl: float = 600.0):
+        """
+        분석 결과 캐시 초기화
+
+        Args:
+            max_results: 결과 계층 최대 항목 수 (0이면 비활성화)
+            max_texts: 텍스트 계층 최대 항목 수 (0이면 비활성화)
+            ttl: 항목 유효 시간 (초, 0이면 만료 없음)
+        """
+        self.ttl = ttl
+        self._results = _LRUTTL(max_results, ttl)
+        self._texts = _LRUTTL(max_texts, ttl)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "AnalysisCache":
+        """환경 변수(ANALYSIS_CACHE_SIZE, ANALYSIS_TEXT_CACHE_SIZE, ANALYSIS_CACHE_TTL)로 캐시 생성"""
+        return cls(
+            max_results=int(os.getenv("ANALYSIS_CACHE_SIZE", "1024")),
+            max_texts=int(os.getenv("ANALYSIS_TEXT_CACHE_SIZE", "4096")),
+            ttl=float(os.getenv("ANALYSIS_CACHE_TTL", "600"))
+        )
+
+    # 저장된 값은 호출자가 결과를 수정해도 바뀌지 않도록 복사본으로 주고받음
+
+    def get_result(self, text: str, allergies: Tuple[str, ...], version: str) -> Optional[Dict]:
+        with self._lock:
+            value = self._results.get((text, allergies, version))
+        return copy.deepcopy(value) if value is not None else None
+
+    def put_result(self, text: str, allergies: Tuple[str, ...], version: str, result: Dict):
+        value = copy.deepcopy(result)
+        with self._lock:
+            self._results.put((text, allergies, version), value)
+
+    def get_text_stages(self, text: str, version: str) -> Optional[Dict]:
+        with self._lock:
+            value = self._texts.get((text, version))
+        return copy.deepcopy(value) if value is not None else None
+
+    def put_text_stages(self, text: str, version: str, stages: Dict):
+        value = copy.deepcopy(stages)
+        with self._lock:
+            self._texts.put((text, version), value)
+
+    def invalidate(self, version: Optional[str] = None) -> int:
+        """모델 버전의 항목 무효화 (None이면 전체), 제거한 항목 수 반환"""
+        with self._lock:
+            return self._results.invalidate(version) + self._texts.invalidate(version)
+
+    def get_stats(self) -> Dict:
+        """계층별 항목 수 및 적중률"""
+        with self._lock:
+            return {
+                "ttl": self.ttl,
+                "results": self._results.get_stats(),
+                "text_stages": self._texts.get_stats()
+            }
+
+
+# 프로세스 전역 분석 캐시 (키에 모델 번들 버전이 포함되므로 번들 간에 공유)
+analysis_cache = AnalysisCache.from_env()
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+컴파일된 랜덤 포레스트 추론
+학습된 RandomForestClassifier의 트리들을 평탄한 NumPy 노드 배열(feature, threshold, 자식, 클래스 확률) 하나로 합치고,
+모든 행 × 모든 트리를 깊이만큼의 벡터 연산으로 한꺼번에 탐색해 predict_proba를 계산합니다.
+
+- sklearn의 호출마다의 입력 검증과 트리별 반복(100개 트리 → 100번 호출)이 없고
+- 확률 한 번으로 라벨(argmax)과 신뢰도(max)를 함께 얻으므로 predict + predict_proba처럼 트리를 두 번 돌지 않습니다.
+
+sklearn과 같은 규칙(float32 입력, x <= threshold면 왼쪽, 트리 확률의 순차 합 / 트리 수)으로 계산하며,
+verify()로 sklearn 결과와 일치하는지 확인한 뒤 사용합니다.
+"""
+
+import numpy as np
+from scipy import sparse
+
+
+class CompiledForest:
+    def __init__(self, feature: np.ndarray, threshold: np.ndarray, left: np.ndarray, right: np.ndarray,
+                 value: np.ndarray, roots: np.ndarray, columns: np.ndarray, classes: np.ndarray, max_depth: int):
+        """
+        평탄화된 포레스트 (from_sklearn으로 생성)
+
+        Args:
+            feature: 노드별 분기 열 (columns 기준 위치, 리프는 0)
+            threshold: 노드별 분기 기준값 (리프는 inf라 항상 왼쪽)
+            left, right: 노드별 자식 노드 (전체 배열 기준 위치, 리프는 자기 자신)
+            value: 노드별 클래스 확률 (n_nodes, n_classes)
+            roots: 트리별 루트 노드
+            columns: 분기에 쓰이는 입력 열 (원래 특성 번호)
+            classes: 클래스 값 (sklearn classes_)
+            max_depth: 가장 깊은 트리의 깊이 (탐색 반복 횟수)
+        """
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.value = value
+        self.roots = roots
+        self.columns = columns
+        self.classes = classes
+        self.max_depth = max_depth
+
+    @classmethod
+    def from_sklearn(cls, forest) -> "CompiledForest":
+        """학습된 RandomForestClassifier (단일 출력) 평탄화"""
+        if getattr(forest, "n_outputs_", 1) != 1:
+            raise ValueError("단일 출력 포레스트만 지원합니다")
+
+        trees = [estimator.tree_ for estimator in forest.estimators_]
+        offsets = np.cumsum([0] + [tree.node_count for tree in trees])
+        used = np.unique(np.concatenate([tree.feature[tree.children_left != -1] for tree in trees]))
+
+        features, thresholds, lefts, rights, values = [], [], [], [], []
+        for offset, tree in zip(offsets, trees):
+            nodes = np.arange(tree.node_count)
+            is_leaf = tree.children_left == -1
+            features.append(np.where(is_leaf, 0, np.searchsorted(used, tree.feature)))
+            thresholds.append(np.where(is_leaf, np.inf, tree.threshold))
+            lefts.append(np.where(is_leaf, nodes, tree.children_left) + offset)
+            rights.append(np.where(is_leaf, nodes, tree.children_right) + offset)
+            # sklearn 1.4 이전에는 value가 샘플 수라 트리 predict_proba처럼 행 합으로 나눔 (이후 버전은 이미 비율)
+            value = tree.value[:, 0, :].astype(np.float64)
+            normalizer = value.sum(axis=1, keepdims=True)
+            if not np.allclose(normalizer, 1.0):
+                normalizer[normalizer == 0.0] = 1.0
+                value = value / normalizer
+            values.append(value)
+
+        return cls(
+            feature=np.concatenate(features).astype(np.intp),
+            threshold=np.concatenate(thresholds),
+            left=np.concatenate(lefts).astype(np.intp),
+            right=np.concatenate(rights).astype(np.intp),
+            value=np.concatenate(values),
+            roots=offsets[:-1].astype(np.intp),
+            columns=used.astype(np.intp),
+            classes=np.asarray(forest.classes_),
+            max_depth=max(tree.max_depth for tree in trees)
+        )
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def _inputs(self, X) -> np.ndarray:
+        """분기에 쓰이는 열만 float32 dense 배열로 (sklearn 트리와 같은 정밀도)"""
+        if sparse.issparse(X):
+            return X.tocsc()[:, self.columns].toarray().astype(np.float32)
+        return np.asarray(X, dtype=np.float32)[:, self.columns]
+
+    def predict_proba(self, X) -> np.ndarray:
+        """클래스 확률 (n_samples, n_classes) - 모든 행과 트리를 깊이만큼 반복해 동시에 탐색"""
+        inputs = self._inputs(X)
+        n_samples = inputs.shape[0]
+        nodes = np.broadcast_to(self.roots, (n_samples, self.n_trees)).copy()
+        rows = np.arange(n_samples)[:, None]
+        for _ in range(self.max_depth):
+            go_left = inputs[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+
+        # 트리 순서대로 더한 뒤 트리 수로 나눔 (sklearn과 같은 합산 순서)
+        return self.value[nodes].sum(axis=1) / self.n_trees
+
+    def verify(self, forest, X) -> bool:
+        """X에 대해 sklearn predict_proba와 같은 결과인지 확인"""
+        expected = forest.predict_proba(X)
+        actual = self.predict_proba(X)
+        return (actual.shape == expected.shape and np.allclose(actual, expected, rtol=0, atol=1e-12)
+                and np.array_equal(actual.argmax(axis=1), expected.argmax(axis=1)))
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+특성 해싱 TF-IDF 벡터라이저
+어휘 사전 없이 단어/문자 n-gram을 고정 크기(n_features) 공간으로 해싱하고,
+버킷별 문서 빈도로 계산한 IDF를 NumPy 배열 하나로 보관합니다.
+
+- 변환에 어휘 dict가 필요 없어 상태가 배열 두 개(df, idf_)뿐이므로 워커 간에 공유하기 쉽고
+- partial_fit으로 새 문서의 문서 빈도만 더해 다시 학습하지 않고 IDF를 갱신할 수 있습니다.
+
+모델별로 환경 변수(MENU_CLASSIFIER_VECTORIZER 등)를 hashing으로 설정하면 훈련 시 이 벡터라이저를 사용하며,
+저장된 벡터라이저 파일에 종류가 함께 저장되므로 로드 시에는 설정이 필요 없습니다.
+서로 다른 n-gram이 같은 버킷에 들어가는 충돌이 있으므로 n_features는 n-gram 수보다 충분히 크게 잡습니다.
+"""
+
+import os
+import logging
+from functools import lru_cache
+from typing import List, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.feature_extraction.text import TfidfVectorizer
+from sklearn.utils import murmurhash3_32
+
+from utils.text_normalization import NormalizedText, TextInput, as_normalized, normalize_rows
+
+logger = logging.getLogger(__name__)
+
+VECTORIZER_MODES = ("tfidf", "hashing")
+
+# 해싱 공간 크기 기본값
+DEFAULT_N_FEATURES = 2 ** 15
+
+
+@lru_cache(maxsize=65536)
+def term_hash(term: str) -> int:
+    """n-gram 해시 (프로세스와 관계없이 같은 값, 자주 나오는 n-gram은 캐시)"""
+    return murmurhash3_32(term, positive=True)
+
+
+class HashingTfidfVectorizer:
+    # tfidf_transform이 NormalizedText를 그대로 넘김 (다시 정제/토큰화하지 않음)
+    accepts_normalized = True
+
+    def __init__(self, n_features: int = DEFAULT_N_FEATURES, analyzer: str = "word",
+                 ngram_range: Tuple[int, int] = (1, 1), norm: str = "l2", sublinear_tf: bool = False):
+        """
+        해싱 벡터라이저 초기화
+
+        Args:
+            n_features: 해싱 공간 크기 (버킷 수)
+            analyzer: 'word'(단어 n-gram) 또는 'char'(공백을 포함한 문자 n-gram)
+            ngram_range: n-gram 길이 범위
+            norm: 'l2', 'l1' 또는 None (행 정규화)
+            sublinear_tf: 단어 빈도에 1 + log(tf) 적용 여부
+        """
+        if analyzer not in ("word", "char"):
+            raise ValueError(f"지원하지 않는 analyzer: {analyzer}")
+        self.n_features = n_features
+        self.analyzer = analyzer
+        self.ngram_range = tuple(ngram_range)
+        self.norm = norm
+        self.sublinear_tf = sublinear_tf
+        self.dtype = np.float64
+        self.n_docs = 0
+        self.df = np.zeros(n_features, dtype=np.int32)
+        self.idf_ = None
+
+    def _terms(self, doc: NormalizedText) -> List[str]:
+        if self.analyzer == "char":
+            min_n, max_n = self.ngram_range
+            return [ngram for n in range(min_n, max_n + 1) for ngram in doc.char_ngrams(n)]
+        return doc.word_ngrams(self.ngram_range)
+
+    def _count(self, docs: Sequence[NormalizedText]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """문서별 버킷 빈도를 CSR 배열(data, indices, indptr)로 계산 (행 안의 버킷은 정렬)"""
+        n_features = self.n_features
+        indptr = [0]
+        indices = []
+        values = []
+        for doc in docs:
+            counts = {}
+            for term in self._terms(doc):
+                bucket = term_hash(term) % n_features
+                counts[bucket] = counts.get(bucket, 0) + 1
+            for bucket in sorted(counts):
+                indices.append(bucket)
+                values.append(counts[bucket])
+            indptr.append(len(indices))
+        return (np.asarray(values, dtype=self.dtype), np.asarray(indices, dtype=np.int32),
+                np.asarray(indptr, dtype=np.int32))
+
+    def _update_idf(self, indices: np.ndarray, n_docs: int):
+        # 행 안의 버킷은 중복이 없으므로 등장 횟수 = 문서 빈도 (smooth idf, TfidfVectorizer와 같은 식)
+        self.df += np.bincount(indices, minlength=self.n_features).astype(np.int32)
+        self.n_docs += n_docs
+        idf = np.log((1 + self.n_docs) / (1 + self.df.astype(self.dtype))) + 1
+        # 학습 문서에 없던 버킷은 0 (어휘 사전에 없는 n-gram을 버리는 TfidfVectorizer와 같게)
+        idf[self.df == 0] = 0
+        self.idf_ = idf
+
+    def _tfidf(self, data: np.ndarray, indices: np.ndarray, indptr: np.ndarray) -> sparse.csr_matrix:
+        if self.idf_ is None:
+            raise ValueError("fit 또는 partial_fit을 먼저 호출해야 합니다")
+        if self.sublinear_tf:
+            np.log(data, out=data)
+            data += 1
+        data *= self.idf_[indices]
+        matrix = sparse.csr_matrix((data, indices, indptr), shape=(len(indptr) - 1, self.n_features))
+        matrix.eliminate_zeros()
+        if self.norm:
+            normalize_rows(matrix.data, matrix.indptr, self.norm)
+        return matrix
+
+    def fit(self, texts: Sequence[TextInput]) -> "HashingTfidfVectorizer":
+        """문서 빈도를 처음부터 계산"""
+        self.n_docs = 0
+        self.df = np.zeros(self.n_features, dtype=np.int32)
+        return self.partial_fit(texts)
+
+    def partial_fit(self, texts: Sequence[TextInput]) -> "HashingTfidfVectorizer":
+        """새 문서의 문서 빈도를 더해 IDF 갱신 (기존 문서는 다시 보지 않음)"""
+        _, indices, _ = self._count([as_normalized(text) for text in texts])
+        self._update_idf(indices, len(texts))
+        return self
+
+    def fit_transform(self, texts: Sequence[TextInput]) -> sparse.csr_matrix:
+        self.n_docs = 0
+        self.df = np.zeros(self.n_features, dtype=np.int32)
+        data, indices, indptr = self._count([as_normalized(text) for text in texts])
+        self._update_idf(indices, len(texts))
+        return self._tfidf(data, indices, indptr)
+
+    def transform(self, texts: Sequence[TextInput]) -> sparse.csr_matrix:
+        """TF-IDF 행렬 (문자열은 clean_text로 정제, NormalizedText는 캐시된 n-gram 사용)"""
+        return self._tfidf(*self._count([as_normalized(text) for text in texts]))
+
+
+def vectorizer_mode(env_name: str) -> str:
+    """환경 변수로 지정한 벡터라이저 종류 (tfidf 기본, 알 수 없는 값이면 경고 후 tfidf)"""
+    mode = os.getenv(env_name, "tfidf").strip().lower() or "tfidf"
+    if mode not in VECTORIZER_MODES:
+        logger.warning(f"알 수 없는 {env_name}: {mode} - tfidf 사용 ({', '.join(VECTORIZER_MODES)} 중 하나)")
+        return "tfidf"
+    return mode
+
+
+def make_vectorizer(mode: str, ngram_range: Tuple[int, int], **tfidf_params):
+    """
+    모델용 벡터라이저 생성
+
+    Args:
+        mode: 'tfidf'(TfidfVectorizer, 어휘 사전) 또는 'hashing'(HashingTfidfVectorizer)
+        ngram_range: 단어 n-gram 범위 (두 방식 공통)
+        tfidf_params: TfidfVectorizer에만 적용되는 인자 (max_features 등)
+    """
+    if mode == "hashing":
+        return HashingTfidfVectorizer(
+            n_features=int(os.getenv("HASHING_N_FEATURES", str(DEFAULT_N_FEATURES))),
+            ngram_range=ngram_range
+        )
+    return TfidfVectorizer(ngram_range=ngram_range, **tfidf_params)
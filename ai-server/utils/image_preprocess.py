@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+OCR 전 이미지 전처리
+디코딩된 이미지를 EasyOCR에 넘기기 전에 다음 순서로 처리합니다.
+
+1. 그레이스케일 변환
+2. 텍스트 영역 분석 (축소본에서 글자 후보를 찾아 글자 높이와 메뉴 영역 추정)
+3. 메뉴 영역 자동 자르기 (여백이 큰 사진에서 빈 영역 제거)
+4. 적응형 해상도 조정 (추정 글자 높이가 목표 높이가 되도록, max_side / min_side 범위 안에서)
+   기본값은 기존과 같은 긴 변 800px 상한이며 축소만 합니다. 확대는 upscale로 켜야 합니다. (OCR 비용 증가)
+5. 대비 정규화 (CLAHE)
+
+단계별 실행 시간과 입력/출력 픽셀 수를 함께 반환하므로 배포 환경마다 정확도와 지연 시간을 조정할 수 있습니다.
+cv2는 OCR 워커에서만 필요하므로 함수 안에서 import 합니다.
+"""
+
+import os
+import time
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() not in ("0", "false", "no", "off")
+
+
+class PreprocessConfig:
+    def __init__(self, grayscale: bool = True, contrast: bool = True, auto_crop: bool = True,
+                 adaptive: bool = True, upscale: bool = False, max_side: int = 800, min_side: int = 480,
+                 default_side: int = 800, target_text_height: int = 24, analysis_side: int = 640):
+        """
+        전처리 설정
+
+        Args:
+            grayscale: 그레이스케일 변환 여부
+            contrast: CLAHE 대비 정규화 여부
+            auto_crop: 텍스트가 있는 메뉴 영역으로 자르기 여부
+            adaptive: 추정 글자 높이로 해상도를 정할지 여부 (False면 default_side 기준 축소만)
+            upscale: 적응형 조정 시 원본보다 확대 허용 여부 (글자가 작은 이미지의 정확도 향상, 검출/인식 비용 증가)
+            max_side: 적응형 조정 시 긴 변 최대 크기
+            min_side: 적응형 조정 시 긴 변 최소 크기 (upscale이면 작은 이미지는 이 크기까지 확대)
+            default_side: 적응형 조정을 끄거나 텍스트를 찾지 못했을 때 긴 변 최대 크기
+            target_text_height: 목표 글자 높이 (px)
+            analysis_side: 텍스트 영역 분석용 축소본의 긴 변 크기
+        """
+        self.grayscale = grayscale
+        self.contrast = contrast
+        self.auto_crop = auto_crop
+        self.adaptive = adaptive
+        self.upscale = upscale
+        self.max_side = max(1, max_side)
+        self.min_side = max(1, min(min_side, self.max_side))
+        self.default_side = max(1, default_side)
+        self.target_text_height = max(1, target_text_height)
+        self.analysis_side = max(64, analysis_side)
+
+    @classmethod
+    def from_env(cls) -> "PreprocessConfig":
+        """환경 변수(OCR_PREPROCESS_*, OCR_MAX_SIDE, OCR_MIN_SIDE, OCR_TARGET_TEXT_HEIGHT)로 설정 생성"""
+        return cls(
+            grayscale=_env_flag("OCR_PREPROCESS_GRAYSCALE", True),
+            contrast=_env_flag("OCR_PREPROCESS_CONTRAST", True),
+            auto_crop=_env_flag("OCR_PREPROCESS_CROP", True),
+            adaptive=_env_flag("OCR_PREPROCESS_ADAPTIVE", True),
+            upscale=_env_flag("OCR_PREPROCESS_UPSCALE", False),
+            max_side=int(os.getenv("OCR_MAX_SIDE", "800")),
+            min_side=int(os.getenv("OCR_MIN_SIDE", "480")),
+            default_side=int(os.getenv("OCR_DEFAULT_SIDE", "800")),
+            target_text_height=int(os.getenv("OCR_TARGET_TEXT_HEIGHT", "24"))
+        )
+
+    def to_dict(self) -> Dict:
+        """설정 값 (OCR 결과 캐시 키에 포함)"""
+        return {
+            "grayscale": self.grayscale,
+            "contrast": self.contrast,
+            "auto_crop": self.auto_crop,
+            "adaptive": self.adaptive,
+            "upscale": self.upscale,
+            "max_side": self.max_side,
+            "min_side": self.min_side,
+            "default_side": self.default_side,
+            "target_text_height": self.target_text_height,
+            "analysis_side": self.analysis_side
+        }
+
+
+def analyze_text_layout(gray: np.ndarray, analysis_side: int = 640) -> Optional[Dict]:
+    """
+    축소본에서 글자 후보를 찾아 텍스트 레이아웃 추정
+
+    Returns:
+        {"text_height": 원본 기준 글자 높이 중앙값, "box": 원본 기준 (x0, y0, x1, y1), "density": 텍스트 비율}
+        글자 후보가 없으면 None
+    """
+    import cv2
+
+    height, width = gray.shape[:2]
+    scale = min(1.0, analysis_side / max(height, width))
+    small = cv2.resize(gray, (max(1, int(width * scale)), max(1, int(height * scale))),
+                       interpolation=cv2.INTER_AREA) if scale < 1.0 else gray
+
+    # 밝기 변화가 큰 곳(글자 획)을 이진화한 뒤 가로로 이어 붙여 단어 단위 덩어리로 만듦
+    gradient = cv2.morphologyEx(small, cv2.MORPH_GRADIENT, cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3)))
+    _, binary = cv2.threshold(gradient, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    connected = cv2.morphologyEx(binary, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, (9, 1)))
+
+    count, _, stats, _ = cv2.connectedComponentsWithStats(connected, connectivity=8)
+    if count <= 1:
+        return None
+
+    small_height, small_width = small.shape[:2]
+    xs, ys, ws, hs, areas = (stats[1:, i] for i in range(5))
+    # 글자 줄로 보기 어려운 덩어리 제외 (점 잡음, 세로로 긴 선, 이미지 대부분을 덮는 영역)
+    is_text = (
+        (hs >= 4) & (hs <= small_height * 0.2) &
+        (ws >= hs * 0.5) & (ws <= small_width * 0.95) &
+        (areas >= ws * hs * 0.2)
+    )
+    if not is_text.any():
+        return None
+
+    xs, ys, ws, hs = xs[is_text], ys[is_text], ws[is_text], hs[is_text]
+    box = (int(xs.min()), int(ys.min()), int((xs + ws).max()), int((ys + hs).max()))
+    return {
+        "text_height": float(np.median(hs)) / scale,
+        "box": tuple(int(round(v / scale)) for v in box),
+        "density": round(float((ws * hs).sum()) / (small_width * small_height), 4)
+    }
+
+
+def _crop_box(box: Tuple[int, int, int, int], margin: int, width: int, height: int) -> Tuple[int, int, int, int]:
+    x0, y0, x1, y1 = box
+    return max(0, x0 - margin), max(0, y0 - margin), min(width, x1 + margin), min(height, y1 + margin)
+
+
+def _target_scale(long_side: int, text_height: Optional[float], config: PreprocessConfig) -> float:
+    """긴 변 크기와 추정 글자 높이로 리사이즈 배율 결정"""
+    if not config.adaptive or not text_height:
+        return min(1.0, config.default_side / long_side)
+
+    upper = config.max_side / long_side
+    if not config.upscale:
+        upper = min(1.0, upper)
+    lower = min(config.min_side / long_side, upper)
+    return min(max(config.target_text_height / text_height, lower), upper)
+
+
+def preprocess_image(image: np.ndarray, config: Optional[PreprocessConfig] = None) -> Tuple[np.ndarray, Dict]:
+    """
+    OCR 입력 이미지 전처리
+
+    Returns:
+        (전처리된 이미지, 통계) - 통계에는 단계별 실행 시간(timings), 입력/출력 크기, 절감 픽셀 수가 포함됨
+    """
+    import cv2
+
+    config = config or PreprocessConfig()
+    timings = {}
+    input_height, input_width = image.shape[:2]
+
+    started_at = time.perf_counter()
+    if config.grayscale and image.ndim == 3:
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    timings["grayscale"] = time.perf_counter() - started_at
+
+    layout = None
+    if config.adaptive or config.auto_crop:
+        started_at = time.perf_counter()
+        gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        layout = analyze_text_layout(gray, config.analysis_side)
+        timings["layout"] = time.perf_counter() - started_at
+
+    crop = None
+    if config.auto_crop and layout is not None:
+        started_at = time.perf_counter()
+        height, width = image.shape[:2]
+        # 가장자리 글자가 잘리지 않도록 글자 높이만큼 여백을 둠
+        x0, y0, x1, y1 = _crop_box(layout["box"], int(layout["text_height"]) + 4, width, height)
+        # 줄어드는 면적이 작으면 복사 비용만 들므로 자르지 않음
+        if (x1 - x0) * (y1 - y0) < width * height * 0.9:
+            image = image[y0:y1, x0:x1]
+            crop = [x0, y0, x1, y1]
+        timings["crop"] = time.perf_counter() - started_at
+
+    started_at = time.perf_counter()
+    height, width = image.shape[:2]
+    scale = _target_scale(max(height, width), layout["text_height"] if layout else None, config)
+    if abs(scale - 1.0) > 0.05:
+        interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+        image = cv2.resize(image, (max(1, int(width * scale)), max(1, int(height * scale))),
+                           interpolation=interpolation)
+    else:
+        scale = 1.0
+    timings["resize"] = time.perf_counter() - started_at
+
+    if config.contrast:
+        started_at = time.perf_counter()
+        clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+        if image.ndim == 2:
+            image = clahe.apply(image)
+        else:
+            lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
+            lab[:, :, 0] = clahe.apply(lab[:, :, 0])
+            image = cv2.cvtColor(lab, cv2.COLOR_LAB2BGR)
+        timings["contrast"] = time.perf_counter() - started_at
+
+    output_height, output_width = image.shape[:2]
+    input_pixels = input_width * input_height
+    output_pixels = output_width * output_height
+    stats = {
+        "input_size": [input_width, input_height],
+        "output_size": [output_width, output_height],
+        "input_pixels": input_pixels,
+        "output_pixels": output_pixels,
+        "pixels_saved": input_pixels - output_pixels,
+        "scale": round(scale, 4),
+        "crop": crop,
+        "text_height": round(layout["text_height"], 1) if layout else None,
+        "text_density": layout["density"] if layout else None,
+        "timings": timings
+    }
+    return image, stats
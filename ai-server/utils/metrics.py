@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+분석 파이프라인 단계별 메트릭
+단계(업로드 읽기, OCR, 번역, 메뉴 분류 ...)마다 실행 시간 히스토그램, 호출 수, 오류 수를 기록하고
+(OCR 전처리로 절감한 픽셀 수 같은) 누적 카운터와 함께
+/metrics 엔드포인트에서 Prometheus 텍스트 형식으로 내보냅니다.
+
+메트릭은 프로세스별로 집계됩니다. (process 모드 OCR 워커의 시간은 워커가 반환한 값을 메인 프로세스에서 기록)
+"""
+
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, Tuple
+
+# 히스토그램 버킷 상한 (초)
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class _StageStats:
+    __slots__ = ("bucket_counts", "total", "count", "errors")
+
+    def __init__(self, bucket_count: int):
+        self.bucket_counts = [0] * (bucket_count + 1)  # 마지막 칸은 +Inf
+        self.total = 0.0
+        self.count = 0
+        self.errors = 0
+
+
+class StageMetrics:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, prefix: str = "ai_stage",
+                 counter_prefix: str = "ai"):
+        """
+        단계별 메트릭 초기화
+
+        Args:
+            buckets: 히스토그램 버킷 상한 (초, 오름차순)
+            prefix: 메트릭 이름 접두사
+            counter_prefix: 누적 카운터 이름 접두사
+        """
+        self.buckets = tuple(sorted(buckets))
+        self.prefix = prefix
+        self.counter_prefix = counter_prefix
+        self._stages: Dict[str, _StageStats] = {}
+        self._counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, stage: str) -> _StageStats:
+        stats = self._stages.get(stage)
+        if stats is None:
+            with self._lock:
+                stats = self._stages.setdefault(stage, _StageStats(len(self.buckets)))
+        return stats
+
+    def observe(self, stage: str, seconds: float, error: bool = False):
+        """단계 실행 1회 기록"""
+        stats = self._stats(stage)
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            stats.bucket_counts[index] += 1
+            stats.total += seconds
+            stats.count += 1
+            if error:
+                stats.errors += 1
+
+    def record_error(self, stage: str):
+        """실행 시간을 알 수 없는 실패 기록 (오류 수만 증가)"""
+        stats = self._stats(stage)
+        with self._lock:
+            stats.errors += 1
+
+    def increment(self, counter: str, value: float = 1):
+        """누적 카운터 증가 (예: ocr_input_pixels)"""
+        with self._lock:
+            self._counters[counter] = self._counters.get(counter, 0) + value
+
+    def counters(self) -> Dict[str, float]:
+        """누적 카운터 값"""
+        with self._lock:
+            return dict(self._counters)
+
+    @contextmanager
+    def time(self, stage: str) -> Iterator[None]:
+        """with 블록 실행 시간 기록 (예외가 나면 오류로 기록 후 다시 발생)"""
+        started_at = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.observe(stage, time.perf_counter() - started_at, error=True)
+            raise
+        self.observe(stage, time.perf_counter() - started_at)
+
+    def timed(self, stage: str) -> Callable:
+        """함수 실행 시간을 기록하는 데코레이터"""
+        def decorator(func: Callable) -> Callable:
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                started_at = time.perf_counter()
+                try:
+                    result = func(*args, **kwargs)
+                except BaseException:
+                    self.observe(stage, time.perf_counter() - started_at, error=True)
+                    raise
+                self.observe(stage, time.perf_counter() - started_at)
+                return result
+            return wrapper
+        return decorator
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """단계별 누적 값 (호출 수, 오류 수, 합계, 버킷별 개수)"""
+        with self._lock:
+            return {
+                stage: {
+                    "count": stats.count,
+                    "errors": stats.errors,
+                    "sum": stats.total,
+                    "bucket_counts": list(stats.bucket_counts)
+                }
+                for stage, stats in self._stages.items()
+            }
+
+    def render(self) -> str:
+        """Prometheus 텍스트 형식으로 출력"""
+        snapshot = self.snapshot()
+        duration = f"{self.prefix}_duration_seconds"
+        errors = f"{self.prefix}_errors_total"
+
+        lines = [
+            f"# HELP {duration} 분석 파이프라인 단계별 실행 시간",
+            f"# TYPE {duration} histogram"
+        ]
+        for stage in sorted(snapshot):
+            stats = snapshot[stage]
+            cumulative = 0
+            for bound, count in zip(self.buckets, stats["bucket_counts"]):
+                cumulative += count
+                lines.append(f'{duration}_bucket{{stage="{stage}",le="{bound:g}"}} {cumulative}')
+            lines.append(f'{duration}_bucket{{stage="{stage}",le="+Inf"}} {stats["count"]}')
+            lines.append(f'{duration}_sum{{stage="{stage}"}} {stats["sum"]:.6f}')
+            lines.append(f'{duration}_count{{stage="{stage}"}} {stats["count"]}')
+
+        lines.append(f"# HELP {errors} 분석 파이프라인 단계별 오류 수")
+        lines.append(f"# TYPE {errors} counter")
+        for stage in sorted(snapshot):
+            lines.append(f'{errors}{{stage="{stage}"}} {snapshot[stage]["errors"]}')
+
+        for counter, value in sorted(self.counters().items()):
+            name = f"{self.counter_prefix}_{counter}_total"
+            lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+# 프로세스 전역 메트릭
+metrics = StageMetrics()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+모델 번들 관리 (백그라운드 재훈련 + 원자적 교체)
+
+- 재훈련은 별도 프로세스에서 실행되어 새 버전 디렉토리(models/versions/<버전>)에 모델 파일을 저장
+- 새 번들 로드가 성공하면 현재 번들 참조를 한 번에 교체 (요청 처리 중인 번들은 그대로 유지)
+- 직전 번들로 롤백 가능, 활성 버전은 models/versions/CURRENT에 기록되어 재시작 후에도 유지
+"""
+
+import os
+import uuid
+import shutil
+import asyncio
+import logging
+import multiprocessing
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from models.ai_analysis_engine import AIAnalysisEngine
+from models.menu_catalog import get_menu_catalog
+
+logger = logging.getLogger(__name__)
+
+BASE_VERSION = "base"  # models/ 바로 아래의 기본 모델 파일
+
+
+class RetrainInProgressError(Exception):
+    """이미 재훈련 작업이 진행 중일 때 발생"""
+
+
+class NoPreviousBundleError(Exception):
+    """롤백할 이전 번들이 없을 때 발생"""
+
+
+def _copy_artifacts(source_dir: str, output_dir: str):
+    """모델 파일(*.pkl, 유사도 인덱스) 복사"""
+    for name in os.listdir(source_dir):
+        source = os.path.join(source_dir, name)
+        if name.endswith(".pkl") and os.path.isfile(source):
+            shutil.copy2(source, os.path.join(output_dir, name))
+        elif name == "menu_similarity_index" and os.path.isdir(source):
+            shutil.copytree(source, os.path.join(output_dir, name))
+
+
+def train_bundle(output_dir: str, source_dir: str) -> Dict:
+    """
+    새 디렉토리에 모든 모델 훈련 후 저장 (재훈련 프로세스에서 실행됨)
+
+    훈련에 실패한 모델은 현재 번들(source_dir)의 파일을 그대로 사용합니다.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    _copy_artifacts(source_dir, output_dir)
+    engine = AIAnalysisEngine(model_dir=output_dir)
+
+    results = {
+        "menu_classifier": engine.menu_classifier.train(),
+        "allergy_predictor": engine.allergy_predictor.train(),
+        "similarity_model": engine.similarity_model.train()
+    }
+    if not any(results.values()):
+        raise RuntimeError(f"모든 모델 훈련 실패: {results}")
+    return results
+
+
+class RetrainJob:
+    def __init__(self):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.state = "queued"  # queued → training → loading → succeeded / failed
+        self.version: Optional[str] = None
+        self.results: Optional[Dict] = None
+        self.error: Optional[str] = None
+        self.created_at = datetime.now()
+        self.finished_at: Optional[datetime] = None
+
+    @property
+    def done(self) -> bool:
+        return self.state in ("succeeded", "failed")
+
+    def to_dict(self) -> Dict:
+        return {
+            "job_id": self.job_id,
+            "state": self.state,
+            "version": self.version,
+            "results": self.results,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None
+        }
+
+
+class ModelBundleManager:
+    def __init__(self, base_dir: str = "models", keep_versions: int = 3, max_jobs: int = 20):
+        """
+        모델 번들 관리자 초기화
+
+        Args:
+            base_dir: 기본 모델 디렉토리 (버전 디렉토리는 base_dir/versions 아래에 생성)
+            keep_versions: 디스크에 남겨둘 재훈련 버전 수 (현재/이전 번들은 항상 유지)
+            max_jobs: 상태 조회용으로 기억할 최근 작업 수
+        """
+        self.base_dir = base_dir
+        self.versions_dir = os.path.join(base_dir, "versions")
+        self.keep_versions = max(1, keep_versions)
+        self.max_jobs = max_jobs
+
+        # 읽기 전용으로 취급하는 번들 참조 (교체는 참조 대입 한 번으로 이뤄짐)
+        self.current: Optional[AIAnalysisEngine] = None
+        self.previous: Optional[AIAnalysisEngine] = None
+
+        self._jobs: "OrderedDict[str, RetrainJob]" = OrderedDict()
+        self._active_job: Optional[RetrainJob] = None
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @classmethod
+    def from_env(cls) -> "ModelBundleManager":
+        """환경 변수(MODEL_KEEP_VERSIONS)로 관리자 생성"""
+        return cls(keep_versions=int(os.getenv("MODEL_KEEP_VERSIONS", "3")))
+
+    # ---------------- 버전 디렉토리 ----------------
+
+    def _bundle_dir(self, version: str) -> str:
+        if version == BASE_VERSION:
+            return self.base_dir
+        return os.path.join(self.versions_dir, version)
+
+    def _read_current_version(self) -> str:
+        try:
+            with open(os.path.join(self.versions_dir, "CURRENT"), "r", encoding="utf-8") as f:
+                return f.read().strip() or BASE_VERSION
+        except FileNotFoundError:
+            return BASE_VERSION
+
+    def _write_current_version(self, version: str):
+        """활성 버전 기록 (임시 파일 + os.replace로 원자적 교체)"""
+        os.makedirs(self.versions_dir, exist_ok=True)
+        path = os.path.join(self.versions_dir, "CURRENT")
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(version)
+        os.replace(tmp_path, path)
+
+    def list_versions(self) -> List[str]:
+        """디스크에 있는 재훈련 버전 목록 (오래된 순)"""
+        if not os.path.isdir(self.versions_dir):
+            return []
+        return sorted(
+            name for name in os.listdir(self.versions_dir)
+            if not name.startswith(".") and os.path.isdir(os.path.join(self.versions_dir, name))
+        )
+
+    def _prune_versions(self):
+        """오래된 버전 디렉토리 삭제 (현재/이전 번들은 제외)"""
+        in_use = {bundle.version for bundle in (self.current, self.previous) if bundle is not None}
+        versions = self.list_versions()
+        for version in versions[:max(0, len(versions) - self.keep_versions)]:
+            if version not in in_use:
+                shutil.rmtree(self._bundle_dir(version), ignore_errors=True)
+                logger.info(f"오래된 모델 버전 삭제: {version}")
+
+    # ---------------- 번들 로드 / 교체 ----------------
+
+    def load_bundle(self, version: str) -> AIAnalysisEngine:
+        """버전 디렉토리에서 새 번들 로드 (실패 시 예외)"""
+        engine = AIAnalysisEngine(model_dir=self._bundle_dir(version), version=version)
+        if not engine.load_all_models():
+            raise RuntimeError(f"모델 번들 로드 실패: {version}")
+        return engine
+
+    def load_initial(self) -> bool:
+        """서버 시작 시 활성 버전 로드 (실패하면 기본 모델로 대체)"""
+        for version in dict.fromkeys([self._read_current_version(), BASE_VERSION]):
+            try:
+                self.current = self.load_bundle(version)
+                logger.info(f"모델 번들 로드 완료: {version}")
+                return True
+            except Exception as e:
+                logger.warning(f"⚠️ 모델 번들 {version} 로드 실패: {e}")
+        return False
+
+    def _activate(self, engine: AIAnalysisEngine):
+        self.previous, self.current = self.current, engine
+        self._write_current_version(engine.version)
+        logger.info(f"모델 번들 교체 완료: {engine.version}")
+
+    def rollback(self) -> str:
+        """직전 번들로 되돌리기"""
+        if self.previous is None:
+            raise NoPreviousBundleError("롤백할 이전 모델 번들이 없습니다")
+        self._activate(self.previous)
+        return self.current.version
+
+    # ---------------- 재훈련 작업 ----------------
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # 훈련 중에도 서버 프로세스의 GIL/메모리를 점유하지 않도록 별도 프로세스에서 실행
+            self._executor = ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    def start_retrain(self) -> RetrainJob:
+        """백그라운드 재훈련 시작 (진행 중인 작업이 있으면 RetrainInProgressError)"""
+        if self._active_job is not None and not self._active_job.done:
+            raise RetrainInProgressError(f"재훈련 작업이 이미 진행 중입니다: {self._active_job.job_id}")
+
+        job = RetrainJob()
+        self._active_job = job
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+
+        asyncio.ensure_future(self._run_job(job))
+        return job
+
+    async def _run_job(self, job: RetrainJob):
+        version = datetime.now().strftime("%Y%m%d-%H%M%S-") + job.job_id[:6]
+        tmp_dir = os.path.join(self.versions_dir, f".{version}.tmp")
+        loop = asyncio.get_running_loop()
+
+        try:
+            job.state = "training"
+            logger.info(f"모델 재훈련 시작: job={job.job_id}, version={version}")
+            source_dir = self.current.model_dir if self.current else self.base_dir
+            job.results = await loop.run_in_executor(self._get_executor(), train_bundle, tmp_dir, source_dir)
+
+            # 훈련이 끝난 디렉토리만 버전 이름으로 보이게 함
+            os.replace(tmp_dir, self._bundle_dir(version))
+
+            job.state = "loading"
+            await asyncio.to_thread(get_menu_catalog, reload=True)
+            engine = await asyncio.to_thread(self.load_bundle, version)
+
+            self._activate(engine)
+            job.version = version
+            job.state = "succeeded"
+            self._prune_versions()
+        except Exception as e:
+            logger.error(f"❌ 모델 재훈련 실패: job={job.job_id}, {e}")
+            job.state = "failed"
+            job.error = str(e)
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            if isinstance(e, BrokenProcessPool):
+                # 훈련 프로세스가 비정상 종료되면 다음 작업에서 새 풀 생성
+                self._executor = None
+        finally:
+            job.finished_at = datetime.now()
+
+    def get_job(self, job_id: str) -> Optional[RetrainJob]:
+        return self._jobs.get(job_id)
+
+    def get_status(self) -> Dict:
+        """현재/이전 번들 및 최근 작업 상태"""
+        return {
+            "current_version": self.current.version if self.current else None,
+            "previous_version": self.previous.version if self.previous else None,
+            "versions_on_disk": self.list_versions(),
+            "active_job": self._active_job.to_dict() if self._active_job else None
+        }
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+OCR 결과 캐시
+업로드된 이미지 bytes와 OCR 파라미터의 해시를 키로 추출 텍스트를 저장합니다.
+
+- 메모리 LRU 계층 + (선택) 디스크 계층 (총 크기 제한, 오래된 파일부터 삭제)
+  디스크 사용량은 시작 시 한 번 계산한 뒤 쓰기마다 더해 두고, 제한을 넘었을 때만 디렉토리를 훑어 삭제합니다.
+- 같은 키에 대한 동시 요청은 하나의 OCR 실행으로 합쳐짐
+"""
+
+import os
+import json
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# 디스크 계층이 최대 크기를 넘으면 이 비율까지 줄임 (쓰기마다 디렉토리를 다시 훑지 않도록 여유를 둠)
+DISK_EVICT_TARGET_RATIO = 0.9
+
+
+def make_cache_key(content: bytes, params: Dict) -> str:
+    """이미지 bytes + OCR 파라미터로 캐시 키 생성"""
+    digest = hashlib.sha256(content)
+    digest.update(json.dumps(params, sort_keys=True).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class OCRResultCache:
+    def __init__(self, max_entries: int = 256, disk_dir: Optional[str] = None,
+                 disk_max_bytes: int = 100 * 1024 * 1024):
+        """
+        OCR 결과 캐시 초기화
+
+        Args:
+            max_entries: 메모리 LRU에 유지할 최대 항목 수
+            disk_dir: 디스크 계층 경로 (None이면 메모리 계층만 사용)
+            disk_max_bytes: 디스크 계층 최대 크기
+        """
+        self.max_entries = max(0, max_entries)
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.disk_max_bytes = disk_max_bytes
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_lock = threading.Lock()
+        self._disk_bytes = 0  # 디스크 계층 사용량 (쓰기마다 갱신, 삭제 시 다시 계산)
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        if self.disk_dir is not None:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+
+    @classmethod
+    def from_env(cls) -> "OCRResultCache":
+        """환경 변수(OCR_CACHE_SIZE, OCR_CACHE_DIR, OCR_CACHE_DISK_MAX_MB)로 캐시 생성"""
+        return cls(
+            max_entries=int(os.getenv("OCR_CACHE_SIZE", "256")),
+            disk_dir=os.getenv("OCR_CACHE_DIR") or None,
+            disk_max_bytes=int(os.getenv("OCR_CACHE_DISK_MAX_MB", "100")) * 1024 * 1024
+        )
+
+    # ---------------- 메모리 계층 ----------------
+
+    def _memory_get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key not in self._memory:
+                return None
+            self._memory.move_to_end(key)
+            return self._memory[key]
+
+    def _memory_put(self, key: str, text: str):
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            self._memory[key] = text
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    # ---------------- 디스크 계층 ----------------
+
+    def _disk_path(self, key: str) -> Path:
+        return self.disk_dir / f"{key}.txt"
+
+    def _disk_get(self, key: str) -> Optional[str]:
+        path = self._disk_path(key)
+        try:
+            text = path.read_text(encoding="utf-8")
+            os.utime(path)  # 최근 사용 시각 갱신 (LRU 삭제 기준)
+            return text
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"OCR 디스크 캐시 읽기 실패: {e}")
+            return None
+
+    def _disk_put(self, key: str, text: str):
+        try:
+            path = self._disk_path(key)
+            data = text.encode("utf-8")
+            tmp_path = path.with_suffix(".tmp")
+            tmp_path.write_bytes(data)
+            with self._disk_lock:
+                try:
+                    previous_size = path.stat().st_size
+                except FileNotFoundError:
+                    previous_size = 0
+                os.replace(tmp_path, path)
+                self._disk_bytes += len(data) - previous_size
+                if self._disk_bytes > self.disk_max_bytes:
+                    self._disk_evict()
+        except Exception as e:
+            logger.warning(f"OCR 디스크 캐시 쓰기 실패: {e}")
+
+    def _disk_entries(self) -> List[Tuple[float, int, Path]]:
+        """디스크 계층 파일 목록 [(수정 시각, 크기, 경로), ...]"""
+        entries = []
+        for path in self.disk_dir.glob("*.txt"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _disk_evict(self):
+        """
+        디스크 계층이 최대 크기를 넘으면 오래된 파일부터 최대 크기의 DISK_EVICT_TARGET_RATIO까지 삭제
+        (_disk_lock 안에서 호출, 디렉토리를 훑으며 사용량도 다시 계산)
+        """
+        entries = self._disk_entries()
+        total = sum(size for _, size, _ in entries)
+        self._disk_bytes = total
+        if total <= self.disk_max_bytes:
+            return
+
+        target = self.disk_max_bytes * DISK_EVICT_TARGET_RATIO
+        for _, size, path in sorted(entries):
+            try:
+                path.unlink()
+                total -= size
+            except FileNotFoundError:
+                pass
+            if total <= target:
+                break
+        self._disk_bytes = total
+
+    # ---------------- 공개 API ----------------
+
+    async def get(self, key: str) -> Optional[str]:
+        """캐시 조회 (메모리 → 디스크 순서)"""
+        text = self._memory_get(key)
+        if text is not None:
+            self.hits += 1
+            return text
+
+        if self.disk_dir is not None:
+            text = await asyncio.to_thread(self._disk_get, key)
+            if text is not None:
+                self.disk_hits += 1
+                self._memory_put(key, text)
+                return text
+
+        return None
+
+    async def put(self, key: str, text: str):
+        """캐시 저장"""
+        self._memory_put(key, text)
+        if self.disk_dir is not None:
+            await asyncio.to_thread(self._disk_put, key, text)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        """
+        캐시에 있으면 바로 반환하고, 없으면 compute()로 계산 후 저장
+
+        같은 키로 동시에 들어온 요청은 첫 요청의 계산 결과를 함께 기다립니다.
+        계산이 실패하면 결과를 저장하지 않고 대기 중인 모든 요청에 예외를 전달합니다.
+        """
+        text = await self.get(key)
+        if text is not None:
+            return text
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+
+            async def compute_and_store() -> str:
+                try:
+                    result = await compute()
+                    await self.put(key, result)
+                    return result
+                finally:
+                    self._inflight.pop(key, None)
+
+            task = asyncio.ensure_future(compute_and_store())
+            self._inflight[key] = task
+
+        # 한 요청이 취소되어도 (클라이언트 연결 종료 등) 다른 대기 요청의 OCR은 계속 진행
+        return await asyncio.shield(task)
+
+    def get_stats(self) -> Dict:
+        """캐시 통계"""
+        with self._lock:
+            memory_entries = len(self._memory)
+        return {
+            "memory_entries": memory_entries,
+            "max_entries": self.max_entries,
+            "disk_enabled": self.disk_dir is not None,
+            "disk_bytes": self._disk_bytes,
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced
+        }
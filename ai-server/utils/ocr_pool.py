@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+OCR 작업 전용 워커 풀
+EasyOCR / Tesseract 같은 CPU 작업을 이벤트 루프 밖에서 실행하고,
+대기열이 가득 차면 새 요청을 즉시 거절합니다 (backpressure).
+
+- thread 모드: 하나의 프로세스에서 스레드로 실행 (Reader 1개 공유)
+- process 모드: 워커 프로세스마다 Reader를 한 번씩 로드해 코어 수만큼 확장
+
+OCRBatcher는 동시에 들어온 이미지들을 묶어 하나의 작업으로 풀에 제출합니다.
+(워커가 모두 바쁠 때 쌓인 이미지만 묶으므로 요청이 하나뿐일 때는 추가 대기가 없음)
+"""
+
+import os
+import math
+import time
+import asyncio
+import logging
+import threading
+import multiprocessing
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class PoolSaturatedError(Exception):
+    """OCR 풀의 대기열이 가득 찼을 때 발생"""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"OCR 대기열이 가득 찼습니다. {retry_after}초 후 다시 시도하세요.")
+        self.retry_after = retry_after
+
+
+def _timed_call(func: Callable[..., Any], args: Tuple) -> Tuple[Any, float, float]:
+    """작업 실행 후 (결과, 시작 시각, 실행 시간) 반환 - 프로세스 간 비교를 위해 wall clock 사용"""
+    started_at = time.time()
+    result = func(*args)
+    return result, started_at, time.time() - started_at
+
+
+def _default_torch_threads(max_workers: int) -> int:
+    """워커끼리 CPU를 과점유하지 않도록 워커당 torch 스레드 수 계산"""
+    return max(1, (os.cpu_count() or 1) // max_workers)
+
+
+class OCRWorkerPool:
+    def __init__(self, max_workers: int = 1, max_queue: int = 4, mode: str = "thread",
+                 initializer: Optional[Callable] = None, initargs: Tuple = (),
+                 torch_threads: Optional[int] = None):
+        """
+        OCR 워커 풀 초기화
+
+        Args:
+            max_workers: 동시에 실행할 OCR 작업 수 (process 모드에서는 프로세스 수)
+            max_queue: 실행 대기 중일 수 있는 최대 작업 수
+            mode: "thread" 또는 "process"
+            initializer: 워커 초기화 함수 (워커 스레드/프로세스가 처음 시작될 때 실행)
+            initargs: initializer 인자 (torch 스레드 수가 마지막 인자로 추가됨)
+            torch_threads: 워커당 torch intra-op 스레드 수 (기본: CPU 코어 수 / 워커 수)
+        """
+        if mode not in ("thread", "process"):
+            raise ValueError(f"지원하지 않는 OCR 풀 모드: {mode}")
+
+        self.mode = mode
+        self.max_workers = max(1, max_workers)
+        self.max_queue = max(0, max_queue)
+        self.torch_threads = torch_threads or _default_torch_threads(self.max_workers)
+
+        if initializer is not None:
+            initargs = tuple(initargs) + (self.torch_threads,)
+
+        if mode == "process":
+            # fork 후 torch 스레드 풀이 깨지는 문제를 피하기 위해 spawn 사용
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=initializer,
+                initargs=initargs
+            )
+        else:
+            # 워커 스레드는 첫 작업 제출 시 생성되므로 Reader도 그때 로드됨
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="ocr-worker",
+                initializer=initializer,
+                initargs=initargs
+            )
+
+        self._lock = threading.Lock()
+        self._pending = 0  # 제출되었지만 끝나지 않은 작업 (실행 중 + 대기 중)
+        self._rejected = 0
+        self._completed = 0
+        self._wait_times = deque(maxlen=100)
+        self._run_times = deque(maxlen=100)
+
+    @classmethod
+    def from_env(cls, initializer: Optional[Callable] = None, initargs: Tuple = ()) -> "OCRWorkerPool":
+        """환경 변수(OCR_POOL_MODE, OCR_POOL_WORKERS, OCR_POOL_MAX_QUEUE, OCR_TORCH_THREADS)로 풀 생성"""
+        torch_threads = os.getenv("OCR_TORCH_THREADS")
+        return cls(
+            max_workers=int(os.getenv("OCR_POOL_WORKERS", "1")),
+            max_queue=int(os.getenv("OCR_POOL_MAX_QUEUE", "4")),
+            mode=os.getenv("OCR_POOL_MODE", "thread"),
+            initializer=initializer,
+            initargs=initargs,
+            torch_threads=int(torch_threads) if torch_threads else None
+        )
+
+    def _retry_after(self, waiting_jobs: int = 0) -> int:
+        """대기열이 비워질 때까지 예상 시간 (초, waiting_jobs: 풀 밖에서 제출을 기다리는 작업 수)"""
+        avg_run = sum(self._run_times) / len(self._run_times) if self._run_times else 10.0
+        rounds = math.ceil((self._pending + waiting_jobs) / self.max_workers)
+        return max(1, math.ceil(avg_run * rounds))
+
+    def reject(self, waiting_jobs: int = 0) -> PoolSaturatedError:
+        """풀 밖 대기열(OCRBatcher)이 가득 찼을 때 거절 수를 세고 Retry-After가 담긴 예외 반환"""
+        with self._lock:
+            self._rejected += 1
+            return PoolSaturatedError(self._retry_after(waiting_jobs))
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """
+        풀에서 func(*args)를 실행하고 결과를 기다림
+
+        process 모드에서는 func와 args가 pickle 가능해야 합니다.
+        (디코딩된 ndarray 대신 업로드된 원본 bytes를 넘기는 것을 권장)
+        """
+        with self._lock:
+            if self._pending >= self.max_workers + self.max_queue:
+                self._rejected += 1
+                raise PoolSaturatedError(self._retry_after())
+            self._pending += 1
+
+        submitted_at = time.time()
+
+        def on_done(future):
+            with self._lock:
+                self._pending -= 1
+                self._completed += 1
+                if not future.cancelled() and future.exception() is None:
+                    _, started_at, run_time = future.result()
+                    self._wait_times.append(max(0.0, started_at - submitted_at))
+                    self._run_times.append(run_time)
+
+        try:
+            future = self._executor.submit(_timed_call, func, args)
+        except RuntimeError:
+            with self._lock:
+                self._pending -= 1
+            raise
+        future.add_done_callback(on_done)
+
+        result, _, _ = await asyncio.wrap_future(future)
+        return result
+
+    async def warm_up(self, func: Callable[[], Any]) -> list:
+        """워커를 띄우고 func()를 실행해 결과 목록 반환 (Reader 선로드용)"""
+        futures = [
+            asyncio.wrap_future(self._executor.submit(func))
+            for _ in range(self.max_workers if self.mode == "process" else 1)
+        ]
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        return [r for r in results if not isinstance(r, BaseException)]
+
+    def get_stats(self) -> Dict:
+        """대기열 깊이 및 대기/실행 시간 통계"""
+        with self._lock:
+            wait_times = list(self._wait_times)
+            run_times = list(self._run_times)
+            running = min(self._pending, self.max_workers)
+            return {
+                "mode": self.mode,
+                "max_workers": self.max_workers,
+                "max_queue": self.max_queue,
+                "torch_threads": self.torch_threads,
+                "running": running,
+                "queue_depth": self._pending - running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(sum(wait_times) / len(wait_times) * 1000, 2) if wait_times else 0.0,
+                "max_wait_ms": round(max(wait_times) * 1000, 2) if wait_times else 0.0,
+                "avg_run_ms": round(sum(run_times) / len(run_times) * 1000, 2) if run_times else 0.0
+            }
+
+    def shutdown(self):
+        """워커 종료"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        logger.info("OCR 워커 풀 종료")
+
+
+class OCRBatcher:
+    def __init__(self, pool: OCRWorkerPool, batch_func: Callable[[List[Any]], List[Any]], max_images: int = 4):
+        """
+        OCR 요청 묶음 처리기 초기화
+
+        Args:
+            pool: 작업을 실행할 OCR 워커 풀
+            batch_func: 입력 목록을 받아 입력별 결과(또는 예외 객체) 목록을 반환하는 함수
+                        (process 모드에서는 pickle 가능한 모듈 수준 함수여야 함)
+            max_images: 한 작업으로 묶을 최대 입력 수 (1이면 묶지 않음)
+        """
+        self.pool = pool
+        self.batch_func = batch_func
+        self.max_images = max(1, max_images)
+        # 풀의 용량(실행 + 대기 작업 수)을 작업 수 대신 묶음 단위로 적용 (max_queue가 0이어도 빈 워커는 받음)
+        self.max_items = (pool.max_workers + pool.max_queue) * self.max_images
+
+        self._waiting = deque()
+        self._running = 0
+        self._running_items = 0
+        self._batches = 0
+        self._items = 0
+        self._largest_batch = 0
+
+    @classmethod
+    def from_env(cls, pool: OCRWorkerPool, batch_func: Callable[[List[Any]], List[Any]]) -> "OCRBatcher":
+        """환경 변수(OCR_BATCH_MAX_IMAGES)로 묶음 처리기 생성"""
+        return cls(pool, batch_func, max_images=int(os.getenv("OCR_BATCH_MAX_IMAGES", "4")))
+
+    async def submit(self, item: Any) -> Any:
+        """입력 하나를 묶음에 넣고 그 입력의 결과를 기다림 (대기 + 실행 중인 입력이 너무 많으면 PoolSaturatedError)"""
+        if len(self._waiting) + self._running_items >= self.max_items:
+            raise self.pool.reject(math.ceil(len(self._waiting) / self.max_images))
+
+        future = asyncio.get_running_loop().create_future()
+        self._waiting.append((item, future))
+        self._dispatch()
+        return await future
+
+    def _dispatch(self):
+        """실행 중인 묶음이 워커 수보다 적으면 대기 중인 입력을 묶어 제출"""
+        while self._waiting and self._running < self.pool.max_workers:
+            batch = [self._waiting.popleft() for _ in range(min(self.max_images, len(self._waiting)))]
+            self._running += 1
+            self._running_items += len(batch)
+            self._batches += 1
+            self._items += len(batch)
+            self._largest_batch = max(self._largest_batch, len(batch))
+            asyncio.ensure_future(self._run(batch))
+
+    async def _run(self, batch: List[Tuple[Any, asyncio.Future]]):
+        try:
+            results = await self.pool.run(self.batch_func, [item for item, _ in batch])
+        except BaseException as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+        else:
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, BaseException):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        finally:
+            self._running -= 1
+            self._running_items -= len(batch)
+            self._dispatch()
+
+    def get_stats(self) -> Dict:
+        """묶음 처리 통계"""
+        return {
+            "max_images": self.max_images,
+            "waiting": len(self._waiting),
+            "running_batches": self._running,
+            "batches": self._batches,
+            "avg_batch_size": round(self._items / self._batches, 2) if self._batches else 0.0,
+            "largest_batch": self._largest_batch
+        }
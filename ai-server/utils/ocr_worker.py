@@ -0,0 +1,415 @@
+#!/usr/bin/env python3
+"""
+OCR 워커 함수
+OCR 워커 풀(thread / process)에서 실행되는 함수들입니다.
+워커 스레드/프로세스마다 처음 시작될 때 init_ocr_worker가 한 번 실행되어
+EasyOCR Reader를 로드합니다. (torch, easyocr, cv2는 이때 처음 import)
+디코딩된 이미지는 utils.image_preprocess에서 전처리된 뒤 EasyOCR에 전달됩니다.
+"""
+
+import os
+import math
+import time
+import logging
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from utils.image_preprocess import PreprocessConfig, preprocess_image
+
+logger = logging.getLogger(__name__)
+
+
+class OCRFailedError(Exception):
+    """EasyOCR과 Tesseract 모두 텍스트 추출에 실패했을 때 발생"""
+
+
+# 워커(프로세스)마다 하나씩 유지되는 EasyOCR Reader
+reader = None
+_reader_lock = threading.Lock()  # thread 모드에서 워커 스레드들이 동시에 초기화하는 것 방지
+
+# 이미지 전처리 설정 (spawn된 워커 프로세스도 같은 환경 변수로 생성)
+PREPROCESS_CONFIG = PreprocessConfig.from_env()
+
+# OCR 모드
+# two_phase: 검출(CRAFT)을 한 번 실행한 뒤 박스를 모아 배치로 인식 (여러 이미지의 박스도 함께 인식)
+# readtext: EasyOCR readtext 한 번으로 검출과 인식 (박스를 하나씩 인식)
+OCR_MODE = os.getenv("OCR_MODE", "two_phase")
+if OCR_MODE not in ("two_phase", "readtext"):
+    logger.warning(f"알 수 없는 OCR_MODE: {OCR_MODE} - two_phase 사용")
+    OCR_MODE = "two_phase"
+
+RECOGNITION_BATCH_SIZE = int(os.getenv("OCR_RECOGNITION_BATCH_SIZE", "32"))  # 한 번에 인식할 박스 수
+MIN_BOX_HEIGHT = 8  # 이보다 낮은 검출 박스는 잡음으로 보고 버림 (전처리된 이미지 기준 px)
+MAX_PADDING_RATIO = 1.5  # 인식 배치 안에서 허용하는 최대 너비 / 최소 너비
+_batched_recognition = True  # EasyOCR 내부 함수 호출이 실패하면 False (이후 readtext로 대체)
+
+# OCR 파라미터 (OCR 결과 캐시 키에도 포함됨)
+OCR_PARAMS = {
+    "text_threshold": 0.3,
+    "link_threshold": 0.3,
+    "low_text": 0.2,
+    "mode": OCR_MODE,
+    "preprocess": PREPROCESS_CONFIG.to_dict()
+}
+
+
+def init_ocr_worker(torch_threads: int = 1):
+    """워커 초기화: torch 스레드 수 고정 후 EasyOCR Reader 로드"""
+    with _reader_lock:
+        if reader is None:
+            _load_reader(torch_threads)
+
+
+def _load_reader(torch_threads: int):
+    """EasyOCR Reader 생성"""
+    global reader
+
+    # 워커끼리 CPU를 과점유하지 않도록 스레드 수 고정
+    os.environ.setdefault("OMP_NUM_THREADS", str(torch_threads))
+    try:
+        import torch
+        torch.set_num_threads(torch_threads)
+    except Exception as e:
+        logger.warning(f"torch 스레드 수 설정 실패: {e}")
+    try:
+        import cv2
+        cv2.setNumThreads(torch_threads)
+    except Exception as e:
+        logger.warning(f"cv2 스레드 수 설정 실패: {e}")
+
+    try:
+        import easyocr
+        logger.info(f"EasyOCR 초기화 시작... (pid={os.getpid()}, torch_threads={torch_threads})")
+        reader = easyocr.Reader(
+            ['en'],  # 영어만 사용 (안정성 향상)
+            gpu=False,
+            model_storage_directory='./models',
+            download_enabled=True,
+            # 안정성 최적화 설정
+            quantize=False,  # 양자화 비활성화 (안정성 향상)
+            verbose=False  # 불필요한 로그 제거
+        )
+        logger.info("✅ EasyOCR 초기화 완료")
+    except Exception as e:
+        logger.error(f"❌ EasyOCR 초기화 실패: {e}")
+        reader = None
+
+
+def is_ocr_ready() -> bool:
+    """현재 워커의 Reader 로드 여부"""
+    return reader is not None
+
+
+# 대안 OCR 함수 (Tesseract 사용)
+def extract_text_with_tesseract(image):
+    """Tesseract를 사용한 텍스트 추출 (대안)"""
+    try:
+        import cv2
+        import pytesseract
+        from PIL import Image
+
+        # OpenCV 이미지를 PIL 이미지로 변환 (전처리에서 그레이스케일로 바뀐 경우 그대로 사용)
+        image_rgb = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        pil_image = Image.fromarray(image_rgb)
+
+        # Tesseract OCR 실행
+        text = pytesseract.image_to_string(pil_image, lang='eng')
+        logger.info("✅ Tesseract OCR 완료")
+        return text.strip()
+    except Exception as e:
+        logger.error(f"❌ Tesseract OCR 실패: {e}")
+        return ""
+
+
+def _to_original(points, stats: Dict) -> List[List[int]]:
+    """전처리된 이미지 기준 좌표를 원본 이미지 좌표로 변환 (리사이즈 배율, 자른 영역 보정)"""
+    scale = stats.get("scale") or 1.0
+    offset_x, offset_y = (stats.get("crop") or [0, 0])[:2]
+    return [[int(round(x / scale)) + offset_x, int(round(y / scale)) + offset_y] for x, y in points]
+
+
+def filter_boxes(horizontal_list: List, free_list: List, shape: Tuple[int, ...]) -> Tuple[List, List]:
+    """
+    검출 박스 정리
+    이미지 밖 좌표를 자르고, 너무 작은 박스를 버리고, 다른 박스에 대부분 포함된 중복 박스를 합친 뒤 읽는 순서로 정렬
+    """
+    height, width = shape[:2]
+    boxes = []
+    for x_min, x_max, y_min, y_max in horizontal_list:
+        x_min, x_max = max(0, int(x_min)), min(width, int(x_max))
+        y_min, y_max = max(0, int(y_min)), min(height, int(y_max))
+        if y_max - y_min >= MIN_BOX_HEIGHT and x_max - x_min >= MIN_BOX_HEIGHT // 2:
+            boxes.append([x_min, x_max, y_min, y_max])
+
+    # 큰 박스부터 채택하고, 채택된 박스와 면적의 90% 이상 겹치는 박스는 그 박스로 합침
+    boxes.sort(key=lambda b: (b[1] - b[0]) * (b[3] - b[2]), reverse=True)
+    merged = []
+    for box in boxes:
+        area = (box[1] - box[0]) * (box[3] - box[2])
+        for kept in merged:
+            overlap_x = min(box[1], kept[1]) - max(box[0], kept[0])
+            overlap_y = min(box[3], kept[3]) - max(box[2], kept[2])
+            if overlap_x > 0 and overlap_y > 0 and overlap_x * overlap_y >= area * 0.9:
+                kept[:] = [min(box[0], kept[0]), max(box[1], kept[1]), min(box[2], kept[2]), max(box[3], kept[3])]
+                break
+        else:
+            merged.append(box)
+    merged.sort(key=lambda b: (b[2], b[0]))
+
+    free = [box for box in free_list
+            if max(y for _, y in box) - min(y for _, y in box) >= MIN_BOX_HEIGHT]
+    return merged, free
+
+
+def group_lines(boxes: List[Dict]) -> List[str]:
+    """박스 위치로 메뉴 줄 재구성 (세로 중심 차이가 글자 높이의 절반 이하이면 같은 줄, 줄 안에서는 왼쪽부터)"""
+    lines = []
+    for item in sorted(boxes, key=lambda b: sum(y for _, y in b["box"]) / 4):
+        ys = [y for _, y in item["box"]]
+        center, box_height = sum(ys) / 4, max(ys) - min(ys)
+        if lines and abs(center - lines[-1]["center"]) <= max(box_height, lines[-1]["height"]) * 0.5:
+            lines[-1]["items"].append(item)
+        else:
+            lines.append({"center": center, "height": box_height, "items": [item]})
+
+    return [
+        " ".join(item["text"] for item in sorted(line["items"], key=lambda b: min(x for x, _ in b["box"])))
+        for line in lines
+    ]
+
+
+def detect_boxes(image: np.ndarray) -> Tuple[List, List]:
+    """EasyOCR 검출(CRAFT)만 실행해 정리된 (가로 박스, 기울어진 박스) 반환"""
+    horizontal_list, free_list = reader.detect(
+        image,
+        text_threshold=OCR_PARAMS["text_threshold"],
+        link_threshold=OCR_PARAMS["link_threshold"],
+        low_text=OCR_PARAMS["low_text"]
+    )
+    return filter_boxes(horizontal_list[0], free_list[0], image.shape)
+
+
+def recognize_boxes(images: List[Tuple[np.ndarray, List, List]], batch_size: int = RECOGNITION_BATCH_SIZE) -> List[List[Dict]]:
+    """
+    여러 이미지의 검출 박스를 모아 배치로 인식
+
+    EasyOCR의 recognize는 CPU에서 박스를 하나씩 인식하므로, 박스를 직접 잘라 너비순으로 정렬한 뒤
+    batch_size개씩 묶어 인식합니다. 배치 안의 이미지는 가장 넓은 이미지 너비로 패딩되므로
+    너비가 배치 첫 이미지의 MAX_PADDING_RATIO배를 넘으면 새 배치를 시작합니다.
+
+    배치 인식은 EasyOCR 내부 함수(get_image_list, get_text)를 직접 호출하므로
+    requirements.txt에 고정된 버전과 내부 구조가 달라 import나 호출이 실패하면
+    경고를 남기고 이후로는 이미지별 readtext로 대체합니다.
+
+    Args:
+        images: 이미지별 (그레이스케일 이미지, 가로 박스, 기울어진 박스)
+        batch_size: 한 번에 인식할 박스 수
+
+    Returns:
+        이미지별 [{"box": 네 꼭짓점 좌표, "text": 텍스트, "confidence": 신뢰도}, ...]
+    """
+    global _batched_recognition
+
+    if _batched_recognition:
+        try:
+            return _recognize_batched(images, batch_size)
+        except (ImportError, AttributeError, TypeError) as e:
+            _batched_recognition = False
+            logger.warning("⚠️ EasyOCR 내부 구조가 달라 배치 인식 대신 readtext 사용 (easyocr %s): %s",
+                           _easyocr_version(), e)
+    return [_readtext_boxes(grey) for grey, _, _ in images]
+
+
+def _easyocr_version() -> str:
+    """설치된 EasyOCR 버전 (경고 로그용)"""
+    try:
+        import easyocr
+        return getattr(easyocr, "__version__", "unknown")
+    except ImportError:
+        return "unknown"
+
+
+def _recognize_batched(images: List[Tuple[np.ndarray, List, List]], batch_size: int) -> List[List[Dict]]:
+    """EasyOCR 내부 함수로 여러 이미지의 박스를 너비순 배치로 인식 (recognize_boxes 참고)"""
+    from easyocr import easyocr as easyocr_module
+    from easyocr.recognition import get_text
+    from easyocr.utils import get_image_list
+
+    model_height = easyocr_module.imgH
+    ignore_char = "".join(set(reader.character) - set(reader.lang_char))
+
+    crops = []  # (이미지 번호, 박스, 높이를 맞춘 잘라낸 이미지)
+    for index, (grey, horizontal_list, free_list) in enumerate(images):
+        if horizontal_list or free_list:
+            image_list, _ = get_image_list(horizontal_list, free_list, grey, model_height=model_height, sort_output=False)
+            crops.extend((index, box, crop) for box, crop in image_list)
+    crops.sort(key=lambda item: item[2].shape[1])
+
+    chunks = []
+    for crop in crops:
+        if (not chunks or len(chunks[-1]) >= batch_size or
+                crop[2].shape[1] > chunks[-1][0][2].shape[1] * MAX_PADDING_RATIO):
+            chunks.append([])
+        chunks[-1].append(crop)
+
+    results = [[] for _ in images]
+    for chunk in chunks:
+        max_width = math.ceil(chunk[-1][2].shape[1] / model_height) * model_height
+        predictions = get_text(
+            reader.character, model_height, int(max_width), reader.recognizer, reader.converter,
+            [(box, crop) for _, box, crop in chunk], ignore_char,
+            batch_size=len(chunk), workers=0, device=reader.device
+        )
+        for (index, _, _), (box, text, confidence) in zip(chunk, predictions):
+            results[index].append({
+                "box": [[int(x), int(y)] for x, y in box],
+                "text": text,
+                "confidence": round(float(confidence), 4)
+            })
+    return results
+
+
+def _readtext_boxes(image: np.ndarray) -> List[Dict]:
+    """readtext 모드: 검출과 인식을 EasyOCR readtext 한 번으로 실행"""
+    results = reader.readtext(
+        image,
+        text_threshold=OCR_PARAMS["text_threshold"],
+        link_threshold=OCR_PARAMS["link_threshold"],
+        low_text=OCR_PARAMS["low_text"]
+    )
+    return [
+        {"box": [[int(x), int(y)] for x, y in box], "text": text, "confidence": round(float(confidence), 4)}
+        for box, text, confidence in results
+    ]
+
+
+def _decode_image(content: bytes, timings: Dict[str, float], preprocess_stats: Dict) -> np.ndarray:
+    """이미지 디코딩 후 전처리"""
+    import cv2
+
+    started_at = time.perf_counter()
+    image = cv2.imdecode(np.frombuffer(content, np.uint8), cv2.IMREAD_COLOR)
+    if image is None:
+        raise OCRFailedError("모든 OCR 처리 실패: 이미지를 읽을 수 없습니다")
+    decoded_at = time.perf_counter()
+    timings["image_decode"] = decoded_at - started_at
+
+    image, stats = preprocess_image(image, PREPROCESS_CONFIG)
+    preprocess_stats.update(stats)
+    timings["image_preprocess"] = time.perf_counter() - decoded_at
+    logger.info(
+        "이미지 전처리: %dx%d -> %dx%d (픽셀 %d개 절감, 글자 높이 %s)",
+        *stats["input_size"], *stats["output_size"], stats["pixels_saved"], stats["text_height"]
+    )
+    return image
+
+
+def _fallback_text(image: np.ndarray, ocr_error: Exception) -> str:
+    """EasyOCR 실패 시 Tesseract로 대체"""
+    logger.error(f"EasyOCR 처리 중 오류: {ocr_error}")
+    logger.info("Tesseract OCR로 대체 시도...")
+    extracted_text = extract_text_with_tesseract(image)
+    if not extracted_text:
+        logger.error("Tesseract OCR도 실패")
+        raise OCRFailedError(f"모든 OCR 처리 실패: {str(ocr_error)}")
+    logger.info("✅ Tesseract OCR로 텍스트 추출 성공")
+    return extracted_text
+
+
+def extract_texts_batched(contents: List[bytes], batch_size: int = RECOGNITION_BATCH_SIZE) -> List:
+    """
+    여러 이미지 OCR (OCR 워커 풀에서 실행됨)
+
+    two_phase 모드에서는 이미지마다 검출만 먼저 하고, 모든 이미지의 박스를 모아 한 번에 배치 인식합니다.
+    process 모드에서도 메인 프로세스가 메트릭을 기록할 수 있도록 단계별 실행 시간을 함께 반환합니다.
+
+    Returns:
+        이미지별 (텍스트, 단계별 실행 시간, 전처리 통계, 원본 좌표 기준 박스 목록) 또는 OCRFailedError
+        텍스트는 박스 위치로 재구성한 메뉴 줄을 줄바꿈으로 이은 것입니다.
+    """
+    import cv2
+
+    states = []
+    for content in contents:
+        state = {"timings": {}, "stats": {}, "image": None, "boxes": None, "error": None}
+        states.append(state)
+        try:
+            state["image"] = _decode_image(content, state["timings"], state["stats"])
+            if reader is None:
+                raise Exception("OCR 엔진이 초기화되지 않았습니다")
+
+            started_at = time.perf_counter()
+            if OCR_MODE == "readtext":
+                state["boxes"] = _readtext_boxes(state["image"])
+                state["timings"]["ocr"] = time.perf_counter() - started_at
+            else:
+                state["detected"] = detect_boxes(state["image"])
+                state["timings"]["ocr_detect"] = time.perf_counter() - started_at
+        except Exception as e:
+            state["error"] = e
+
+    # 검출에 성공한 이미지들의 박스를 한 번에 인식
+    pending = [state for state in states if state["error"] is None and "detected" in state]
+    if pending:
+        started_at = time.perf_counter()
+        inputs = []
+        for state in pending:
+            image = state["image"]
+            grey = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+            inputs.append((grey, *state["detected"]))
+        try:
+            recognized = recognize_boxes(inputs, batch_size)
+        except Exception as e:
+            logger.error("❌ EasyOCR 배치 인식 중 오류 발생: %s", str(e))
+            for state in pending:
+                state["error"] = e
+        else:
+            recognize_time = time.perf_counter() - started_at
+            for state, boxes in zip(pending, recognized):
+                state["boxes"] = boxes
+                state["timings"]["ocr_recognize"] = recognize_time
+                state["timings"]["ocr"] = state["timings"]["ocr_detect"] + recognize_time
+        logger.info("📌 EasyOCR 배치 인식: 이미지 %d개, 박스 %d개, %.2f초",
+                    len(pending), sum(len(state["detected"][0]) + len(state["detected"][1]) for state in pending),
+                    time.perf_counter() - started_at)
+
+    results = []
+    for state in states:
+        if isinstance(state["error"], OCRFailedError):
+            results.append(state["error"])
+            continue
+
+        boxes = state["boxes"] or []
+        extracted_text = "\n".join(group_lines(boxes))
+        if state["error"] is None and not extracted_text.strip():
+            state["error"] = Exception("OCR에서 텍스트를 추출할 수 없습니다.")
+
+        if state["error"] is not None:
+            try:
+                extracted_text = _fallback_text(state["image"], state["error"])
+            except OCRFailedError as e:
+                results.append(e)
+                continue
+        else:
+            logger.info(f"OCR 결과: {len(boxes)}개 텍스트 블록 발견")
+            logger.debug("📌 OCR 결과 내용: %s", extracted_text)
+
+        for box in boxes:
+            box["box"] = _to_original(box["box"], state["stats"])
+        results.append((extracted_text, state["timings"], state["stats"], boxes))
+    return results
+
+
+def extract_text_with_timings(content: bytes) -> Tuple[str, Dict[str, float], Dict, List[Dict]]:
+    """이미지 한 장 OCR 후 (텍스트, 단계별 실행 시간, 전처리 통계, 박스 목록) 반환"""
+    result = extract_texts_batched([content])[0]
+    if isinstance(result, Exception):
+        raise result
+    return result
+
+
+def extract_text_from_image(content: bytes) -> str:
+    """이미지 디코딩/전처리 후 OCR 실행"""
+    return extract_text_with_timings(content)[0]
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+분석 단계 실행기
+서로 의존하지 않는 분석 단계(메뉴 분류, 유사 메뉴 검색, 성분 추출)를 스레드 풀에서 동시에 실행하고
+단계마다 시간 제한을 적용합니다.
+
+시간 제한을 넘긴 단계는 StageTimeoutError로 알려 호출자가 해당 단계만 비운 부분 결과를 만들 수 있게 합니다.
+이미 실행 중인 스레드는 중단할 수 없으므로 그 단계는 끝까지 실행되지만 결과는 버려집니다.
+(아직 시작하지 못하고 대기 중이던 단계는 취소됨)
+"""
+
+import os
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Optional
+
+from utils.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+
+class StageTimeoutError(Exception):
+    """단계가 시간 제한 안에 끝나지 않음"""
+
+    def __init__(self, stage: str, timeout: float):
+        super().__init__(f"{stage} 단계 시간 초과 ({timeout}초)")
+        self.stage = stage
+        self.timeout = timeout
+
+
+def parse_timeouts(value: str) -> Dict[str, float]:
+    """단계=초 목록 (예: similar_menus=0.5,recommendations=1) 파싱"""
+    timeouts = {}
+    for item in value.split(","):
+        stage, _, seconds = item.partition("=")
+        if stage.strip() and seconds.strip():
+            timeouts[stage.strip()] = float(seconds)
+    return timeouts
+
+
+class StageRunner:
+    def __init__(self, max_workers: int = 4, default_timeout: float = 2.0,
+                 timeouts: Optional[Dict[str, float]] = None):
+        """
+        분석 단계 실행기 초기화
+
+        Args:
+            max_workers: 단계를 실행할 스레드 수 (프로세스 전체에서 공유)
+            default_timeout: 단계별 기본 시간 제한 (초, 0이면 제한 없음)
+            timeouts: 단계 이름별 시간 제한 (초, 0이면 제한 없음) - 지정하지 않은 단계는 default_timeout
+        """
+        self.max_workers = max(1, max_workers)
+        self.default_timeout = default_timeout
+        self.timeouts = dict(timeouts or {})
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="analysis")
+        self._timed_out: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "StageRunner":
+        """환경 변수(ANALYSIS_STAGE_WORKERS, ANALYSIS_STAGE_TIMEOUT, ANALYSIS_STAGE_TIMEOUTS)로 실행기 생성"""
+        return cls(
+            max_workers=int(os.getenv("ANALYSIS_STAGE_WORKERS", "4")),
+            default_timeout=float(os.getenv("ANALYSIS_STAGE_TIMEOUT", "2.0")),
+            timeouts=parse_timeouts(os.getenv("ANALYSIS_STAGE_TIMEOUTS", ""))
+        )
+
+    def timeout_for(self, stage: str) -> Optional[float]:
+        """단계 시간 제한 (초, 제한 없으면 None)"""
+        timeout = self.timeouts.get(stage, self.default_timeout)
+        return timeout if timeout > 0 else None
+
+    async def run(self, stage: str, func: Callable, *args):
+        """
+        스레드 풀에서 func(*args) 실행 후 결과 반환
+
+        시간 제한은 대기열에서 기다린 시간을 포함합니다. (스레드가 모두 바쁘면 그만큼 일찍 제한에 걸림)
+
+        Raises:
+            StageTimeoutError: 시간 제한 초과
+            func에서 발생한 예외는 그대로 전달
+        """
+        loop = asyncio.get_running_loop()
+        timeout = self.timeout_for(stage)
+        try:
+            return await asyncio.wait_for(loop.run_in_executor(self._executor, partial(func, *args)), timeout=timeout)
+        except asyncio.TimeoutError:
+            with self._lock:
+                self._timed_out[stage] = self._timed_out.get(stage, 0) + 1
+            metrics.increment("analysis_stage_timeouts")
+            logger.warning(f"⚠️ 분석 단계 시간 초과: {stage} ({timeout}초)")
+            raise StageTimeoutError(stage, timeout) from None
+
+    def get_stats(self) -> Dict:
+        """설정 및 단계별 시간 초과 횟수"""
+        with self._lock:
+            timed_out = dict(self._timed_out)
+        return {
+            "max_workers": self.max_workers,
+            "default_timeout": self.default_timeout,
+            "timeouts": dict(self.timeouts),
+            "timed_out": timed_out
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# 프로세스 전역 단계 실행기 (모델 번들 간에 공유)
+stage_runner = StageRunner.from_env()
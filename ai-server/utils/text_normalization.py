@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+텍스트 정규화 공통 모듈
+모델마다 따로 하던 전처리(특수문자 제거, 공백 정리, 소문자화)를 미리 컴파일한 패턴으로 한 곳에서 처리합니다.
+
+요청마다 NormalizedText를 한 번 만들어 모든 분석 단계에 넘기면
+정제된 문자열, 토큰, 단어/문자 n-gram이 처음 필요할 때 한 번만 계산되어 재사용됩니다.
+tfidf_transform은 이 n-gram으로 학습된 TfidfVectorizer와 같은 벡터를 만들어 다시 토큰화하지 않습니다.
+"""
+
+import re
+import hashlib
+import unicodedata
+from typing import Dict, List, Sequence, Tuple, Union
+
+import numpy as np
+from scipy import sparse
+
+# 한글, 영어, 숫자, 공백 이외의 문자
+NON_TEXT_CHARS = re.compile(r'[^가-힣a-zA-Z0-9\s]')
+# TfidfVectorizer 기본 토큰 패턴 (2글자 이상 단어)
+TOKEN_PATTERN = re.compile(r'(?u)\b\w\w+\b')
+# 숫자/기호로만 이루어진 단어 (OCR 결과의 가격, 구분선 등)
+SYMBOLS_ONLY = re.compile(r'[0-9~!@#$%^&*()_+\-=\[\]{};:\'"\\|,.<>/?]+')
+
+# 한글 음절 → 호환 자모 (겹모음/겹받침은 입력 순서대로 낱자로 분해)
+_CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_JUNGSEONG = ("ㅏ", "ㅐ", "ㅑ", "ㅒ", "ㅓ", "ㅔ", "ㅕ", "ㅖ", "ㅗ", "ㅗㅏ", "ㅗㅐ", "ㅗㅣ", "ㅛ", "ㅜ",
+              "ㅜㅓ", "ㅜㅔ", "ㅜㅣ", "ㅠ", "ㅡ", "ㅡㅣ", "ㅣ")
+_JONGSEONG = ("", "ㄱ", "ㄲ", "ㄱㅅ", "ㄴ", "ㄴㅈ", "ㄴㅎ", "ㄷ", "ㄹ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ", "ㄹㅌ",
+              "ㄹㅍ", "ㄹㅎ", "ㅁ", "ㅂ", "ㅂㅅ", "ㅅ", "ㅆ", "ㅇ", "ㅈ", "ㅊ", "ㅋ", "ㅌ", "ㅍ", "ㅎ")
+# 단독으로 입력된 겹모음/겹받침 자모
+_COMPOUND_JAMO = {jamo: split for jamo, split in zip(
+    "ㅘㅙㅚㅝㅞㅟㅢㄳㄵㄶㄺㄻㄼㄽㄾㄿㅀㅄ",
+    ("ㅗㅏ", "ㅗㅐ", "ㅗㅣ", "ㅜㅓ", "ㅜㅔ", "ㅜㅣ", "ㅡㅣ", "ㄱㅅ", "ㄴㅈ", "ㄴㅎ", "ㄹㄱ", "ㄹㅁ", "ㄹㅂ", "ㄹㅅ",
+     "ㄹㅌ", "ㄹㅍ", "ㄹㅎ", "ㅂㅅ")
+)}
+
+
+def canonical_text(text: str) -> str:
+    """유니코드 NFC 정규화 + 연속 공백 하나로 (캐시 키, 분석 입력용)"""
+    return " ".join(unicodedata.normalize("NFC", text).split())
+
+
+def clean_text(text: str) -> str:
+    """모델 입력용 전처리 (한글/영어/숫자만 남기고 공백 정리 후 소문자화)"""
+    return " ".join(NON_TEXT_CHARS.sub("", text).split()).lower()
+
+
+def decompose_hangul(text: str) -> str:
+    """
+    한글을 호환 자모로 분해 (한글 이외의 문자는 그대로)
+    입력 중인 음절도 접두사로 매칭되도록 겹모음/겹받침은 낱자로 나눕니다. (예: '웅' → 'ㅇㅜㅇ'은 '우유' → 'ㅇㅜㅇㅠ'의 접두사)
+    """
+    jamo = []
+    for char in text:
+        code = ord(char) - 0xAC00
+        if 0 <= code < 11172:
+            jamo.append(_CHOSEONG[code // 588])
+            jamo.append(_JUNGSEONG[code % 588 // 28])
+            jamo.append(_JONGSEONG[code % 28])
+        else:
+            jamo.append(_COMPOUND_JAMO.get(char, char))
+    return "".join(jamo)
+
+
+def filter_meaningful_words(text: str) -> str:
+    """숫자/기호로만 이루어진 단어 제거 (OCR 결과 정제용)"""
+    return " ".join(word for word in text.split() if not SYMBOLS_ONLY.fullmatch(word))
+
+
+class NormalizedText:
+    """
+    한 번 정규화한 입력 텍스트
+    raw는 원본, text는 clean_text 결과이며 토큰과 n-gram은 처음 요청될 때 계산해 보관합니다.
+    """
+
+    __slots__ = ("raw", "text", "_tokens", "_word_ngrams", "_char_ngrams")
+
+    def __init__(self, raw: str):
+        self.raw = raw
+        self.text = clean_text(raw)
+        self._tokens = None
+        self._word_ngrams: Dict[Tuple[int, int], List[str]] = {}
+        self._char_ngrams: Dict[int, List[str]] = {}
+
+    @property
+    def tokens(self) -> List[str]:
+        """단어 토큰 (TfidfVectorizer 기본 토큰 패턴 기준)"""
+        if self._tokens is None:
+            self._tokens = TOKEN_PATTERN.findall(self.text)
+        return self._tokens
+
+    def word_ngrams(self, ngram_range: Tuple[int, int] = (1, 1)) -> List[str]:
+        """단어 n-gram 목록 (TfidfVectorizer(analyzer='word')와 같은 순서/중복 포함)"""
+        ngram_range = tuple(ngram_range)
+        ngrams = self._word_ngrams.get(ngram_range)
+        if ngrams is None:
+            min_n, max_n = ngram_range
+            tokens = self.tokens
+            ngrams = list(tokens) if min_n == 1 else []
+            for n in range(max(min_n, 2), min(max_n, len(tokens)) + 1):
+                ngrams.extend(" ".join(tokens[i:i + n]) for i in range(len(tokens) - n + 1))
+            self._word_ngrams[ngram_range] = ngrams
+        return ngrams
+
+    def char_ngrams(self, n: int = 2) -> List[str]:
+        """문자 n-gram 목록 (공백 포함, 텍스트가 n보다 짧으면 텍스트 자체)"""
+        ngrams = self._char_ngrams.get(n)
+        if ngrams is None:
+            text = self.text
+            ngrams = [text[i:i + n] for i in range(len(text) - n + 1)] or ([text] if text else [])
+            self._char_ngrams[n] = ngrams
+        return ngrams
+
+    def __repr__(self) -> str:
+        return f"NormalizedText({self.text!r})"
+
+
+TextInput = Union[str, NormalizedText]
+
+
+def as_normalized(text: TextInput) -> NormalizedText:
+    """문자열이면 NormalizedText로 감싸고, 이미 NormalizedText면 그대로 반환"""
+    return text if isinstance(text, NormalizedText) else NormalizedText(text)
+
+
+def raw_text(text: TextInput) -> str:
+    """원본 문자열"""
+    return text.raw if isinstance(text, NormalizedText) else text
+
+
+def vectorizer_size(vectorizer) -> int:
+    """벡터라이저 출력 차원 (어휘 크기 또는 해싱 공간 크기)"""
+    n_features = getattr(vectorizer, "n_features", None)
+    return n_features if n_features is not None else len(vectorizer.vocabulary_)
+
+
+def vectorizer_digest(vectorizer) -> str:
+    """학습된 벡터라이저의 어휘와 IDF 해시 (저장된 인덱스가 같은 벡터라이저로 만들어졌는지 확인용)"""
+    digest = hashlib.sha1(f"{type(vectorizer).__name__}\t{vectorizer_size(vectorizer)}\n".encode("utf-8"))
+    vocabulary = getattr(vectorizer, "vocabulary_", None)
+    if vocabulary is not None:
+        for term, column in sorted(vocabulary.items()):
+            digest.update(f"{term}\t{column}\n".encode("utf-8"))
+    idf = getattr(vectorizer, "idf_", None)
+    if idf is not None:
+        digest.update(np.ascontiguousarray(idf, dtype=np.float64).tobytes())
+    return digest.hexdigest()[:16]
+
+
+def _supports_ngram_input(vectorizer) -> bool:
+    """NormalizedText의 n-gram으로 직접 변환할 수 있는 기본 설정의 word TF-IDF인지 확인"""
+    return (
+        hasattr(vectorizer, "vocabulary_") and hasattr(vectorizer, "idf_") and
+        getattr(vectorizer, "analyzer", None) == "word" and
+        vectorizer.tokenizer is None and vectorizer.preprocessor is None and
+        vectorizer.strip_accents is None and vectorizer.stop_words is None and
+        vectorizer.token_pattern == TOKEN_PATTERN.pattern
+    )
+
+
+def normalize_rows(data: np.ndarray, indptr: np.ndarray, norm: str):
+    """CSR 행별 l1/l2 정규화 (제자리, sklearn normalize와 같은 계산이지만 입력 검증 비용이 없음)"""
+    lengths = np.diff(indptr)
+    nonempty = lengths > 0
+    if not nonempty.any():
+        return
+    values = data * data if norm == "l2" else np.abs(data)
+    norms = np.add.reduceat(values, indptr[:-1][nonempty])
+    if norm == "l2":
+        np.sqrt(norms, out=norms)
+    norms[norms == 0] = 1
+    data /= np.repeat(norms, lengths[nonempty])
+
+
+def tfidf_transform(vectorizer, texts: Sequence[TextInput]) -> sparse.csr_matrix:
+    """
+    학습된 TfidfVectorizer로 변환 (vectorizer.transform과 같은 결과)
+
+    NormalizedText에 보관된 단어 n-gram을 그대로 사용하므로 텍스트를 다시 정제/토큰화하지 않습니다.
+    NormalizedText를 직접 받는 벡터라이저(accepts_normalized, 예: HashingTfidfVectorizer)는 그대로 넘기고,
+    지원하지 않는 설정의 벡터라이저는 정제된 문자열로 vectorizer.transform을 호출합니다.
+    """
+    docs = [as_normalized(text) for text in texts]
+    if getattr(vectorizer, "accepts_normalized", False):
+        return vectorizer.transform(docs)
+    if not _supports_ngram_input(vectorizer):
+        return vectorizer.transform([doc.text for doc in docs])
+
+    vocabulary = vectorizer.vocabulary_
+    indptr = [0]
+    indices = []
+    values = []
+    for doc in docs:
+        counts: Dict[int, int] = {}
+        for term in doc.word_ngrams(vectorizer.ngram_range):
+            index = vocabulary.get(term)
+            if index is not None:
+                counts[index] = counts.get(index, 0) + 1
+        for index in sorted(counts):
+            indices.append(index)
+            values.append(counts[index])
+        indptr.append(len(indices))
+
+    data = np.asarray(values, dtype=vectorizer.dtype)
+    if vectorizer.binary:
+        data[:] = 1
+    if vectorizer.sublinear_tf:
+        np.log(data, out=data)
+        data += 1
+    index_array = np.asarray(indices, dtype=np.int32)
+    indptr_array = np.asarray(indptr, dtype=np.int32)
+    if vectorizer.use_idf:
+        data *= vectorizer.idf_[index_array]
+    if vectorizer.norm:
+        normalize_rows(data, indptr_array, vectorizer.norm)
+
+    return sparse.csr_matrix((data, index_array, indptr_array),
+                             shape=(len(docs), len(vocabulary)), dtype=vectorizer.dtype)
+
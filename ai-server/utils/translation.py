@@ -0,0 +1,371 @@
+#!/usr/bin/env python3
+"""
+메뉴 텍스트 번역 (영어 → 한글)
+요청마다 googletrans를 호출하는 대신 아래 순서로 번역합니다.
+
+1. 오프라인 사전 번역기: 데이터셋의 english_name/name 쌍 + 성분 동의어로 만든 구문 사전
+2. 번역 캐시: 메모리 LRU + (선택) sqlite 영구 저장소
+3. 원격 번역기: 전용 스레드 풀에서 실행, 엄격한 시간 제한
+"""
+
+import os
+import re
+import asyncio
+import logging
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+
+from models.menu_catalog import DEFAULT_DATASET_PATH, get_menu_catalog
+
+logger = logging.getLogger(__name__)
+
+HANGUL_PATTERN = re.compile(r'[가-힣]')
+TOKEN_PATTERN = re.compile(r'[a-z]+|[0-9][0-9.,]*|[^\sa-z0-9]+')
+# 원문에서 토큰 위치를 찾을 때 사용 (TOKEN_PATTERN과 같은 토큰, 대문자 포함)
+TOKEN_SPAN_PATTERN = re.compile(r'[a-zA-Z]+|[0-9][0-9.,]*|[^\sa-zA-Z0-9]+')
+
+
+class TranslationBackend(ABC):
+    """번역 백엔드 인터페이스"""
+
+    name = "base"
+
+    @abstractmethod
+    def translate(self, text: str, src: str = 'en', dest: str = 'ko') -> Optional[str]:
+        """번역 결과 반환 (번역할 수 없으면 None)"""
+
+
+class DictionaryTranslator(TranslationBackend):
+    """구문 사전 기반 오프라인 번역기 (최장 일치)"""
+
+    name = "dictionary"
+
+    def __init__(self, phrase_table: Optional[Dict[str, str]] = None, min_coverage: float = 1.0):
+        """
+        Args:
+            phrase_table: 소문자 영어 구문 → 한글
+            min_coverage: 번역 성공으로 간주할 최소 영어 단어 커버리지
+        """
+        self.min_coverage = min_coverage
+        self.phrases: Dict[Tuple[str, ...], str] = {}
+        self.max_phrase_len = 0
+        for english, korean in (phrase_table or {}).items():
+            self.add_phrase(english, korean)
+
+    def add_phrase(self, english: str, korean: str):
+        """구문 추가"""
+        tokens = tuple(TOKEN_PATTERN.findall(english.lower()))
+        korean = korean.strip()
+        if not tokens or not korean:
+            return
+        self.phrases[tokens] = korean
+        self.max_phrase_len = max(self.max_phrase_len, len(tokens))
+
+    @classmethod
+    def from_dataset(cls, dataset_path: str = DEFAULT_DATASET_PATH,
+                     ingredient_synonyms: Optional[Dict[str, List[str]]] = None,
+                     min_coverage: float = 1.0) -> "DictionaryTranslator":
+        """데이터셋 메뉴명 쌍과 성분 동의어로 번역기 생성"""
+        translator = cls(min_coverage=min_coverage)
+
+        # 성분 동의어: 영어 동의어 → 바로 뒤의 한글 동의어 (없으면 대표 성분명)
+        for main_ingredient, synonyms in (ingredient_synonyms or {}).items():
+            for i, synonym in enumerate(synonyms):
+                if HANGUL_PATTERN.search(synonym):
+                    continue
+                following = synonyms[i + 1] if i + 1 < len(synonyms) else ""
+                korean = following if HANGUL_PATTERN.search(following) else main_ingredient
+                if tuple(TOKEN_PATTERN.findall(synonym.lower())) not in translator.phrases:
+                    translator.add_phrase(synonym, korean)
+
+        # 메뉴명 쌍 (성분 동의어보다 우선)
+        try:
+            catalog = get_menu_catalog(dataset_path)
+
+            pairs = []
+            for menu in catalog:
+                english_name = menu.english_name
+                korean_name = menu.name.strip()
+                if not english_name or not HANGUL_PATTERN.search(korean_name):
+                    continue
+                pairs.append((english_name, korean_name))
+
+                # "X with Y" ↔ "X' (Y')" 형태면 기본 메뉴명과 옵션도 따로 등록
+                english_parts = english_name.split(' with ')
+                korean_parts = korean_name.rstrip(')').split(' (')
+                if len(english_parts) == 2 and len(korean_parts) == 2:
+                    pairs.append((english_parts[0], korean_parts[0]))
+                    pairs.append((english_parts[1], korean_parts[1]))
+
+            # 단어 수가 같은 구문 쌍에서 단어 단위 대응 추출 (가장 많이 나온 대응 사용)
+            word_votes = defaultdict(Counter)
+            for english, korean in pairs:
+                english_words = TOKEN_PATTERN.findall(english.lower())
+                korean_words = korean.split()
+                if len(english_words) == len(korean_words):
+                    for english_word, korean_word in zip(english_words, korean_words):
+                        word_votes[english_word][korean_word] += 1
+            for english_word, votes in word_votes.items():
+                translator.add_phrase(english_word, votes.most_common(1)[0][0])
+
+            for english, korean in pairs:
+                translator.add_phrase(english, korean)
+        except Exception as e:
+            logger.warning(f"번역 사전용 데이터셋 로드 실패: {e}")
+
+        logger.info(f"사전 번역기 준비 완료: {len(translator.phrases)}개 구문")
+        return translator
+
+    def translate_with_coverage(self, text: str) -> Tuple[str, float]:
+        """
+        번역 결과와 영어 단어 커버리지(0~1) 반환
+
+        사전 구문과 일치한 영어 구간만 한글로 바꾸고, 나머지 원문(한글, 가격, 줄바꿈, 대소문자)은 그대로 둡니다.
+        영어 단어가 없으면 원문을 그대로 반환합니다.
+        """
+        spans = list(TOKEN_SPAN_PATTERN.finditer(text))
+        tokens = [span.group().lower() for span in spans]
+        output = []
+        position = 0  # 원문에서 아직 출력하지 않은 위치
+        english_total = 0
+        english_matched = 0
+
+        i = 0
+        while i < len(tokens):
+            match = None
+            for length in range(min(self.max_phrase_len, len(tokens) - i), 0, -1):
+                candidate = tuple(tokens[i:i + length])
+                if candidate in self.phrases:
+                    match = (length, self.phrases[candidate])
+                    break
+
+            if match:
+                length, korean = match
+                english_count = sum(1 for t in tokens[i:i + length] if t.isascii() and t.isalpha())
+                english_total += english_count
+                english_matched += english_count
+                if english_count:
+                    output.append(text[position:spans[i].start()])
+                    output.append(korean)
+                    position = spans[i + length - 1].end()
+                i += length
+            else:
+                token = tokens[i]
+                if token.isascii() and token.isalpha():
+                    english_total += 1
+                i += 1
+
+        if not english_total:
+            return text, 1.0
+        output.append(text[position:])
+        return ''.join(output), english_matched / english_total
+
+    def translate(self, text: str, src: str = 'en', dest: str = 'ko') -> Optional[str]:
+        translated, coverage = self.translate_with_coverage(text)
+        return translated if coverage >= self.min_coverage else None
+
+
+class GoogleTranslator(TranslationBackend):
+    """googletrans 기반 원격 번역기 (스레드마다 Translator 재사용)"""
+
+    name = "googletrans"
+
+    def __init__(self, timeout: float = 3.0):
+        self.timeout = timeout
+        self._local = threading.local()
+
+    def translate(self, text: str, src: str = 'en', dest: str = 'ko') -> Optional[str]:
+        translator = getattr(self._local, "translator", None)
+        if translator is None:
+            from googletrans import Translator
+            translator = Translator(timeout=self.timeout)
+            self._local.translator = translator
+        return translator.translate(text, src=src, dest=dest).text
+
+
+class TranslationCache:
+    """
+    번역 결과 캐시 (메모리 LRU + 선택적 sqlite 영구 저장)
+    메모리 계층과 DB는 잠금을 따로 써서, DB 저장(commit) 중에도 메모리 조회는 기다리지 않습니다.
+    (DB 조회/저장은 get_persistent/put을 스레드에서 호출)
+    """
+
+    def __init__(self, max_entries: int = 1024, db_path: Optional[str] = None):
+        self.max_entries = max(0, max_entries)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._db = None
+
+        if db_path:
+            try:
+                os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+                self._db = sqlite3.connect(db_path, check_same_thread=False)
+                self._db.execute(
+                    "CREATE TABLE IF NOT EXISTS translations (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+                )
+                self._db.commit()
+            except Exception as e:
+                logger.warning(f"번역 캐시 DB 초기화 실패, 메모리 캐시만 사용: {e}")
+                self._db = None
+
+    @staticmethod
+    def make_key(text: str, src: str, dest: str) -> str:
+        return f"{src}:{dest}:{text}"
+
+    @property
+    def persistent(self) -> bool:
+        return self._db is not None
+
+    def get(self, key: str) -> Optional[str]:
+        """메모리 → DB 순서로 조회"""
+        value = self.get_memory(key)
+        return value if value is not None else self.get_persistent(key)
+
+    def get_memory(self, key: str) -> Optional[str]:
+        """메모리 계층만 조회 (이벤트 루프에서 바로 호출 가능)"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                return self._memory[key]
+        return None
+
+    def get_persistent(self, key: str) -> Optional[str]:
+        """DB 조회 후 메모리 계층에 저장 (블로킹 - 스레드에서 호출)"""
+        if self._db is None:
+            return None
+        with self._db_lock:
+            row = self._db.execute("SELECT value FROM translations WHERE key = ?", (key,)).fetchone()
+
+        if row is None:
+            return None
+        self._memory_put(key, row[0])
+        return row[0]
+
+    def put(self, key: str, value: str):
+        self._memory_put(key, value)
+        if self._db is not None:
+            with self._db_lock:
+                try:
+                    self._db.execute(
+                        "INSERT OR REPLACE INTO translations (key, value) VALUES (?, ?)", (key, value)
+                    )
+                    self._db.commit()
+                except Exception as e:
+                    logger.warning(f"번역 캐시 저장 실패: {e}")
+
+    def _memory_put(self, key: str, value: str):
+        if self.max_entries == 0:
+            return
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def __len__(self):
+        return len(self._memory)
+
+
+class TranslationService:
+    def __init__(self, dictionary: Optional[DictionaryTranslator] = None,
+                 remote: Optional[TranslationBackend] = None,
+                 cache: Optional[TranslationCache] = None,
+                 remote_timeout: float = 2.0, remote_workers: int = 4):
+        """
+        번역 서비스 초기화
+
+        Args:
+            dictionary: 오프라인 사전 번역기
+            remote: 원격 번역 백엔드 (None이면 사용하지 않음)
+            cache: 번역 캐시
+            remote_timeout: 원격 번역 시간 제한 (초)
+            remote_workers: 원격 번역 전용 스레드 수
+        """
+        self.dictionary = dictionary or DictionaryTranslator()
+        self.remote = remote
+        self.cache = cache if cache is not None else TranslationCache()
+        self.remote_timeout = remote_timeout
+        self._executor = ThreadPoolExecutor(max_workers=remote_workers, thread_name_prefix="translate")
+        self.stats = {"dictionary": 0, "cache": 0, "remote": 0, "fallback": 0}
+
+    @classmethod
+    def from_env(cls) -> "TranslationService":
+        """환경 변수(TRANSLATION_REMOTE, TRANSLATION_TIMEOUT, TRANSLATION_CACHE_SIZE, TRANSLATION_CACHE_PATH)로 생성"""
+        remote_timeout = float(os.getenv("TRANSLATION_TIMEOUT", "2.0"))
+        remote = None
+        if os.getenv("TRANSLATION_REMOTE", "googletrans") == "googletrans":
+            remote = GoogleTranslator(timeout=remote_timeout)
+        return cls(
+            remote=remote,
+            cache=TranslationCache(
+                max_entries=int(os.getenv("TRANSLATION_CACHE_SIZE", "1024")),
+                db_path=os.getenv("TRANSLATION_CACHE_PATH") or None
+            ),
+            remote_timeout=remote_timeout
+        )
+
+    def set_dictionary(self, dictionary: DictionaryTranslator):
+        """사전 번역기 교체 (모델 데이터 로드 후 호출)"""
+        self.dictionary = dictionary
+
+    async def translate(self, text: str, src: str = 'en', dest: str = 'ko') -> Tuple[str, str]:
+        """
+        텍스트 번역
+
+        Returns:
+            (번역된 텍스트, 번역 출처) - 출처는 dictionary / cache / remote / fallback
+        """
+        if not text.strip():
+            return text, "fallback"
+
+        # 1. 오프라인 사전
+        translated, coverage = self.dictionary.translate_with_coverage(text)
+        if coverage >= self.dictionary.min_coverage:
+            self.stats["dictionary"] += 1
+            return translated, "dictionary"
+
+        # 2. 캐시 (메모리는 바로, sqlite 조회는 스레드에서)
+        key = TranslationCache.make_key(text, src, dest)
+        cached = self.cache.get_memory(key)
+        if cached is None and self.cache.persistent:
+            cached = await asyncio.to_thread(self.cache.get_persistent, key)
+        if cached is not None:
+            self.stats["cache"] += 1
+            return cached, "cache"
+
+        # 3. 원격 번역 (시간 제한)
+        if self.remote is not None:
+            try:
+                loop = asyncio.get_running_loop()
+                result = await asyncio.wait_for(
+                    loop.run_in_executor(self._executor, self.remote.translate, text, src, dest),
+                    timeout=self.remote_timeout
+                )
+                if result:
+                    await asyncio.to_thread(self.cache.put, key, result)
+                    self.stats["remote"] += 1
+                    return result, "remote"
+            except asyncio.TimeoutError:
+                logger.warning(f"⚠️ 원격 번역 시간 초과 ({self.remote_timeout}초)")
+            except Exception as e:
+                logger.warning(f"⚠️ 원격 번역 실패: {e}")
+
+        # 4. 부분 사전 번역 (사전에 없는 단어는 원문 유지)
+        self.stats["fallback"] += 1
+        return (translated if coverage > 0 else text), "fallback"
+
+    def get_stats(self) -> Dict:
+        return {
+            **self.stats,
+            "dictionary_phrases": len(self.dictionary.phrases),
+            "cache_entries": len(self.cache),
+            "remote_backend": self.remote.name if self.remote else None
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+컴포넌트 워밍업 상태 관리
+OCR / 번역 사전처럼 로드가 무거운 컴포넌트를 처음 사용할 때 (또는 백그라운드에서) 한 번만 로드하고,
+/ready 엔드포인트에서 컴포넌트별 상태를 보고합니다.
+
+로드에 실패한 컴포넌트는 다음 ensure() / start_background() 호출 때 다시 로드하며,
+연속 실패 시 재시도 간격을 두 배씩 늘립니다. (간격 안의 호출은 로드 없이 바로 실패 반환)
+"""
+
+import time
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+NOT_LOADED = "not_loaded"
+LOADING = "loading"
+READY = "ready"
+FAILED = "failed"
+
+
+class ComponentWarmup:
+    def __init__(self, retry_delay: float = 1.0, max_retry_delay: float = 60.0):
+        """
+        Args:
+            retry_delay: 첫 실패 후 재시도까지 기다릴 시간 (초)
+            max_retry_delay: 연속 실패 시 재시도 간격 상한 (초)
+        """
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._loaders: Dict[str, Callable[[], Awaitable[bool]]] = {}
+        self._states: Dict[str, str] = {}
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._durations: Dict[str, float] = {}
+        self._errors: Dict[str, str] = {}
+        self._failures: Dict[str, int] = {}
+        self._retry_at: Dict[str, float] = {}
+
+    def register(self, name: str, loader: Callable[[], Awaitable[bool]]):
+        """컴포넌트 로더 등록 (로더는 성공 여부를 반환하는 코루틴 함수)"""
+        self._loaders[name] = loader
+        self._states[name] = NOT_LOADED
+
+    async def _load(self, name: str) -> bool:
+        self._states[name] = LOADING
+        started_at = time.perf_counter()
+        try:
+            ready = bool(await self._loaders[name]())
+        except Exception as e:
+            logger.error(f"❌ {name} 워밍업 실패: {e}")
+            self._errors[name] = str(e)
+            ready = False
+
+        self._durations[name] = time.perf_counter() - started_at
+        self._states[name] = READY if ready else FAILED
+        if ready:
+            self._errors.pop(name, None)
+            self._failures.pop(name, None)
+            self._retry_at.pop(name, None)
+        else:
+            failures = self._failures.get(name, 0) + 1
+            self._failures[name] = failures
+            delay = min(self.max_retry_delay, self.retry_delay * 2 ** (failures - 1))
+            self._retry_at[name] = time.monotonic() + delay
+        logger.info(f"{name} 워밍업 {'완료' if ready else '실패'} ({self._durations[name]:.2f}초)")
+        return ready
+
+    def _task(self, name: str) -> Optional[asyncio.Task]:
+        """진행 중이거나 끝난 로드 작업 (실패 후 재시도 간격이 지났으면 새 로드 시작, 간격 안이면 None)"""
+        task = self._tasks.get(name)
+        if task is not None and task.done() and self._states.get(name) == FAILED:
+            if time.monotonic() < self._retry_at.get(name, 0.0):
+                return None
+            task = None
+        if task is None:
+            task = asyncio.ensure_future(self._load(name))
+            self._tasks[name] = task
+        return task
+
+    async def ensure(self, name: str) -> bool:
+        """
+        컴포넌트가 로드될 때까지 기다림 (최초 호출 시 로드 시작, 동시 호출은 같은 로드를 공유)
+        실패한 컴포넌트는 재시도 간격이 지났으면 다시 로드하고, 간격 안이면 바로 False 반환
+        """
+        if self._states.get(name) == READY:
+            return True
+
+        task = self._task(name)
+        if task is None:
+            return False
+        # 한 요청이 취소되어도 로드는 계속 진행
+        return await asyncio.shield(task)
+
+    def start_background(self, name: str):
+        """요청을 막지 않고 백그라운드에서 로드 시작 (실패한 컴포넌트는 재시도 간격이 지났을 때만)"""
+        if name not in self._loaders:
+            logger.warning(f"알 수 없는 워밍업 컴포넌트: {name}")
+            return
+        if self._states.get(name) != READY:
+            self._task(name)
+
+    def is_ready(self, name: str) -> bool:
+        return self._states.get(name) == READY
+
+    def get_status(self) -> Dict:
+        """컴포넌트별 워밍업 상태"""
+        status = {}
+        for name, state in self._states.items():
+            entry = {"state": state}
+            if name in self._durations:
+                entry["load_seconds"] = round(self._durations[name], 3)
+            if name in self._errors:
+                entry["error"] = self._errors[name]
+            if state == FAILED:
+                entry["failures"] = self._failures.get(name, 0)
+                entry["retry_in"] = round(max(0.0, self._retry_at.get(name, 0.0) - time.monotonic()), 3)
+            status[name] = entry
+        return status